@@ -0,0 +1,162 @@
+"""
+scripts/benchmark_engines.py
+
+Benchmark of the canonical OLAP queries on SQLite and DuckDB at growing sizes.
+
+For each size a synthetic star schema (10,000 customers, 500 products,
+N sales over five years) is generated with DuckDB, streamed to Parquet and
+loaded into a read-optimized SQLite warehouse the same way a real load
+leaves it (etl_to_dw.create_schema, customer_metrics, optimize_for_reads).
+Each query is then timed on:
+
+- sqlite           the warehouse, through olap_queries.connect
+- duckdb-sqlite    DuckDB reading the warehouse through its SQLite scanner
+- duckdb-parquet   DuckDB reading the Parquet files directly
+
+Generated data is kept under data/bench/rows_<N>/ and reused by later runs.
+At 100M rows expect several GB of disk and a long SQLite load; the
+timings, not the load, are the point.
+
+Run from the project root:
+
+    python -m scripts.smart_store bench --rows 1000000 10000000 100000000
+"""
+
+import logging
+import pathlib
+import sqlite3
+import time
+from typing import Dict, List, Optional, Sequence
+
+import duckdb
+import pandas as pd
+
+from scripts import etl_to_dw, olap_queries
+
+logger = logging.getLogger(__name__)
+
+# Constants
+BENCH_DIR = pathlib.Path("data").joinpath("bench")
+BENCH_ENGINES = ("sqlite", "duckdb-sqlite", "duckdb-parquet")
+CUSTOMERS = 10000
+PRODUCTS = 500
+DAYS = 1826
+LOAD_BATCH_ROWS = 100000
+
+# pick(i, salt, n): a reproducible pseudo-random integer in [0, n) for row i
+SYNTHETIC_TABLES = {
+    "customers_data": f"""
+        SELECT 1000 + i AS customer_id,
+               'Customer ' || i AS customer_name,
+               ['East', 'West', 'North', 'South', 'Central'][1 + pick(i, 1, 5)] AS customer_region,
+               '2023-01-01' AS customer_join_date,
+               CAST(pick(i, 2, 10000) AS DOUBLE) AS customer_lifetime_value,
+               ['Bronze', 'Silver', 'Gold', 'Platinum'][1 + pick(i, 3, 4)] AS customer_tier
+        FROM range({CUSTOMERS}) t(i)
+    """,
+    "products_data": f"""
+        SELECT 100 + i AS product_id,
+               'product ' || i AS product_name,
+               ['Electronics', 'Clothing', 'Sports', 'Home', 'Toys', 'Garden'][1 + pick(i, 4, 6)] AS product_category,
+               round(5 + pick(i, 5, 80000) / 100.0, 2) AS unit_price_usd,
+               1 + pick(i, 6, 100) AS manufacturing_cost_usd,
+               ['Acme', 'Globex', 'Initech'][1 + pick(i, 7, 3)] AS brand_name
+        FROM range({PRODUCTS}) t(i)
+    """,
+    "sales_data": """
+        SELECT i AS transaction_id,
+               strftime(DATE '2020-01-01' + CAST(pick(i, 8, {days}) AS INTEGER), '%Y-%m-%d') AS purchase_date,
+               1000 + pick(i, 9, {customers}) AS customer_id,
+               100 + pick(i, 10, {products}) AS product_id,
+               401 + pick(i, 11, 6) AS store_id,
+               pick(i, 12, 5) AS campaign_id,
+               round(5 + pick(i, 13, 90000) / 100.0, 2) AS sale_amount_usd,
+               1 + pick(i, 14, 9) AS quantity_sold,
+               ['Cash', 'Credit Card', 'Debit Card'][1 + pick(i, 15, 3)] AS payment_method,
+               ['Online', 'In Store', 'Phone'][1 + pick(i, 16, 3)] AS sales_channel
+        FROM range({rows}) t(i)
+    """,
+}
+
+
+def make_benchmark_data(rows: int, bench_dir: pathlib.Path = BENCH_DIR) -> pathlib.Path:
+    """Generate (or reuse) the Parquet files and SQLite warehouse for one size; return their folder."""
+    out_dir = bench_dir.joinpath(f"rows_{rows}")
+    db_path = out_dir.joinpath("smart_sales.db")
+    if db_path.exists():
+        return out_dir
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    duck = duckdb.connect()
+    staging_path = db_path.with_suffix(".staging")
+    staging_path.unlink(missing_ok=True)
+    conn = sqlite3.connect(staging_path)
+    try:
+        duck.execute("CREATE MACRO pick(i, salt, n) AS CAST(hash(i, salt) % n AS BIGINT)")
+        for stem, select in SYNTHETIC_TABLES.items():
+            path = out_dir.joinpath(f"prepared_{stem}.parquet")
+            select = select.format(rows=rows, days=DAYS, customers=CUSTOMERS, products=PRODUCTS)
+            duck.execute(f"COPY ({select}) TO '{path.as_posix()}' (FORMAT parquet)")
+
+        conn.execute(f"PRAGMA page_size={etl_to_dw.WAREHOUSE_PAGE_SIZE}")
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        etl_to_dw.create_schema(conn.cursor())
+        for stem, table in etl_to_dw.TABLE_FOR_STEM.items():
+            reader = duck.execute(f"SELECT * FROM read_parquet('{out_dir.joinpath(f'prepared_{stem}.parquet').as_posix()}')")
+            columns = [column[0] for column in reader.description]
+            statement = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+            loaded = 0
+            while batch := reader.fetchmany(LOAD_BATCH_ROWS):
+                conn.executemany(statement, batch)
+                loaded += len(batch)
+            logger.info(f"Loaded {loaded} rows into {table}")
+        etl_to_dw.recompute_customer_metrics(conn)
+        etl_to_dw.optimize_for_reads(conn)
+        conn.commit()
+    finally:
+        conn.close()
+        duck.close()
+    staging_path.replace(db_path)
+    return out_dir
+
+
+def _time(run, repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def run_benchmark(row_counts: Sequence[int], names: Optional[Sequence[str]] = None, repeat: int = 3,
+                  engines: Sequence[str] = BENCH_ENGINES, bench_dir: pathlib.Path = BENCH_DIR) -> pd.DataFrame:
+    """
+    Time each query on each engine for each size.
+
+    Returns one row per (rows, engine, query) with best_ms and mean_ms; an
+    engine that cannot run a query (for example, no SQLite scanner available) gets
+    NaN timings and the error is logged.
+    """
+    names = list(names or olap_queries.CANONICAL_QUERIES)
+    results: List[Dict] = []
+    for rows in row_counts:
+        out_dir = make_benchmark_data(rows, bench_dir)
+        db_path = out_dir.joinpath("smart_sales.db")
+        for engine in engines:
+            for name in names:
+                try:
+                    if engine == "sqlite":
+                        timings = _time(lambda: olap_queries.run_query(name, db_path=db_path), repeat)
+                    else:
+                        # Connecting (attach, view setup) is part of what a caller pays, so it is timed
+                        prepared_dir = out_dir if engine == "duckdb-parquet" else None
+                        timings = _time(lambda: olap_queries.run_query(name, db_path=db_path, engine="duckdb", prepared_dir=prepared_dir), repeat)
+                    best, mean = min(timings) * 1000, sum(timings) / len(timings) * 1000
+                except (duckdb.Error, sqlite3.Error, pd.errors.DatabaseError) as error:
+                    logger.warning(f"{engine} could not run {name} at {rows} rows: {error}")
+                    best = mean = float("nan")
+                results.append({"rows": rows, "engine": engine, "query": name, "best_ms": best, "mean_ms": mean})
+                logger.info(f"{rows} rows, {engine}, {name}: best {best:.1f} ms")
+    return pd.DataFrame(results)
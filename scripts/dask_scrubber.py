@@ -0,0 +1,267 @@
+"""
+scripts/dask_scrubber.py
+
+Out-of-core execution backend for DataScrubber.
+
+DataScrubber(df) returns a DaskDataScrubber when df is a dask DataFrame,
+so the same method calls clean a partitioned file that does not fit in
+memory. Row-wise steps (renames, type casts, string normalization, missing
+values) stay lazy and run partition by partition. Steps that depend on the
+whole column are computed globally:
+
+- remove_duplicate_records drops duplicates across all partitions
+- remove_outliers_iqr uses quartiles merged from per-partition sketches
+  (within 0.1 percentile points of the exact ones; exact on small data,
+  see common_utils.QUANTILE_SKETCH_POINTS)
+- remove_outliers_zscore uses the global mean and standard deviation
+- profile() reduces null counts, numeric stats, distinct counts and
+  histograms over every partition
+
+compute() and to_csv() run on the local multi-process scheduler by default,
+one worker per core. The worker pool is started once and shared by every
+computation; a fresh pool per step cost more than the steps themselves on
+small files. dask is imported only when this module is used.
+
+By default nothing is kept in memory: every whole-column step re-reads the
+file, which is what a file larger than memory needs. When the data fits
+in the workers' memory, persist=True (`prepare --backend dask --persist`)
+makes each whole-column step persist its input, so its passes (and the
+steps after it) start from memory instead of re-reading the file.
+
+Example:
+
+    df = read_csv_dask("data/raw/sales_data.csv")
+    scrubber = DataScrubber(df)          # a DaskDataScrubber
+    scrubber.remove_duplicate_records()
+    scrubber.remove_outliers_iqr("QuantitySold")
+    scrubber.to_csv("data/prepared/prepared_sales_data.csv")
+"""
+
+import atexit
+import io
+import logging
+import os
+import pathlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional, Tuple, Union
+
+import dask
+import dask.dataframe as dd
+import dask.multiprocessing
+import numpy as np
+import pandas as pd
+
+from scripts.data_scrubber import DataScrubber
+from scripts.data_preparation.common_utils import dask_groupwise_outliers, dask_quartiles, load_schema_registry
+
+logger = logging.getLogger(__name__)
+
+# Default scheduler for computations: local processes, one per core
+DEFAULT_SCHEDULER = "processes"
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def process_scheduler():
+    """The multi-process scheduler bound to one worker pool shared by every computation in this process."""
+    global _process_pool
+    if _process_pool is None:
+        # Same setup as dask's own per-call pool: a fixed hash seed so workers hash strings alike
+        if os.environ.get("PYTHONHASHSEED") in (None, "0"):
+            os.environ["PYTHONHASHSEED"] = "6640"
+        _process_pool = ProcessPoolExecutor(
+            dask.config.get("num_workers", None) or dask.multiprocessing.CPU_COUNT,
+            mp_context=dask.multiprocessing.get_context(),
+            initializer=partial(dask.multiprocessing.initialize_worker_process, user_initializer=None),
+        )
+        atexit.register(_process_pool.shutdown)
+    return partial(dask.multiprocessing.get, pool=_process_pool)
+
+
+def read_csv_dask(path: Union[str, pathlib.Path], blocksize: str = "64MB", source: Optional[str] = None, consumer: str = "prepare") -> dd.DataFrame:
+    """Read a CSV file as a dask DataFrame with the dtypes and columns recorded in the schema registry."""
+    path = pathlib.Path(path)
+    name = source or path.name
+    registry = load_schema_registry()
+    entry = registry["sources"].get(name)
+    if entry is None:
+        return dd.read_csv(path, blocksize=blocksize, na_values=["", "N/A", "NULL"], thousands=",")
+
+    usecols = registry["consumers"].get(consumer, {}).get(name, list(entry["columns"]))
+    dtypes = {column: entry["columns"][column]["dtype"] for column in usecols if entry["columns"][column]["dtype"] != "datetime"}
+    date_columns = [column for column in usecols if entry["columns"][column]["dtype"] == "datetime"]
+    df = dd.read_csv(path, blocksize=blocksize, usecols=usecols, dtype=dtypes, na_values=entry["na_values"], thousands=entry["thousands"])
+    for column in date_columns:
+        df[column] = dd.to_datetime(df[column], format=entry["columns"][column]["date_format"])
+    return df[usecols]
+
+
+class DaskDataScrubber(DataScrubber):
+    """DataScrubber over a dask DataFrame. Created automatically by DataScrubber(dask_df)."""
+
+    def __init__(self, df: dd.DataFrame, scheduler: str = DEFAULT_SCHEDULER, persist: bool = False):
+        super().__init__(df)
+        self.scheduler = process_scheduler() if scheduler == "processes" else scheduler
+        self.persist = persist
+
+    def _compute(self, *collections):
+        return dask.compute(*collections, scheduler=self.scheduler)
+
+    def _checkpoint(self) -> dd.DataFrame:
+        # Whole-column steps read their input more than once; persist it so only the first read touches the file
+        if self.persist:
+            self.df = self.df.persist(scheduler=self.scheduler)
+        return self.df
+
+    def compute(self) -> pd.DataFrame:
+        """Run the queued steps and return the cleaned data as a pandas DataFrame."""
+        return self.df.compute(scheduler=self.scheduler)
+
+    def to_csv(self, path: Union[str, pathlib.Path]) -> None:
+        """Run the queued steps and stream the result into one CSV file."""
+        self.df.to_csv(str(path), single_file=True, index=False, compute_kwargs={"scheduler": self.scheduler})
+
+    def profile(self, histogram_bins: int = 10) -> Dict:
+        """Same keys as the in-memory profile, reduced over all partitions in two passes."""
+        if self._profile is not None:
+            return self._profile
+
+        df = self._checkpoint()
+        numeric = df.select_dtypes(include="number").astype("float64")  # nullable ints break dask's var reduction
+        numeric_columns = list(numeric.columns)
+        row_hashes = df.map_partitions(lambda part: pd.util.hash_pandas_object(part, index=False), meta=("hash", "uint64"))
+        distinct = {column: df[column].nunique_approx() for column in df.columns}
+        row_count, null_counts, unique_rows, distinct, counts, means, stds, mins, maxs = self._compute(
+            df.map_partitions(len).sum(),
+            df.isna().sum(),
+            row_hashes.nunique(),
+            distinct,
+            numeric.count(),
+            numeric.mean(),
+            numeric.std(),
+            numeric.min(),
+            numeric.max(),
+        )
+
+        numeric_summary = pd.DataFrame(
+            [counts, means, stds, mins, maxs], index=["count", "mean", "std", "min", "max"], columns=numeric_columns, dtype="float64"
+        )
+
+        # Second pass: fixed-width histograms over the global min/max
+        histograms = {}
+        edges = {column: np.linspace(mins[column], maxs[column], histogram_bins + 1) for column in numeric_columns if counts[column] > 0}
+        if edges:
+            partials = self._compute(numeric[list(edges)].map_partitions(_partition_histograms, edges, meta=(None, "object")))[0]
+            for partition_counts in partials:
+                for column, column_counts in partition_counts.items():
+                    histograms[column] = histograms.get(column, 0) + column_counts
+            histograms = {column: (column_counts, edges[column]) for column, column_counts in histograms.items()}
+
+        self._profile = {
+            "row_count": int(row_count),
+            "null_counts": null_counts,
+            "duplicate_count": int(row_count - unique_rows),
+            "distinct_counts": pd.Series({column: int(round(count)) for column, count in distinct.items()}, dtype="int64"),
+            "numeric_summary": numeric_summary,
+            "histograms": histograms,
+        }
+        return self._profile
+
+    def _remove_outliers_by_group(self, column_name: str, by: List[str], method: str, threshold=3, change_log=None) -> dd.DataFrame:
+        self.df, removed = dask_groupwise_outliers(self._checkpoint(), column_name, by, method, threshold, self.scheduler)
+        self._record_group_outliers(column_name, by, method, removed, change_log)
+        return self.df
+
+    def remove_outliers_iqr(self, column_name: str, change_log=None, by: Optional[List[str]] = None) -> dd.DataFrame:
+        if column_name not in self.df.columns:
+            if change_log is not None:
+                change_log.append(f"Column '{column_name}' not found for IQR outlier removal.")
+            return self.df
+
+        if by:
+            return self._remove_outliers_by_group(column_name, list(by), "iqr", change_log=change_log)
+
+        Q1, Q3 = dask_quartiles(self._checkpoint(), column_name, scheduler=self.scheduler)
+        IQR = Q3 - Q1
+        lower_bound = Q1 - 1.5 * IQR
+        upper_bound = Q3 + 1.5 * IQR
+
+        keep = ((self.df[column_name] >= lower_bound) & (self.df[column_name] <= upper_bound)).fillna(False)
+        initial_count, kept = self._compute(self.df.map_partitions(len).sum(), keep.sum())
+        self.df = self.df[keep]
+        removed = int(initial_count - kept)
+
+        if removed > 0 and change_log is not None:
+            change_log.append(f"Removed {removed} outliers from column '{column_name}' using IQR method.")
+        return self.df
+
+    def remove_outliers_zscore(self, column_name: str, threshold=3, change_log=None, by: Optional[List[str]] = None) -> dd.DataFrame:
+        if column_name not in self.df.columns:
+            if change_log is not None:
+                change_log.append(f"Column '{column_name}' not found for Z-score outlier removal.")
+            return self.df
+
+        if by:
+            return self._remove_outliers_by_group(column_name, list(by), "zscore", threshold, change_log)
+
+        column = self._checkpoint()[column_name]
+        # Population std (ddof=0), as scipy.stats.zscore uses
+        initial_count, mean, std = self._compute(self.df.map_partitions(len).sum(), column.mean(), column.std(ddof=0))
+        keep = (((column - mean) / std).abs() <= threshold).fillna(False)
+        kept = self._compute(keep.sum())[0]
+        self.df = self.df[keep]
+        removed = int(initial_count - kept)
+
+        if removed > 0 and change_log is not None:
+            change_log.append(f"Removed {removed} outliers from column '{column_name}' using Z-score method.")
+        return self.df
+
+    def remove_duplicate_records(self) -> dd.DataFrame:
+        before_count = self._compute(self._checkpoint().map_partitions(len).sum())[0]
+        # split_out keeps the global shuffle from funnelling every row into one partition
+        self.df = self.df.drop_duplicates(split_out=self.df.npartitions)
+        after_count = self._compute(self.df.map_partitions(len).sum())[0]
+        self.report['duplicate_count_removed'] = int(before_count - after_count)
+        return self.df
+
+    def normalize_string_columns(self, columns: List[str], case: Optional[str] = None, trim: bool = True,
+                                 collapse_whitespace: bool = True, synonyms: Optional[Dict[str, str]] = None,
+                                 as_category: bool = False, change_log=None) -> dd.DataFrame:
+        """Per-partition version of DataScrubber.normalize_string_columns (each partition factorizes its own values)."""
+        for column in columns:
+            if column not in self.df.columns:
+                raise ValueError(f"Column name '{column}' not found in the DataFrame.")
+
+        def normalize(part: pd.DataFrame) -> pd.DataFrame:
+            return DataScrubber(part.copy()).normalize_string_columns(
+                columns, case=case, trim=trim, collapse_whitespace=collapse_whitespace, synonyms=synonyms
+            )
+
+        self.df = self.df.map_partitions(normalize, meta=self.df._meta)
+        if as_category:
+            self.df = self.df.astype({column: "category" for column in columns})
+        if change_log is not None:
+            change_log.append(f"Normalized string columns {columns}.")
+        self.invalidate_profile()
+        return self.df
+
+    def parse_dates_to_add_standard_datetime(self, column: str) -> dd.DataFrame:
+        if column not in self.df.columns:
+            raise ValueError(f"Column name '{column}' not found in the DataFrame.")
+        self.df['StandardDateTime'] = dd.to_datetime(self.df[column])
+        self.invalidate_profile()
+        return self.df
+
+    def inspect_data(self) -> Tuple[str, str]:
+        buffer = io.StringIO()
+        self.df.info(buf=buffer)
+        return buffer.getvalue(), self.profile()['numeric_summary'].to_string()
+
+
+def _partition_histograms(part: pd.DataFrame, edges: Dict[str, np.ndarray]) -> pd.Series:
+    counts = {}
+    for column, column_edges in edges.items():
+        values = part[column].dropna().to_numpy(dtype="float64")
+        counts[column] = np.histogram(values, bins=column_edges)[0]
+    return pd.Series([counts])
@@ -0,0 +1,201 @@
+"""
+scripts/data_preparation/cdc.py
+
+Change-data-capture stage for the daily full snapshots of the raw files.
+
+Upstream resends complete copies of customers_data.csv, products_data.csv
+and sales_data.csv every day, but only a few rows change. This module keeps
+one 64-bit hash per business key from the previous snapshot and diffs the
+new snapshot against it:
+
+- inserts: keys not seen before
+- updates: keys whose row hash changed
+- deletes: keys missing from the new snapshot
+
+Only inserts and updates go through data_prep2.clean_dataframe, and the
+warehouse is changed with upserts and deletes, so daily work grows with
+the number of changed rows, not the snapshot size. The snapshot state is
+saved only after the warehouse commit, so a failed run is simply repeated
+the next time. After the files are processed the dashboard files are
+refreshed (incrementally, see export_dashboard).
+
+Cleaning only sees the changed rows, and a z-score over a handful of rows
+is meaningless, so the outlier bounds are computed over the whole snapshot
+instead, the way the full load computes them over the whole file, and
+applied to the changed rows. Changed rows that cleaning drops are deleted
+from the warehouse, so a stored copy never outlives an invalid update.
+
+Run from the project root:
+
+    python scripts/data_preparation/cdc.py
+"""
+
+import logging
+import pathlib
+import sqlite3
+import sys
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+# For local imports, temporarily add project root to sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.data_preparation import data_prep2  # noqa: E402
+from scripts.data_preparation.common_utils import read_source  # noqa: E402
+from scripts import etl_to_dw  # noqa: E402
+from scripts.export_dashboard import export_dashboard_artifacts, sale_months  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+# Constants
+RAW_DATA_DIR = pathlib.Path("data").joinpath("raw")
+CDC_STATE_DIR = pathlib.Path("data").joinpath("cdc")
+
+# Raw file -> (business key in the raw file, warehouse table, key column in the warehouse)
+CDC_SOURCES = {
+    "customers_data.csv": ("CustomerID", "customer", "customer_id"),
+    "products_data.csv": ("ProductID", "product", "product_id"),
+    "sales_data.csv": ("TransactionID", "sale", "transaction_id"),
+}
+
+# The full load drops rows whose quantity_sold z-score over the whole file is above this
+OUTLIER_COLUMN = "quantity_sold"
+OUTLIER_THRESHOLD = 3
+
+
+def snapshot_hashes(df: pd.DataFrame, key: str) -> pd.DataFrame:
+    """Return one row per business key with a hash of the whole raw row (last copy wins)."""
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    state = pd.DataFrame({key: df[key].to_numpy(), "row_hash": hashes})
+    return state.dropna(subset=[key]).drop_duplicates(subset=[key], keep="last")
+
+
+def diff_snapshot(df: pd.DataFrame, key: str, previous_state: Optional[pd.DataFrame]) -> Dict:
+    """
+    Compare a raw snapshot (read as text) with the previous snapshot's hashes.
+
+    Returns {"inserts": df, "updates": df, "deletes": pd.Series of keys, "state": new state}.
+    """
+    state = snapshot_hashes(df, key)
+    if previous_state is None:
+        previous_state = pd.DataFrame({key: pd.Series(dtype=state[key].dtype), "row_hash": pd.Series(dtype="uint64")})
+
+    merged = state.merge(previous_state, on=key, how="outer", suffixes=("", "_previous"), indicator=True)
+    inserted_keys = merged.loc[merged["_merge"] == "left_only", key]
+    updated_keys = merged.loc[(merged["_merge"] == "both") & (merged["row_hash"] != merged["row_hash_previous"]), key]
+    deleted_keys = merged.loc[merged["_merge"] == "right_only", key]
+
+    latest = df.drop_duplicates(subset=[key], keep="last")
+    return {
+        "inserts": latest[latest[key].isin(inserted_keys)],
+        "updates": latest[latest[key].isin(updated_keys)],
+        "deletes": deleted_keys.reset_index(drop=True),
+        "state": state,
+    }
+
+
+def _state_path(filename: str, state_dir: pathlib.Path) -> pathlib.Path:
+    return state_dir.joinpath(f"{pathlib.Path(filename).stem}_hashes.pkl")
+
+
+def load_state(filename: str, state_dir: pathlib.Path = CDC_STATE_DIR) -> Optional[pd.DataFrame]:
+    path = _state_path(filename, state_dir)
+    return pd.read_pickle(path) if path.exists() else None
+
+
+def save_state(filename: str, state: pd.DataFrame, state_dir: pathlib.Path = CDC_STATE_DIR) -> None:
+    state_dir.mkdir(parents=True, exist_ok=True)
+    state.to_pickle(_state_path(filename, state_dir))
+
+
+def outlier_bounds(snapshot: pd.DataFrame, threshold: float = OUTLIER_THRESHOLD) -> Optional[Tuple[float, float]]:
+    """Lowest and highest OUTLIER_COLUMN value the full load would keep for this snapshot (None if absent)."""
+    columns = {column: data_prep2.COLUMN_STANDARDIZATION.get(column, column).lower() for column in snapshot.columns}
+    raw_column = next((column for column, name in columns.items() if name == OUTLIER_COLUMN), None)
+    if raw_column is None:
+        return None
+    values = pd.to_numeric(snapshot[raw_column], errors="coerce").dropna().astype("float64")
+    if values.empty:
+        return None
+    # Same population z-score (ddof=0) as scipy.stats.zscore in the batch path
+    mean, std = values.mean(), values.std(ddof=0)
+    return mean - threshold * std, mean + threshold * std
+
+
+def run_cdc(filename: str, raw_dir: pathlib.Path = RAW_DATA_DIR, db_path: pathlib.Path = etl_to_dw.DB_PATH, state_dir: pathlib.Path = CDC_STATE_DIR) -> Dict[str, object]:
+    """
+    Diff one raw snapshot, clean the changed rows and apply them to the warehouse.
+
+    Returns the change counts and the sale months the change touched (for the dashboard export).
+    """
+    raw_key, table, key_column = CDC_SOURCES[filename]
+    # The registered dtypes make the hashes independent of what a sample of the file looks like
+    snapshot = read_source(raw_dir.joinpath(filename), source=filename)
+    previous_state = load_state(filename, state_dir)
+    is_numeric = pd.api.types.is_numeric_dtype
+    if previous_state is not None and is_numeric(previous_state[raw_key]) != is_numeric(snapshot[raw_key]):
+        # State saved from a text read of the snapshot
+        logger.warning(f"CDC state for {filename} was saved with other key types; treating every row as changed.")
+        previous_state = None
+    changes = diff_snapshot(snapshot, raw_key, previous_state)
+
+    delta = pd.concat([changes["inserts"], changes["updates"]])
+    change_log = []
+    if len(delta) > 0:
+        cleaned = data_prep2.clean_dataframe(delta, change_log, remove_outliers=False)
+        bounds = outlier_bounds(snapshot)
+        if bounds is not None and OUTLIER_COLUMN in cleaned.columns:
+            inside = cleaned[OUTLIER_COLUMN].between(*bounds)
+            if not inside.all():
+                change_log.append(f"Removed {(~inside).sum()} outliers from column '{OUTLIER_COLUMN}' using snapshot Z-score bounds.")
+            cleaned = cleaned[inside]
+    else:
+        cleaned = pd.DataFrame()
+    deleted_keys = pd.to_numeric(changes["deletes"], errors="coerce").dropna().astype("int64").tolist()
+    snapshot_deletes = len(deleted_keys)
+    # Changed rows that cleaning dropped must not keep their previous version in the warehouse
+    changed_keys = pd.to_numeric(delta[raw_key], errors="coerce").dropna().astype("int64")
+    kept_keys = set(cleaned[key_column].astype("int64")) if len(cleaned) > 0 else set()
+    deleted_keys += [key for key in changed_keys.tolist() if key not in kept_keys]
+
+    with etl_to_dw.warehouse_write_lock(db_path):
+        conn = sqlite3.connect(db_path, timeout=30)
+        try:
+            etl_to_dw.create_schema(conn.cursor())
+            # Sale months whose dashboard totals the change can move, before and after it
+            touched_keys = changed_keys.tolist() + deleted_keys
+            months = sale_months(conn, key_column, touched_keys)
+            etl_to_dw.apply_changes(conn, table, key_column, cleaned, deleted_keys)
+            conn.commit()
+            months |= sale_months(conn, key_column, touched_keys)
+        finally:
+            conn.close()
+    save_state(filename, changes["state"], state_dir)
+
+    summary = {
+        "snapshot_rows": len(snapshot),
+        "inserts": len(changes["inserts"]),
+        "updates": len(changes["updates"]),
+        "deletes": snapshot_deletes,
+        "dropped": len(deleted_keys) - snapshot_deletes,
+        "loaded": len(cleaned),
+        "months": sorted(months),
+    }
+    logger.info(f"CDC {filename}: {summary}")
+    return summary
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    months = set()
+    for filename in CDC_SOURCES:
+        if RAW_DATA_DIR.joinpath(filename).exists():
+            months.update(run_cdc(filename)["months"])
+    export_dashboard_artifacts(etl_to_dw.DB_PATH, months=months)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,10 @@
+import json
 import pandas as pd
 import numpy as np
 import logging
-from scipy import stats
 from pathlib import Path
 
-# Setup for logging
-logging.basicConfig(level=logging.INFO)
+# Setup for logging (handlers are configured by the calling script)
 logger = logging.getLogger(__name__)
 
 # Constants for standardization and expected data types
@@ -43,13 +42,49 @@ EXPECTED_DTYPES = {
     "Product_ID": "int64",
     "Sale_Amount_USD": "float64",
     "Purchase_Date": "datetime64",
-    "Quantity_Sold": "int64"
+    "Quantity_Sold": "int64",
+    "Customer_Lifetime_Value": "float64",
+    "Customer_Join_Date": "datetime64"
 }
 
+# Prepared columns the warehouse stores, per source (the customer, product and
+# sale tables in etl_to_dw.create_schema). The registry consumers read only these.
+WAREHOUSE_COLUMNS = {
+    "customers_data": ["customer_id", "customer_name", "customer_region", "customer_join_date", "customer_lifetime_value", "customer_tier"],
+    "products_data": ["product_id", "product_name", "product_category", "unit_price_usd", "manufacturing_cost_usd", "brand_name"],
+    "sales_data": [
+        "transaction_id", "purchase_date", "customer_id", "product_id", "store_id",
+        "campaign_id", "sale_amount_usd", "quantity_sold", "payment_method", "sales_channel",
+    ],
+}
+
+# Characters stripped from numeric text before parsing:
+# thousands separators, currency symbols and stray whitespace ("$5,000 " -> "5000")
+NUMERIC_NOISE_PATTERN = r"[,\s$€£]"
+
 # Define file paths
 RAW_DATA_DIR = Path("data/raw")
 PREPARED_DATA_DIR = Path("data/prepared")
 REPORT_DIR = Path("data/reports")
+SCHEMA_REGISTRY_PATH = Path("data/schema_registry.json")
+
+# Sales files the ingest daemon has loaded into the warehouse (scripts/ingest_daemon.py)
+INGEST_ARCHIVE_DIR = Path("data/archive")
+INGESTED_SOURCE = "sales_data.csv"
+INGESTED_KEY = "TransactionID"
+
+# Tokens read as missing in every source file
+NA_VALUES = ["", "N/A", "NULL"]
+
+# Date layouts tried, in order, when registering a date column from a sample
+DATE_FORMATS = ["%m/%d/%Y", "%Y-%m-%d"]
+
+# Scheduler for global reductions on dask frames: local processes, one per core
+DASK_SCHEDULER = "processes"
+
+def _is_dask(df):
+    """True for dask DataFrames/Series, checked without importing dask."""
+    return type(df).__module__.startswith("dask")
 
 def standardize_column_names(df, standardization_map):
     logger.info(f"Initial columns: {df.columns.tolist()}")
@@ -59,6 +94,9 @@ def standardize_column_names(df, standardization_map):
     return df
 
 def clean_data(df, required_columns, change_log=None):
+    if _is_dask(df):
+        return _clean_data_dask(df, change_log)
+
     initial_size = len(df)
 
     # Log rows with missing values before dropping them
@@ -82,18 +120,255 @@ def clean_data(df, required_columns, change_log=None):
             change_log.append(f"Dropped {duplicates_before - duplicates_after} duplicate rows.")
 
     # Ensure correct data types for specified columns
+    numeric_dtypes = {col: dtype for col, dtype in EXPECTED_DTYPES.items() if not dtype.startswith("datetime")}
+    df = normalize_numeric_columns(df, numeric_dtypes, change_log)
     for column, dtype in EXPECTED_DTYPES.items():
-        if column in df.columns:
-            df[column] = pd.to_numeric(df[column], errors="coerce")
+        if column in df.columns and dtype.startswith("datetime"):
+            df[column] = pd.to_datetime(df[column], errors="coerce")
     logger.info(f"Data types after conversion: {df.dtypes.to_dict()}")
 
     return df
 
-def handle_outliers_zscore(df, column, threshold=3, change_log=None):
+def normalize_numeric_columns(df, dtypes, change_log=None):
+    """
+    Parse text columns such as "5,000" or "$1,200.50" into numbers.
+
+    dtypes maps each column to its expected dtype (EXPECTED_DTYPES). Parsed
+    columns are float64; a column expected as an integer becomes int64 when
+    every value is a whole number, so "5,000" in a float column stays 5000.0.
+
+    The cleanup runs once per distinct value (pd.factorize) and the parsed
+    uniques are broadcast back with a vectorized take, so a column with
+    millions of rows but a few thousand distinct strings costs a few
+    thousand regex calls. Columns that are already numeric are left as is.
+    Reports how many values were rewritten and how many could not be parsed.
+    """
+    if _is_dask(df):
+        # Parsed partition by partition; always float64 so every partition has the same dtype
+        for column in dtypes:
+            if column in df.columns and not pd.api.types.is_numeric_dtype(df[column].dtype):
+                df[column] = df[column].map_partitions(_parse_numeric_partition, meta=(column, "float64"))
+        return df
+
+    for column, dtype in dtypes.items():
+        if column not in df.columns or pd.api.types.is_numeric_dtype(df[column]):
+            continue
+
+        codes, uniques = pd.factorize(df[column])
+        raw_text = pd.Series(uniques, dtype="object").astype(str)
+        stripped = raw_text.str.replace(NUMERIC_NOISE_PATTERN, "", regex=True)
+        parsed = pd.to_numeric(stripped, errors="coerce").to_numpy(dtype="float64")
+
+        # Count rows per distinct value so the report reflects row counts
+        row_counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        rewritten = int(row_counts[(stripped != raw_text).to_numpy() & ~np.isnan(parsed)].sum())
+        unparseable = int(row_counts[np.isnan(parsed)].sum())
+
+        # Code -1 (missing) picks the trailing NaN
+        values = np.append(parsed, np.nan)[codes]
+        if dtype.startswith("int") and not np.isnan(values).any() and np.array_equal(values, np.floor(values)):
+            df[column] = values.astype("int64")
+        else:
+            df[column] = values
+
+        logger.info(f"Column '{column}': coerced {rewritten} formatted values to numbers, {unparseable} values could not be parsed.")
+        if change_log is not None:
+            if rewritten > 0:
+                change_log.append(f"Coerced {rewritten} formatted values to numbers in column '{column}'.")
+            if unparseable > 0:
+                change_log.append(f"Set {unparseable} unparseable values to NaN in column '{column}'.")
+    return df
+
+def _parse_numeric_partition(series):
+    return normalize_numeric_columns(series.to_frame(), {series.name: "float64"})[series.name].astype("float64")
+
+def _clean_data_dask(df, change_log=None):
+    """clean_data for a dask DataFrame: the same steps, queued lazily, with a global duplicate check."""
+    import dask.dataframe as dd
+
+    df = df.dropna(how="any")
+    df = df.drop_duplicates(split_out=df.npartitions)
+    if change_log is not None:
+        change_log.append("Dropped rows with missing values and duplicate rows (out-of-core, counts not tracked).")
+
+    numeric_dtypes = {col: dtype for col, dtype in EXPECTED_DTYPES.items() if not dtype.startswith("datetime")}
+    df = normalize_numeric_columns(df, numeric_dtypes, change_log)
+    for column, dtype in EXPECTED_DTYPES.items():
+        if column in df.columns and dtype.startswith("datetime"):
+            df[column] = dd.to_datetime(df[column], errors="coerce")
+    return df
+
+def outlier_bounds(method, threshold=3, q1=None, q3=None, mean=None, std=None):
+    """
+    Lower and upper limits for the IQR rule (from q1, q3) or the z-score rule (from mean, population std).
+
+    Inputs may be scalars, arrays or Series (one value per row or per group).
+    A z-score limit is infinite where std is 0, so a group whose values are
+    all equal, such as a single-row group, has no outliers.
+    """
+    if method == "iqr":
+        iqr = q3 - q1
+        return q1 - 1.5 * iqr, q3 + 1.5 * iqr
+    if method == "zscore":
+        spread = np.where(np.asarray(std) > 0, threshold * np.asarray(std, dtype="float64"), np.inf)
+        return mean - spread, mean + spread
+    raise ValueError(f"Unknown outlier method '{method}'. Use 'iqr' or 'zscore'.")
+
+def groupwise_outlier_mask(df, column, by, method="zscore", threshold=3):
+    """
+    Boolean mask of the rows to keep when outliers in column are judged within each group of by.
+
+    One groupby-transform pass broadcasts the per-group quartiles or mean/std
+    to every row and a single comparison builds the mask, so thousands of
+    groups cost the same as one. Rows with a missing value in column are
+    not kept, as in the global methods.
+    """
+    values = df[column].astype("float64")
+    grouped = values.groupby([df[key] for key in by], sort=False, dropna=False)
+    if method == "iqr":
+        lower, upper = outlier_bounds("iqr", q1=grouped.transform("quantile", 0.25), q3=grouped.transform("quantile", 0.75))
+    else:
+        lower, upper = outlier_bounds(method, threshold, mean=grouped.transform("mean"), std=grouped.transform("std", ddof=0))
+    return (values >= lower) & (values <= upper)
+
+def removed_counts_by_group(df, keep, by):
+    """{group: rows removed} for the groups that lost rows; group keys are tuples when by has several columns."""
+    counts = df.loc[~keep, by].value_counts(dropna=False, sort=True)
+    return {(key if len(by) > 1 else key[0]): int(count) for key, count in counts.items()}
+
+def _within_group_bounds(part, bounds, by, column):
+    keys = pd.MultiIndex.from_frame(part[by]) if len(by) > 1 else pd.Index(part[by[0]])
+    aligned = bounds.reindex(keys)
+    values = part[column].to_numpy(dtype="float64", na_value=np.nan)
+    return pd.Series((values >= aligned["lower"].to_numpy()) & (values <= aligned["upper"].to_numpy()), index=part.index)
+
+# Points kept per partition (and per group) by the mergeable quantile sketch.
+# Merged quartiles land within 1 / QUANTILE_SKETCH_POINTS of the target rank
+# (0.1 percentile points), and are exact while a partition's group has at most
+# this many values.
+QUANTILE_SKETCH_POINTS = 1000
+
+def _quantile_sketch(values):
+    """(points, weights) standing for the non-missing values; the values themselves when there are few."""
+    values = np.sort(values[~np.isnan(values)])
+    if len(values) <= QUANTILE_SKETCH_POINTS:
+        return values, np.ones(len(values))
+    points = np.quantile(values, np.linspace(0, 1, QUANTILE_SKETCH_POINTS))
+    return points, np.full(QUANTILE_SKETCH_POINTS, len(values) / QUANTILE_SKETCH_POINTS)
+
+def _partition_quantile_sketches(part, column, by):
+    """One row per sketch point of part[column] (per group of by): the group keys, point and weight."""
+    values = part[column].to_numpy(dtype="float64", na_value=np.nan)
+    if not by:
+        points, weights = _quantile_sketch(values)
+        return pd.DataFrame({"point": points, "weight": weights})
+    frames = []
+    for positions in part.groupby(by, sort=False, dropna=False).indices.values():
+        points, weights = _quantile_sketch(values[positions])
+        keys = part[by].iloc[np.repeat(positions[:1], len(points))].reset_index(drop=True)
+        frames.append(keys.assign(point=points, weight=weights))
+    if not frames:
+        return part[by].iloc[:0].reset_index(drop=True).assign(point=np.empty(0), weight=np.empty(0))
+    return pd.concat(frames, ignore_index=True)
+
+def merge_quantile_sketches(points, weights, quantiles):
+    """
+    Quantiles of the values a set of sketches stand for, interpolated like np.quantile.
+
+    Each point sits at the rank of the weight before it; with unit weights
+    (small partitions) this is exactly np.quantile's linear interpolation.
+    """
+    order = np.argsort(points, kind="stable")
+    points, weights = np.asarray(points, dtype="float64")[order], np.asarray(weights, dtype="float64")[order]
+    if len(points) == 0:
+        return np.full(len(quantiles), np.nan)
+    ranks = np.cumsum(weights) - weights
+    if ranks[-1] == 0:
+        return np.full(len(quantiles), points[0])
+    return np.interp(quantiles, ranks / ranks[-1], points)
+
+def dask_quartiles(df, column, by=None, scheduler=DASK_SCHEDULER):
+    """
+    Approximate Q1 and Q3 of a dask column, overall or per group of by, without pulling the column.
+
+    Each partition reduces its values (per group) to at most
+    QUANTILE_SKETCH_POINTS points and the sketches are merged on the client.
+    Returns (q1, q3) as floats, or as Series indexed by group when by is given.
+    """
+    import dask
+
+    by = list(by or [])
+    meta = _partition_quantile_sketches(df._meta, column, by)
+    sketches = dask.compute(df.map_partitions(_partition_quantile_sketches, column, by, meta=meta), scheduler=scheduler)[0]
+    if not by:
+        return tuple(merge_quantile_sketches(sketches["point"], sketches["weight"], [0.25, 0.75]))
+    quartiles = sketches.groupby(by, sort=False, dropna=False)[["point", "weight"]].apply(
+        lambda group: pd.Series(merge_quantile_sketches(group["point"], group["weight"], [0.25, 0.75]), index=["q1", "q3"])
+    )
+    return quartiles["q1"], quartiles["q3"]
+
+def dask_groupwise_outliers(df, column, by, method="zscore", threshold=3, scheduler=DASK_SCHEDULER):
+    """
+    Group-wise outlier removal for a dask DataFrame. Returns (filtered frame, removed counts per group).
+
+    The per-group limits come from one global reduction (merged quartile
+    sketches, see dask_quartiles, or count/mean/std per group) and are
+    broadcast to every partition as a small lookup table.
+    """
+    import dask
+
+    values = df[column].astype("float64")
+    if method == "iqr":
+        q1, q3 = dask_quartiles(df, column, by, scheduler)
+        lower, upper = outlier_bounds("iqr", q1=q1, q3=q3)
+    else:
+        stats = dask.compute(df[by].assign(**{column: values}).groupby(by, dropna=False)[column].agg(["count", "mean", "std"]), scheduler=scheduler)[0]
+        # Sample std -> population std, as scipy.stats.zscore uses; a one-row group has std 0
+        std = (stats["std"] * np.sqrt((stats["count"] - 1) / stats["count"])).fillna(0)
+        lower, upper = outlier_bounds("zscore", threshold, mean=stats["mean"], std=std)
+    bounds = pd.DataFrame({"lower": lower, "upper": upper})
+
+    keep = df.map_partitions(_within_group_bounds, bounds, by, column, meta=(None, "bool"))
+    removed = dask.compute(df[~keep].groupby(by, dropna=False).size(), scheduler=scheduler)[0]
+    removed = {key: int(count) for key, count in removed.items() if count > 0}
+    return df[keep], removed
+
+def handle_outliers_zscore(df, column, threshold=3, change_log=None, by=None):
+    """
+    Drop rows whose z-score in column exceeds threshold.
+
+    With by (e.g. ["Product_ID"]) the mean and std are taken per group
+    instead of over the whole column, and the change log gets the removed
+    count per group.
+    """
     if column not in df.columns:
         logger.warning(f"Column {column} not found in the DataFrame. Skipping outlier handling.")
         return df
 
+    if by:
+        by = list(by)
+        if _is_dask(df):
+            df, removed = dask_groupwise_outliers(df, column, by, "zscore", threshold)
+        else:
+            keep = groupwise_outlier_mask(df, column, by, "zscore", threshold)
+            df, removed = df[keep], removed_counts_by_group(df, keep, by)
+        if removed and change_log is not None:
+            change_log.append(f"Dropped {sum(removed.values())} outliers from column '{column}' using Z-score method within groups of {by}: {removed}")
+        return df
+
+    if _is_dask(df):
+        import dask
+
+        # Global mean and population std (as scipy.stats.zscore), then one lazy filter
+        mean, std = dask.compute(df[column].mean(), df[column].std(ddof=0), scheduler=DASK_SCHEDULER)
+        outliers = (((df[column] - mean) / std).abs() > threshold).fillna(False)
+        outlier_count = int(dask.compute(outliers.sum(), scheduler=DASK_SCHEDULER)[0])
+        if outlier_count > 0 and change_log is not None:
+            change_log.append(f"Dropped {outlier_count} outliers from column '{column}' using Z-score method.")
+        return df[~outliers]
+
+    from scipy import stats  # imported on first use to keep module import fast
+
     z_scores = stats.zscore(df[column].dropna())
     abs_z_scores = np.abs(z_scores)
     outliers = abs_z_scores > threshold
@@ -103,4 +378,173 @@ def handle_outliers_zscore(df, column, threshold=3, change_log=None):
         if change_log is not None:
             change_log.append(f"Dropped {outlier_count} outliers from column '{column}' using Z-score method.")
         df = df[~outliers]
-    return df
\ No newline at end of file
+    return df
+
+
+def _registered_dtype(standard_name, sample_column):
+    """Dtype to read a column with: EXPECTED_DTYPES first, otherwise what the sample shows."""
+    expected = EXPECTED_DTYPES.get(standard_name, "")
+    if expected.startswith("int") or (not expected and pd.api.types.is_integer_dtype(sample_column)):
+        # Nullable, so a missing ID still reaches the cleaning step instead of failing the read
+        return "Int64"
+    if expected.startswith("float") or (not expected and pd.api.types.is_float_dtype(sample_column)):
+        return "float64"
+    return "str"
+
+
+def _detect_date_format(sample_column):
+    values = sample_column.dropna().astype(str)
+    for date_format in DATE_FORMATS:
+        if pd.to_datetime(values, format=date_format, errors="coerce").notna().all():
+            return date_format
+    return None
+
+
+def _register_source(path, sample_rows, prepared):
+    sample = pd.read_csv(path, nrows=sample_rows, na_values=NA_VALUES, thousands=",")
+    columns = {}
+    for column in sample.columns:
+        standard_name = COLUMN_STANDARDIZATION.get(column, column)
+        # Prepared files already carry lower-case standardized names
+        lookup_name = next((name for name in EXPECTED_DTYPES if name.lower() == column), standard_name) if prepared else standard_name
+        entry = {"standard_name": standard_name, "dtype": _registered_dtype(lookup_name, sample[column])}
+        # Only the raw datetime columns are parsed on read; the warehouse stores dates as text
+        if not prepared and EXPECTED_DTYPES.get(lookup_name, "").startswith("datetime"):
+            date_format = _detect_date_format(sample[column])
+            if date_format:
+                entry["dtype"] = "datetime"
+                entry["date_format"] = date_format
+        columns[column] = entry
+    return {"columns": columns, "na_values": NA_VALUES, "thousands": ","}
+
+
+def build_schema_registry(raw_dir=RAW_DATA_DIR, prepared_dir=PREPARED_DATA_DIR, sample_rows=1000):
+    """
+    Record column names, dtypes, date formats and NA tokens for every raw and prepared CSV file.
+
+    Types come from EXPECTED_DTYPES where the column is listed there and from
+    a sample of the file otherwise. "consumers" lists, per reader, the
+    columns it needs from each source: "prepare" reads the raw columns that
+    become a WAREHOUSE_COLUMNS column, "warehouse" reads those prepared
+    columns, so anything else in the files is never parsed. Sources that
+    WAREHOUSE_COLUMNS does not list are read whole.
+    """
+    registry = {"sources": {}, "consumers": {"prepare": {}, "warehouse": {}}}
+    for path in sorted(Path(raw_dir).glob("*.csv")):
+        source = _register_source(path, sample_rows, prepared=False)
+        registry["sources"][path.name] = source
+        stored = WAREHOUSE_COLUMNS.get(path.stem)
+        registry["consumers"]["prepare"][path.name] = [
+            column for column, entry in source["columns"].items()
+            if stored is None or entry["standard_name"].lower() in stored
+        ]
+
+    for path in sorted(Path(prepared_dir).glob("*.csv")):
+        source = _register_source(path, sample_rows, prepared=True)
+        registry["sources"][path.name] = source
+        stored = WAREHOUSE_COLUMNS.get(path.stem.removeprefix("prepared_"))
+        registry["consumers"]["warehouse"][path.name] = [column for column in source["columns"] if stored is None or column in stored]
+    return registry
+
+
+def save_schema_registry(registry, path=SCHEMA_REGISTRY_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(registry, indent=2))
+
+
+_loaded_registries = {}
+
+
+def load_schema_registry(path=SCHEMA_REGISTRY_PATH):
+    """Return the registry, generating and saving it on first use if the file does not exist."""
+    path = Path(path)
+    key = str(path.resolve())
+    if key not in _loaded_registries:
+        if path.exists():
+            _loaded_registries[key] = json.loads(path.read_text())
+        else:
+            registry = build_schema_registry()
+            save_schema_registry(registry, path)
+            _loaded_registries[key] = registry
+    return _loaded_registries[key]
+
+
+def read_source(path, consumer="prepare", source=None, registry=None):
+    """
+    Read a CSV file with the dtypes, date formats and columns recorded in the schema registry.
+
+    source names the registry entry when the file name differs from it
+    (e.g. an inbox batch of sales rows uses "sales_data.csv"). Files the
+    registry does not know, or whose contents no longer match it, are read
+    with plain type inference and a warning.
+    """
+    path = Path(path)
+    registry = load_schema_registry() if registry is None else registry
+    name = source or path.name
+    entry = registry["sources"].get(name)
+    if entry is None:
+        logger.warning(f"{name} is not in the schema registry; reading with type inference.")
+        return pd.read_csv(path, na_values=NA_VALUES, thousands=",")
+
+    usecols = registry["consumers"].get(consumer, {}).get(name, list(entry["columns"]))
+    dtypes = {column: entry["columns"][column]["dtype"] for column in usecols if entry["columns"][column]["dtype"] != "datetime"}
+    date_columns = [column for column in usecols if entry["columns"][column]["dtype"] == "datetime"]
+    try:
+        df = pd.read_csv(
+            path,
+            usecols=usecols,
+            dtype=dtypes,
+            na_values=entry["na_values"],
+            keep_default_na=True,
+            thousands=entry["thousands"],
+        )
+        for column in date_columns:
+            df[column] = pd.to_datetime(df[column], format=entry["columns"][column]["date_format"])
+        # usecols does not keep the requested order
+        return df[usecols]
+    except (ValueError, TypeError) as error:
+        logger.warning(f"{path} does not match the schema registry ({error}); reading with type inference.")
+        return pd.read_csv(path, na_values=entry["na_values"], thousands=entry["thousands"])
+
+
+def with_ingested_sales(df, path, archive_dir=INGEST_ARCHIVE_DIR, scheduler=DASK_SCHEDULER):
+    """
+    Add the rows of the archived ingest batches to a raw sales file read for a full rebuild.
+
+    The ingest daemon loads inbox files straight into the warehouse and
+    archives them; without this a rebuild from data/raw would drop their
+    rows. A transaction in several files takes its values from the most
+    recently modified one (the daemon stamps each archived file with the
+    time it was loaded), as the warehouse did. Other files are returned
+    unchanged. df may be a pandas or a dask DataFrame.
+    """
+    path = Path(path)
+    archive_dir = Path(archive_dir)
+    batches = sorted(archive_dir.glob("*.csv"), key=lambda batch: batch.stat().st_mtime) if archive_dir.exists() else []
+    if path.name != INGESTED_SOURCE or not batches:
+        return df
+
+    archived = pd.concat(
+        [read_source(batch, source=INGESTED_SOURCE).assign(_loaded=batch.stat().st_mtime) for batch in batches],
+        ignore_index=True,
+    )
+    archived = archived.dropna(subset=[INGESTED_KEY])
+    # Within the archive the last delivery of a transaction replaced the earlier ones
+    archived = archived[archived["_loaded"] == archived.groupby(INGESTED_KEY)["_loaded"].transform("max")]
+    snapshot_time = path.stat().st_mtime
+    newer = archived["_loaded"] > snapshot_time
+    older_keys = archived.loc[~newer, INGESTED_KEY].unique().tolist()
+
+    # Rows loaded after the snapshot was written replace it; the snapshot replaces older ones
+    df = df[~df[INGESTED_KEY].isin(archived.loc[newer, INGESTED_KEY].unique().tolist())]
+    in_snapshot = df.loc[df[INGESTED_KEY].isin(older_keys), INGESTED_KEY]
+    if _is_dask(df):
+        in_snapshot = in_snapshot.compute(scheduler=scheduler)
+    archived = archived[newer | ~archived[INGESTED_KEY].isin(in_snapshot)].reindex(columns=df.columns)
+    logger.info(f"Adding {len(archived)} rows from {len(batches)} ingested batches in {archive_dir}.")
+    if _is_dask(df):
+        import dask.dataframe as dd
+
+        return dd.concat([df, dd.from_pandas(archived, npartitions=1)])
+    return pd.concat([df, archived], ignore_index=True)
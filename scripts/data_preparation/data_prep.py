@@ -1,11 +1,10 @@
 import pandas as pd
 import numpy as np
-from scipy import stats
 import logging
 from pathlib import Path
+from common_utils import normalize_numeric_columns, read_source
 
-# Setup for logging
-logging.basicConfig(level=logging.INFO)
+# Setup for logging (handlers are configured in main)
 logger = logging.getLogger(__name__)
 
 # Constants for standardization and expected data types
@@ -43,7 +42,8 @@ EXPECTED_DTYPES = {
     "Product_ID": "int64",
     "Sale_Amount_USD": "float64",
     "Purchase_Date": "datetime64",
-    "Quantity_Sold": "int64"
+    "Quantity_Sold": "int64",
+    "Customer_Lifetime_Value": "float64"
 }
 
 # Define file paths
@@ -82,9 +82,11 @@ def clean_data(df, required_columns, change_log=None):
             change_log.append(f"Dropped {duplicates_before - duplicates_after} duplicate rows.")
 
     # Ensure correct data types for specified columns
+    numeric_dtypes = {col: dtype for col, dtype in EXPECTED_DTYPES.items() if not dtype.startswith("datetime")}
+    df = normalize_numeric_columns(df, numeric_dtypes, change_log)
     for column, dtype in EXPECTED_DTYPES.items():
-        if column in df.columns:
-            df[column] = pd.to_numeric(df[column], errors="coerce")
+        if column in df.columns and dtype.startswith("datetime"):
+            df[column] = pd.to_datetime(df[column], errors="coerce")
     logger.info(f"Data types after conversion: {df.dtypes.to_dict()}")
 
     return df
@@ -94,6 +96,8 @@ def handle_outliers_zscore(df, column, threshold=3, change_log=None):
         logger.warning(f"Column {column} not found in the DataFrame. Skipping outlier handling.")
         return df
 
+    from scipy import stats  # imported on first use to keep module import fast
+
     z_scores = stats.zscore(df[column].dropna())
     abs_z_scores = np.abs(z_scores)
     outliers = abs_z_scores > threshold
@@ -106,8 +110,8 @@ def handle_outliers_zscore(df, column, threshold=3, change_log=None):
     return df
 
 def process_data(filename):
-    # Define missing value representations and read the file
-    df = pd.read_csv(RAW_DATA_DIR / filename, na_values=["", "N/A", "NULL"])
+    # Read with the registered dtypes, NA tokens and date format
+    df = read_source(RAW_DATA_DIR / filename)
     change_log = []
 
     # Log number of raw records
@@ -168,6 +172,7 @@ def process_data(filename):
     return df_cleaned
 
 def main():
+    logging.basicConfig(level=logging.INFO)
     for filename in ["customers_data.csv", "products_data.csv", "sales_data.csv"]:
         process_data(filename)
 
@@ -1,17 +1,17 @@
 import logging
 import os
-import unittest
+from concurrent.futures import Executor, ThreadPoolExecutor
 from pathlib import Path
-import sys
-from io import StringIO
+from typing import Dict, Optional
+import numpy as np
 import pandas as pd
 
 # Import DataScrubber from the scripts module
 from scripts.data_scrubber import DataScrubber  # noqa: E402
+from scripts.data_preparation.common_utils import normalize_numeric_columns, read_source, with_ingested_sales  # noqa: E402
 
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging (handlers are configured in main)
 logger = logging.getLogger(__name__)
 
 # Constants for standardization and expected data types
@@ -49,7 +49,23 @@ EXPECTED_DTYPES = {
     "Product_ID": "int64",
     "Sale_Amount_USD": "float64",
     "Purchase_Date":"datetime64[ns]",
-    "Quantity_Sold":"int64"
+    "Quantity_Sold":"int64",
+    "Customer_Lifetime_Value": "float64",
+    "Customer_Join_Date": "datetime64[ns]"
+}
+
+# Low-cardinality text columns normalized on their distinct values (after standardize_column_names)
+CATEGORY_TEXT_COLUMNS = ["customer_region", "customer_tier", "product_category", "payment_method", "sales_channel"]
+
+# Spelling variants seen in the source systems -> canonical value
+TEXT_SYNONYMS = {
+    "in-store": "In Store",
+    "instore": "In Store",
+    "in store": "In Store",
+    "on-line": "Online",
+    "online": "Online",
+    "telephone": "Phone",
+    "phone": "Phone",
 }
 
 # Define file paths
@@ -57,15 +73,13 @@ RAW_DATA_DIR = Path("data/raw")
 PREPARED_DATA_DIR = Path("data/prepared")
 REPORT_DIR = Path("data/report")
 
-# Ensure the output directories exist
-PREPARED_DATA_DIR.mkdir(parents=True, exist_ok=True)
-REPORT_DIR.mkdir(parents=True, exist_ok=True)
-
 def handle_outliers_zscore(df, column, threshold=3, change_log=None):
     if column not in df.columns:
         logger.warning(f"Column {column} not found in the DataFrame. Skipping outlier handling.")
         return df
 
+    from scipy import stats  # imported on first use to keep module import fast
+
     z_scores = stats.zscore(df[column].dropna())
     abs_z_scores = np.abs(z_scores)
     outliers = abs_z_scores > threshold
@@ -77,93 +91,191 @@ def handle_outliers_zscore(df, column, threshold=3, change_log=None):
         df = df[~outliers]
     return df
 
-def process_data(filename: str):
-    try:
-
-        # Load data from file
-        df = pd.read_csv(filename)
-
-         # Standardize column names
-        df = df.rename(columns=COLUMN_STANDARDIZATION)
-
-        # Convert columns to the expected data types
-        for column, dtype in EXPECTED_DTYPES.items():
-            if column in df.columns:
-                df[column] = df[column].astype(dtype)
-
-        # Initialize the DataScrubber with the loaded DataFrame
+def clean_dataframe(df: pd.DataFrame, change_log: list, remove_outliers: bool = True, persist: bool = False) -> pd.DataFrame:
+    """Run the DataScrubber cleaning steps on a raw DataFrame and return the prepared DataFrame.
+
+    Pass remove_outliers=False for partial batches, where a z-score over a few rows means nothing.
+    persist=True lets the dask backend keep its input in worker memory between steps
+    (only for files that fit in memory).
+    """
+    # Standardize column names
+    df = df.rename(columns=COLUMN_STANDARDIZATION)
+
+    # Parse formatted numbers ("$5,000") the C parser could not handle
+    numeric_dtypes = {col: dtype for col, dtype in EXPECTED_DTYPES.items() if not dtype.startswith("datetime")}
+    df = normalize_numeric_columns(df, numeric_dtypes)
+
+    # Convert columns to the expected data types
+    for column, dtype in EXPECTED_DTYPES.items():
+        if column in df.columns:
+            df[column] = df[column].astype(dtype)
+
+    # Initialize the DataScrubber with the loaded DataFrame
+    if type(df).__module__.startswith("dask"):
+        scrubber = DataScrubber(df, persist=persist)
+    else:
         scrubber = DataScrubber(df)
 
-         # Initialize change log
-        change_log = []
+    # Step 1: Standardize column names using the DataScrubber
+    df = scrubber.standardize_column_names()
+    change_log.append("Standardized column names.")
 
-        # Step 1: Standardize column names using the DataScrubber
-        df = scrubber.standardize_column_names()
-        change_log.append("Standardized column names.")
+    # Trim, collapse whitespace and map synonyms on the distinct values of the text columns
+    text_columns = [column for column in CATEGORY_TEXT_COLUMNS if column in df.columns]
+    if text_columns:
+        df = scrubber.normalize_string_columns(text_columns, synonyms=TEXT_SYNONYMS, change_log=change_log)
 
-        # Step 2: Perform initial consistency check (null counts, duplicates)
-        consistency_before = scrubber.check_data_consistency_before_cleaning()
-        logger.info(f"Consistency check before cleaning: {consistency_before}")
-        change_log.append(f"Consistency before cleaning: {consistency_before}")
+    # Step 2: Perform initial consistency check (null counts, duplicates)
+    consistency_before = scrubber.check_data_consistency_before_cleaning()
+    logger.info(f"Consistency check before cleaning: {consistency_before}")
+    change_log.append(f"Consistency before cleaning: {consistency_before}")
 
-        # Step 3: Handle missing data (fill or drop)
-        df = scrubber.handle_missing_data(drop=True, fill_value=0)  # Example of filling missing data with 0
-        change_log.append("Filled missing data with 0.")
+    # Step 3: Handle missing data (fill or drop)
+    df = scrubber.handle_missing_data(drop=True, fill_value=0)  # Example of filling missing data with 0
+    change_log.append("Filled missing data with 0.")
 
-        # Step 4: Remove duplicate records
-        df = scrubber.remove_duplicate_records()
-        change_log.append("Removed duplicate records.")
+    # Step 4: Remove duplicate records
+    df = scrubber.remove_duplicate_records()
+    change_log.append("Removed duplicate records.")
 
-  # Step 5: Remove rows with outliers in 'Quantity_Sold'
-  
-     # Handle outliers if applicable
-        if "quantity_sold" in df.columns:
-        	df = scrubber.remove_outliers_zscore("quantity_sold", threshold=3, change_log=change_log)
+    # Step 5: Remove rows with outliers in 'Quantity_Sold'
+    if remove_outliers and "quantity_sold" in df.columns:
+        df = scrubber.remove_outliers_zscore("quantity_sold", threshold=3, change_log=change_log)
 
-        # Step 6: Perform final consistency check after cleaning
-        consistency_after = scrubber.check_data_consistency_after_cleaning()
-        logger.info(f"Consistency check after cleaning: {consistency_after}")
-        change_log.append(f"Consistency after cleaning: {consistency_after}")
+    # Step 6: Perform final consistency check after cleaning
+    consistency_after = scrubber.check_data_consistency_after_cleaning()
+    logger.info(f"Consistency check after cleaning: {consistency_after}")
+    change_log.append(f"Consistency after cleaning: {consistency_after}")
 
-        # Step 7:  Generate cleaned file path by maintaining the same folder structure
-        original_stem = Path(filename).stem
-        new_filename = f"prepared_{original_stem}.csv"
-        prepared_file_path = PREPARED_DATA_DIR / new_filename
+    return df
 
-        
-        # Ensure the cleaned data directory exists
-        os.makedirs(os.path.dirname(prepared_file_path), exist_ok=True)
+def read_raw_file(filename) -> pd.DataFrame:
+    """Read one raw file with the registered schema; sales_data.csv also gets the rows the ingest daemon loaded."""
+    return with_ingested_sales(read_source(filename), filename)
+
+def prepared_path_for(filename) -> Path:
+    """Return data/prepared/prepared_<stem>.csv for a raw file name."""
+    return PREPARED_DATA_DIR / f"prepared_{Path(filename).stem}.csv"
+
+def write_prepared_file(filename, df: pd.DataFrame) -> Path:
+    """Write a cleaned DataFrame to its data/prepared CSV file."""
+    prepared_file_path = prepared_path_for(filename)
+    os.makedirs(os.path.dirname(prepared_file_path), exist_ok=True)
+    df.to_csv(prepared_file_path, index=False)
+    logger.info(f"Cleaned data saved to {prepared_file_path}")
+    return prepared_file_path
+
+def save_report(filename, change_log: list) -> Path:
+    """Save the condensed report of changes made during cleaning."""
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    report_filename = Path(REPORT_DIR) / f"{Path(filename).stem}_report.txt"
+    with open(report_filename, "w") as report_file:
+        report_file.write("\n".join(change_log))
+    logger.info(f"Data cleaning report saved to {report_filename}")
+    return report_filename
+
+def save_error_report(filename, error: Exception) -> None:
+    """Save the error message to a report file."""
+    error_report = f"An error occurred during data cleaning: {str(error)}"
+    error_report_filename = os.path.join(REPORT_DIR, f"{os.path.basename(filename).replace('.csv', '_error_report.txt')}")
+    os.makedirs(REPORT_DIR, exist_ok=True)  # Ensure the reports folder exists
+    with open(error_report_filename, "w") as error_report_file:
+        error_report_file.write(error_report)
+    logger.info(f"Error report saved to {error_report_filename}")
+
+def process_data(filename: str, backend: str = "pandas", persist: bool = False):
+    """
+    Clean one raw file. backend="dask" reads and cleans it out of core in partitions.
+
+    persist=True keeps the dask backend's data in memory between steps (see scripts/dask_scrubber.py).
+    """
+    try:
 
-        # Save the cleaned data to the new location with "_prepared" appended to the filename
-        df.to_csv(prepared_file_path, index=False)
-        logger.info(f"Cleaned data saved to {prepared_file_path}")
+        # Load data from file with the registered schema
+        if backend == "dask":
+            from scripts.dask_scrubber import read_csv_dask
+            df = with_ingested_sales(read_csv_dask(filename), filename)
+        else:
+            df = read_raw_file(filename)
 
+        # Initialize change log
+        change_log = []
 
+        # Steps 1-6: clean the data with the DataScrubber
+        df = clean_dataframe(df, change_log, persist=persist)
 
-        # Step 8:  Generate the condensed report of changes made during cleaning
-        report = "\n".join(change_log)
-     
-  
-        # Save the report to the reports folder
-        
-        report_filename = Path(REPORT_DIR) / f"{Path(filename).stem}_report.txt"
-        with open(report_filename, "w") as report_file:
-            report_file.write(report)
-        logger.info(f"Data cleaning report saved to {report_filename}")
+        # Step 7:  Save the cleaned data to data/prepared with "prepared_" prepended to the filename
+        if backend == "dask":
+            from scripts.dask_scrubber import process_scheduler
+            prepared_file_path = prepared_path_for(filename)
+            os.makedirs(os.path.dirname(prepared_file_path), exist_ok=True)
+            df.to_csv(str(prepared_file_path), single_file=True, index=False, compute_kwargs={"scheduler": process_scheduler()})
+            logger.info(f"Cleaned data saved to {prepared_file_path}")
+        else:
+            write_prepared_file(filename, df)
 
+        # Step 8:  Save the condensed report of changes made during cleaning
+        save_report(filename, change_log)
 
     except Exception as e:
         logger.error(f"An error occurred: {e}")
+        save_error_report(filename, e)
 
-        # Save the error message to a report file
-        error_report = f"An error occurred during data cleaning: {str(e)}"
-        error_report_filename = os.path.join(REPORT_DIR, f"{os.path.basename(filename).replace('.csv', '_error_report.txt')}")
-        os.makedirs(REPORT_DIR, exist_ok=True)  # Ensure the reports folder exists
-        with open(error_report_filename, "w") as error_report_file:
-            error_report_file.write(error_report)
-        logger.info(f"Error report saved to {error_report_filename}")
-
-def main():
+def _write_side_output(filename, df: pd.DataFrame) -> None:
+    # Runs on a background thread; a failed write must not go unnoticed
+    try:
+        write_prepared_file(filename, df)
+    except Exception as e:
+        logger.error(f"Could not write the prepared file for {Path(filename).name}: {e}")
+        save_error_report(filename, e)
+
+def prepare_frames(raw_dir: Path = RAW_DATA_DIR, side_output: Optional[Executor] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Clean every raw file and return the cleaned DataFrames keyed by file stem ("sales_data", ...).
+
+    With side_output, the prepared CSV files are written on that executor
+    while the next file is cleaned; without it no prepared files are written.
+    Cleaning reports are always saved.
+    """
+    frames = {}
+    for file_path in sorted(Path(raw_dir).glob("*.csv")):
+        logger.info(f"Processing file: {file_path.name}")
+        try:
+            change_log = []
+            df = clean_dataframe(read_raw_file(file_path), change_log)
+        except Exception as e:
+            logger.error(f"An error occurred: {e}")
+            save_error_report(file_path, e)
+            continue
+        frames[file_path.stem] = df
+        save_report(file_path, change_log)
+        if side_output is not None:
+            side_output.submit(_write_side_output, file_path, df)
+    return frames
+
+def prepare_and_load(write_prepared: bool = True, **load_options) -> None:
+    """
+    Clean the raw files and hand the DataFrames straight to the warehouse loader.
+
+    This skips writing the prepared CSV files and parsing them back, so the
+    loader gets the cleaned dtypes as they are. write_prepared=True still
+    writes data/prepared in a background thread as a side output.
+    load_options go to etl_to_dw.load_data_to_db (staged, in_memory, ...).
+    A raw file that is missing or fails to clean raises RuntimeError
+    before anything is loaded.
+    """
+    from scripts import etl_to_dw
+
+    with ThreadPoolExecutor(max_workers=1) as writer:
+        frames = prepare_frames(side_output=writer if write_prepared else None)
+        missing = [RAW_DATA_DIR.joinpath(f"{stem}.csv").as_posix() for stem in etl_to_dw.TABLE_FOR_STEM if stem not in frames]
+        if missing:
+            raise RuntimeError(f"Could not prepare {', '.join(missing)}; see the error reports in {REPORT_DIR}. The live warehouse was not replaced.")
+        tables = {etl_to_dw.TABLE_FOR_STEM[stem]: df for stem, df in frames.items() if stem in etl_to_dw.TABLE_FOR_STEM}
+        etl_to_dw.load_data_to_db(frames=tables, **load_options)
+
+def main(backend: str = "pandas", persist: bool = False):
+    logging.basicConfig(level=logging.INFO)
     raw_data_dir = Path("data/raw")
     if not raw_data_dir.exists():
         logger.error(f"Directory not found: {raw_data_dir}")
@@ -172,7 +284,7 @@ def main():
     for file_path in raw_data_dir.glob("*.csv"):
         logger.info(f"Processing file: {file_path.name}")
         try:
-            process_data(file_path)
+            process_data(file_path, backend=backend, persist=persist)
         except Exception as e:
             logger.error(f"Error processing {file_path.name}: {e}")
 
@@ -1,10 +1,9 @@
 import pandas as pd
-from common_utils import standardize_column_names, clean_data, handle_outliers_zscore, COLUMN_STANDARDIZATION
+from common_utils import standardize_column_names, clean_data, handle_outliers_zscore, read_source, COLUMN_STANDARDIZATION
 from pathlib import Path
 import logging
 
-# Setup for logging
-logging.basicConfig(level=logging.INFO)
+# Setup for logging (handlers are configured in main)
 logger = logging.getLogger(__name__)
 
 # Define file paths
@@ -13,7 +12,7 @@ PREPARED_DATA_DIR = Path("data/prepared")
 REPORT_DIR = Path("data/reports")
 
 def process_sales_data(filename):
-    df = pd.read_csv(RAW_DATA_DIR / filename, na_values=["", "N/A", "NULL"])
+    df = read_source(RAW_DATA_DIR / filename)
     change_log = []
 
     logger.info(f"Raw records count for {filename}: {len(df)}")
@@ -52,6 +51,7 @@ def process_sales_data(filename):
         logger.info(f"Sales data cleaning report saved.")
 
 def main():
+    logging.basicConfig(level=logging.INFO)
     process_sales_data("sales_data.csv")
 
 if __name__ == "__main__":
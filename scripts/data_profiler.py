@@ -0,0 +1,157 @@
+"""
+scripts/data_profiler.py
+
+Column profiling engine used by DataScrubber.
+
+profile_dataframe() computes everything the consistency checks and reports
+need in one call, using whole-column numpy operations:
+- null counts per column
+- count, mean, std, min and max for numeric columns
+- fixed-width histograms for numeric columns
+- approximate distinct counts per column (HyperLogLog)
+- the number of fully duplicated rows
+
+Each column is hashed once with pd.util.hash_pandas_object. The column
+hashes feed the HyperLogLog sketches and are folded into one uint64 hash
+per row, so the duplicate check works on a single column instead of
+building a hash table over every column of the frame.
+"""
+
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+
+
+class HyperLogLog:
+    """Approximate distinct counter over 64-bit hashes (Flajolet et al., 2007)."""
+
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 16:
+            raise ValueError("HyperLogLog precision must be between 4 and 16.")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        """Add an array of uint64 hashes to the sketch."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if hashes.size == 0:
+            return
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.intp)
+        remainder = hashes << p
+        rank = np.minimum(_leading_zeros(remainder), 64 - self.precision) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Fold another sketch with the same precision into this one."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision.")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> int:
+        """Return the estimated number of distinct hashes added."""
+        m = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros > 0:
+            # Small-range correction (linear counting)
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+# Odd 64-bit constant used to fold column hashes into row hashes
+_ROW_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _leading_zeros(values: np.ndarray) -> np.ndarray:
+    """Vectorized count of leading zero bits in uint64 values."""
+    values = values.copy()
+    zeros = np.zeros(values.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        empty_top = (values >> np.uint64(64 - shift)) == 0
+        zeros += shift * empty_top
+        values = np.where(empty_top, values << np.uint64(shift), values)
+    zeros[values == 0] = 64
+    return zeros
+
+
+def profile_dataframe(df: pd.DataFrame, histogram_bins: int = 10, hll_precision: int = 12) -> Dict:
+    """
+    Profile every column of df in one call.
+
+    Returns a dict with keys row_count, null_counts (pd.Series),
+    duplicate_count, distinct_counts (pd.Series, approximate),
+    numeric_summary (pd.DataFrame shaped like DataFrame.describe() without
+    quartiles) and histograms ({column: (counts, bin_edges)}).
+    """
+    null_counts = df.isna().sum()
+
+    distinct_counts = {}
+    row_hashes = np.zeros(len(df), dtype=np.uint64)
+    for position in range(df.shape[1]):
+        values = df.iloc[:, position]
+        column_hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        sketch = HyperLogLog(hll_precision)
+        sketch.add_hashes(column_hashes[values.notna().to_numpy()])
+        distinct_counts[df.columns[position]] = sketch.count()
+        row_hashes = row_hashes * _ROW_HASH_MULTIPLIER ^ column_hashes
+
+    if df.shape[1] > 0:
+        duplicate_count = int(pd.Series(row_hashes).duplicated().sum())
+    else:
+        duplicate_count = 0
+
+    numeric_df = df.select_dtypes(include="number")
+    numeric_summary = pd.DataFrame(index=["count", "mean", "std", "min", "max"], columns=numeric_df.columns, dtype="float64")
+    histograms = {}
+    if not numeric_df.empty:
+        matrix = numeric_df.to_numpy(dtype="float64", na_value=np.nan)
+        present = ~np.isnan(matrix)
+        counts = present.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sums = np.where(present, matrix, 0.0).sum(axis=0)
+            means = sums / counts
+            squares = np.where(present, (matrix - means) ** 2, 0.0).sum(axis=0)
+            stds = np.sqrt(squares / (counts - 1))
+        stds[counts < 2] = np.nan
+        mins = np.where(present, matrix, np.inf).min(axis=0)
+        maxs = np.where(present, matrix, -np.inf).max(axis=0)
+        mins[counts == 0] = np.nan
+        maxs[counts == 0] = np.nan
+        numeric_summary.loc["count"] = counts
+        numeric_summary.loc["mean"] = means
+        numeric_summary.loc["std"] = stds
+        numeric_summary.loc["min"] = mins
+        numeric_summary.loc["max"] = maxs
+
+        for position, column in enumerate(numeric_df.columns):
+            column_values = matrix[present[:, position], position]
+            if column_values.size > 0:
+                histograms[column] = np.histogram(column_values, bins=histogram_bins)
+
+    return {
+        "row_count": len(df),
+        "null_counts": null_counts,
+        "duplicate_count": duplicate_count,
+        "distinct_counts": pd.Series(distinct_counts, dtype="int64"),
+        "numeric_summary": numeric_summary,
+        "histograms": histograms,
+    }
+
+
+def format_profile(profile: Optional[Dict]) -> str:
+    """Render a profile as the text block used in DataScrubber reports."""
+    if profile is None:
+        return "Not available"
+    overview = pd.DataFrame({
+        "nulls": profile["null_counts"],
+        "approx_distinct": profile["distinct_counts"],
+    })
+    return "\n".join([
+        f"Rows: {profile['row_count']}",
+        f"Duplicate rows: {profile['duplicate_count']}",
+        overview.to_string(),
+        profile["numeric_summary"].to_string(),
+    ])
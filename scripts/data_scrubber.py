@@ -15,21 +15,68 @@ See the associated test script in the tests folder.
 
 import io
 import pandas as pd
-from typing import Dict, Tuple, Union, List
-from scipy import stats
+from typing import Dict, Optional, Tuple, Union, List
 import numpy as np
+from scripts.data_profiler import profile_dataframe, format_profile
+from scripts.data_preparation.common_utils import groupwise_outlier_mask, removed_counts_by_group
 
 class DataScrubber:
+    def __new__(cls, df, *args, **kwargs):
+        # A dask DataFrame gets the out-of-core backend with the same methods
+        if cls is DataScrubber and type(df).__module__.startswith("dask"):
+            from scripts.dask_scrubber import DaskDataScrubber
+            return super().__new__(DaskDataScrubber)
+        return super().__new__(cls)
+
     def __init__(self, df: pd.DataFrame):
         self.df = df
         self.report = {}
 
-    def remove_outliers_iqr(self, column_name: str, change_log=None) -> pd.DataFrame:
+    @property
+    def df(self) -> pd.DataFrame:
+        return self._df
+
+    @df.setter
+    def df(self, value: pd.DataFrame) -> None:
+        # Replacing the frame invalidates the cached profile
+        self._df = value
+        self._profile = None
+
+    def invalidate_profile(self) -> None:
+        """Drop the cached profile. Call this after mutating self.df in place from outside the class."""
+        self._profile = None
+
+    def profile(self) -> Dict:
+        """Return null counts, numeric stats, approximate distinct counts, histograms and duplicate count.
+
+        The profile is computed once and reused until a mutating method changes the data.
+        """
+        if self._profile is None:
+            self._profile = profile_dataframe(self.df)
+        return self._profile
+
+    def _remove_outliers_by_group(self, column_name: str, by: List[str], method: str, threshold=3, change_log=None) -> pd.DataFrame:
+        keep = groupwise_outlier_mask(self.df, column_name, by, method, threshold)
+        removed = removed_counts_by_group(self.df, keep, by)
+        self.df = self.df[keep]
+        self._record_group_outliers(column_name, by, method, removed, change_log)
+        return self.df
+
+    def _record_group_outliers(self, column_name: str, by: List[str], method: str, removed: Dict, change_log=None) -> None:
+        self.report.setdefault('outliers_removed_by_group', {})[f"{column_name} by {by} ({method})"] = removed
+        if removed and change_log is not None:
+            change_log.append(f"Removed {sum(removed.values())} outliers from column '{column_name}' using {method} within groups of {by} ({len(removed)} groups affected).")
+
+    def remove_outliers_iqr(self, column_name: str, change_log=None, by: Optional[List[str]] = None) -> pd.DataFrame:
+        """Drop rows outside 1.5 IQR of column_name; with by (e.g. ["product_id"]) the quartiles are per group."""
         if column_name not in self.df.columns:
             if change_log is not None:
                 change_log.append(f"Column '{column_name}' not found for IQR outlier removal.")
             return self.df
 
+        if by:
+            return self._remove_outliers_by_group(column_name, list(by), "iqr", change_log=change_log)
+
         Q1 = self.df[column_name].quantile(0.25)
         Q3 = self.df[column_name].quantile(0.75)
         IQR = Q3 - Q1
@@ -45,12 +92,18 @@ class DataScrubber:
     
         return self.df
 
-    def remove_outliers_zscore(self, column_name: str, threshold=3, change_log=None) -> pd.DataFrame:
+    def remove_outliers_zscore(self, column_name: str, threshold=3, change_log=None, by: Optional[List[str]] = None) -> pd.DataFrame:
+        """Drop rows with |z| above threshold; with by the mean and std are per group and constant groups are kept."""
         if column_name not in self.df.columns:
             if change_log is not None:
                 change_log.append(f"Column '{column_name}' not found for Z-score outlier removal.")
             return self.df
 
+        if by:
+            return self._remove_outliers_by_group(column_name, list(by), "zscore", threshold, change_log)
+
+        from scipy import stats  # imported on first use to keep module import fast
+
         z_scores = stats.zscore(self.df[column_name].dropna())
         abs_z_scores = np.abs(z_scores)
         mask = abs_z_scores <= threshold
@@ -78,15 +131,17 @@ class DataScrubber:
         return self.df
 
     def check_data_consistency_before_cleaning(self) -> Dict[str, Union[pd.Series, int]]:
-        null_counts = self.df.isnull().sum()
-        duplicate_count = self.df.duplicated().sum()
+        profile = self.profile()
+        null_counts = profile['null_counts']
+        duplicate_count = profile['duplicate_count']
         self.report['null_counts_before'] = null_counts
         self.report['duplicate_count_before'] = duplicate_count
         return {'null_counts': null_counts, 'duplicate_count': duplicate_count}
 
     def check_data_consistency_after_cleaning(self) -> Dict[str, Union[pd.Series, int]]:
-        null_counts = self.df.isnull().sum()
-        duplicate_count = self.df.duplicated().sum()
+        profile = self.profile()
+        null_counts = profile['null_counts']
+        duplicate_count = profile['duplicate_count']
         self.report['null_counts_after'] = null_counts
         self.report['duplicate_count_after'] = duplicate_count
         assert null_counts.sum() == 0, "Data still contains null values after cleaning."
@@ -96,6 +151,7 @@ class DataScrubber:
     def convert_column_to_new_data_type(self, column: str, new_type: type) -> pd.DataFrame:
         try:
             self.df[column] = self.df[column].astype(new_type)
+            self.invalidate_profile()
             return self.df
         except KeyError:
             raise ValueError(f"Column name '{column}' not found in the DataFrame.")
@@ -116,18 +172,69 @@ class DataScrubber:
             raise ValueError(f"Column name '{column}' not found in the DataFrame.")
 
     def format_column_strings_to_lower_and_trim(self, column: str) -> pd.DataFrame:
-        try:
-            self.df[column] = self.df[column].str.lower().str.strip()
-            return self.df
-        except KeyError:
-            raise ValueError(f"Column name '{column}' not found in the DataFrame.")
+        return self.normalize_string_columns([column], case="lower", collapse_whitespace=False)
 
     def format_column_strings_to_upper_and_trim(self, column: str) -> pd.DataFrame:
-        try:
-            self.df[column] = self.df[column].str.upper().str.strip()
-            return self.df
-        except KeyError:
-            raise ValueError(f"Column name '{column}' not found in the DataFrame.")
+        return self.normalize_string_columns([column], case="upper", collapse_whitespace=False)
+
+    def normalize_string_columns(self, columns: List[str], case: Optional[str] = None, trim: bool = True,
+                                 collapse_whitespace: bool = True, synonyms: Optional[Dict[str, str]] = None,
+                                 as_category: bool = False, change_log=None) -> pd.DataFrame:
+        """Normalize text columns by transforming each distinct value once.
+
+        Each column is factorized, the transforms run on the distinct values
+        only, and the column is rebuilt from the codes. case is None, "lower",
+        "upper" or "title". synonyms maps variants to a canonical value (e.g.
+        {"in-store": "In Store"}); its keys go through the same transforms
+        and are compared casefolded, so they match however the raw data is
+        formatted, and the canonical value is kept as given. as_category=True
+        returns category columns; category input columns stay category columns.
+        """
+        for column in columns:
+            if column not in self.df.columns:
+                raise ValueError(f"Column name '{column}' not found in the DataFrame.")
+
+        if case not in (None, "lower", "upper", "title"):
+            raise ValueError(f"Unsupported case '{case}'. Use None, 'lower', 'upper' or 'title'.")
+
+        def transform(values: pd.Series) -> pd.Series:
+            if trim:
+                values = values.str.strip()
+            if collapse_whitespace:
+                values = values.str.replace(r"\s+", " ", regex=True)
+            if case is not None:
+                values = getattr(values.str, case)()
+            return values
+
+        lookup = {}
+        if synonyms:
+            keys = transform(pd.Series(list(synonyms), dtype=object)).str.casefold()
+            lookup = dict(zip(keys, synonyms.values()))
+
+        normalized_counts = self.report.setdefault('normalized_string_columns', {})
+        for column in columns:
+            codes, uniques = pd.factorize(self.df[column])
+            values = transform(pd.Series(uniques, dtype=object))
+            if lookup:
+                values = values.map(lambda value: lookup.get(value.casefold(), value) if isinstance(value, str) else value)
+
+            # Several raw values can collapse into one, so factorize the cleaned values again
+            value_codes, categories = pd.factorize(values)
+            new_codes = np.where(codes >= 0, value_codes[codes], -1) if len(value_codes) else codes
+            rebuilt = pd.Categorical.from_codes(new_codes, categories=categories)
+            result = pd.Series(rebuilt, index=self.df.index, name=column)
+            if as_category or isinstance(self.df[column].dtype, pd.CategoricalDtype):
+                # Casting back to the old categories would turn the cleaned values into NaN
+                self.df[column] = result
+            else:
+                self.df[column] = result.astype(object).astype(self.df[column].dtype)
+
+            normalized_counts[column] = (len(uniques), len(categories))
+            if change_log is not None and len(categories) < len(uniques):
+                change_log.append(f"Normalized column '{column}': {len(uniques)} distinct values -> {len(categories)}.")
+
+        self.invalidate_profile()
+        return self.df
 
     def handle_missing_data(self, drop: bool = False, fill_value: Union[None, float, int, str] = None) -> pd.DataFrame:
         if drop:
@@ -136,19 +243,20 @@ class DataScrubber:
         elif fill_value is not None:
             self.df = self.df.fillna(fill_value)
             self.report['missing_data_handling'] = f'Filled missing data with {fill_value}.'
-            self.report['null_counts_after'] = self.df.isnull().sum()
+            self.report['null_counts_after'] = self.profile()['null_counts']
         return self.df
 
     def inspect_data(self) -> Tuple[str, str]:
         buffer = io.StringIO()
         self.df.info(buf=buffer)
         info_str = buffer.getvalue()
-        describe_str = self.df.describe().to_string()
+        describe_str = self.profile()['numeric_summary'].to_string()
         return info_str, describe_str
 
     def parse_dates_to_add_standard_datetime(self, column: str) -> pd.DataFrame:
         try:
             self.df['StandardDateTime'] = pd.to_datetime(self.df[column])
+            self.invalidate_profile()
             return self.df
         except KeyError:
             raise ValueError(f"Column name '{column}' not found in the DataFrame.")
@@ -169,6 +277,7 @@ class DataScrubber:
 
     def standardize_column_names(self) -> pd.DataFrame:
         self.df.columns = [col.lower().replace(" ", "_") for col in self.df.columns]
+        self.invalidate_profile()
         return self.df
 
     def reorder_columns(self, columns: List[str]) -> pd.DataFrame:
@@ -198,4 +307,10 @@ class DataScrubber:
         report.append(str(self.report.get('outlier_dropped_rows', 'None')))
         report.append("\nRows dropped due to Z-score outliers:\n")
         report.append(str(self.report.get('outlier_dropped_rows_zscore', 'None')))
+        report.append("\nRows removed by group-wise outlier checks:\n")
+        report.append(str(self.report.get('outliers_removed_by_group', 'None')))
+        report.append("\nString columns normalized (distinct values before, after):\n")
+        report.append(str(self.report.get('normalized_string_columns', 'None')))
+        report.append("\nColumn profile:\n")
+        report.append(format_profile(self._profile))
         return "\n".join(report)
@@ -0,0 +1,128 @@
+"""
+scripts/duckdb_engine.py
+
+Embedded DuckDB engine for the canonical OLAP queries.
+
+SQLite runs each query on one thread over row-oriented pages. DuckDB runs
+in-process (no server) with multi-threaded, vectorized, columnar
+execution, so the region/category/month roll-ups use every core.
+olap_queries.run_query(..., engine="duckdb") runs the same SQL text here,
+against one of two sources:
+
+- the warehouse data/dw/smart_sales.db, attached read-only through DuckDB's
+  SQLite scanner (the sqlite extension, downloaded by DuckDB on first use)
+- the prepared files in data/prepared/, read directly: prepared_<stem>.parquet
+  when it exists, otherwise prepared_<stem>.csv. A Parquet copy older than
+  its CSV file (the prepare step ran since the export) is re-exported first.
+
+Only customer, product and sale exist in the prepared files, so queries on
+the warehouse's derived tables (customer_metrics) need the warehouse.
+DATE columns read from the files are exposed as YYYY-MM-DD text, as the
+warehouse stores them.
+
+Write Parquet copies of the prepared CSV files (much faster to scan than
+CSV) from the project root:
+
+    python -m scripts.duckdb_engine
+"""
+
+import logging
+import os
+import pathlib
+from typing import List, Optional, Sequence
+
+import duckdb
+import pandas as pd
+
+from scripts.etl_to_dw import DB_PATH, PREPARED_DATA_DIR, TABLE_FOR_STEM
+from scripts.olap_queries import CANONICAL_QUERIES
+
+logger = logging.getLogger(__name__)
+
+
+def _scan(path: pathlib.Path) -> str:
+    if path.suffix == ".parquet":
+        return f"read_parquet('{path.as_posix()}')"
+    return f"read_csv('{path.as_posix()}', header = true, thousands = ',')"
+
+
+def _copy_to_parquet(conn: duckdb.DuckDBPyConnection, source: pathlib.Path) -> pathlib.Path:
+    """Write the Parquet copy of one prepared CSV file atomically and return its path."""
+    target = source.with_suffix(".parquet")
+    temp = source.with_suffix(".parquet.tmp")
+    conn.execute(f"COPY (SELECT * FROM {_scan(source)}) TO '{temp.as_posix()}' (FORMAT parquet)")
+    os.replace(temp, target)
+    return target
+
+
+def _prepared_file(conn: duckdb.DuckDBPyConnection, prepared_dir: pathlib.Path, stem: str) -> pathlib.Path:
+    """The file to read for one prepared table: the Parquet copy, refreshed first if the CSV is newer."""
+    source = prepared_dir.joinpath(f"prepared_{stem}.csv")
+    parquet = source.with_suffix(".parquet")
+    if not parquet.exists():
+        return source
+    if source.exists() and source.stat().st_mtime > parquet.stat().st_mtime:
+        logger.warning(f"{parquet.name} is older than {source.name}; exporting it again.")
+        _copy_to_parquet(conn, source)
+    return parquet
+
+
+def connect(db_path: pathlib.Path = DB_PATH, prepared_dir: Optional[pathlib.Path] = None,
+            threads: Optional[int] = None) -> duckdb.DuckDBPyConnection:
+    """
+    Open an in-memory DuckDB connection over the warehouse (default) or,
+    when prepared_dir is given, over the prepared files in that folder.
+    threads defaults to DuckDB's own choice, one per core.
+    """
+    conn = duckdb.connect()
+    if threads:
+        conn.execute(f"SET threads = {int(threads)}")
+
+    if prepared_dir is None:
+        if not pathlib.Path(db_path).exists():
+            conn.close()
+            raise FileNotFoundError(f"Warehouse not found at {db_path}. Run the load step first.")
+        conn.execute(f"ATTACH '{pathlib.Path(db_path).as_posix()}' AS dw (TYPE sqlite, READ_ONLY)")
+        conn.execute("USE dw")
+        return conn
+
+    for stem, table in TABLE_FOR_STEM.items():
+        path = _prepared_file(conn, pathlib.Path(prepared_dir), stem)
+        if not path.exists():
+            conn.close()
+            raise FileNotFoundError(f"Prepared file not found at {path}. Run the prepare step first.")
+        columns = conn.execute(f"DESCRIBE SELECT * FROM {_scan(path)}").fetchall()
+        dates = [name for name, column_type, *_ in columns if column_type == "DATE"]
+        replace = ", ".join(f"strftime({name}, '%Y-%m-%d') AS {name}" for name in dates)
+        select = f"* REPLACE ({replace})" if dates else "*"
+        conn.execute(f"CREATE VIEW {table} AS SELECT {select} FROM {_scan(path)}")
+    return conn
+
+
+def run_query(name: str, conn: duckdb.DuckDBPyConnection, params: Optional[Sequence] = None) -> pd.DataFrame:
+    """Run one of the CANONICAL_QUERIES on a DuckDB connection and return the result."""
+    if name not in CANONICAL_QUERIES:
+        raise ValueError(f"Unknown query '{name}'. Choose from: {', '.join(CANONICAL_QUERIES)}")
+    return conn.execute(CANONICAL_QUERIES[name], params or []).df()
+
+
+def export_parquet(prepared_dir: pathlib.Path = PREPARED_DATA_DIR) -> List[pathlib.Path]:
+    """Write prepared_<stem>.parquet next to each prepared CSV file and return the paths written."""
+    written = []
+    conn = duckdb.connect()
+    try:
+        for stem in TABLE_FOR_STEM:
+            written.append(_copy_to_parquet(conn, pathlib.Path(prepared_dir).joinpath(f"prepared_{stem}.csv")))
+    finally:
+        conn.close()
+    return written
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    for path in export_parquet():
+        logger.info(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,58 @@
+import contextlib
+import os
 import pandas as pd
 import sqlite3
 import pathlib
+import shutil
 import sys
+import tempfile
+import time
+from typing import Dict, Iterator, List, Optional
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
 
 # For local imports, temporarily add project root to sys.path
 PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
+from scripts.data_preparation.common_utils import read_source  # noqa: E402
+from scripts.export_dashboard import export_dashboard_artifacts  # noqa: E402
+from scripts.timeseries_index import TimeSeriesIndex  # noqa: E402
+from scripts.leaderboards import LeaderboardSet, totals_path_for  # noqa: E402
+from scripts.sale_sample import update_sale_sample  # noqa: E402
+
 # Constants
 DW_DIR = pathlib.Path("data").joinpath("dw")
 DB_PATH = DW_DIR.joinpath("smart_sales.db")
 PREPARED_DATA_DIR = pathlib.Path("data").joinpath("prepared")
+TIMESERIES_INDEX_PATH = DW_DIR.joinpath("sales_timeseries.npz")
+LEADERBOARDS_PATH = DW_DIR.joinpath("leaderboards.json")
+# Staged builds are written to a folder of their own next to the live database
+# (staging-<random>), then swapped in
+STAGING_DIR_PREFIX = "staging-"
+# Files derived from the sale table that live next to the database
+DERIVED_ARTIFACTS = (TIMESERIES_INDEX_PATH.name, LEADERBOARDS_PATH.name, totals_path_for(LEADERBOARDS_PATH).name)
+
+# Seconds a writer waits for the warehouse writer lock before giving up
+WRITE_LOCK_TIMEOUT = 120.0
+
+# Page size for freshly built warehouse files; larger pages mean fewer reads per aggregate scan
+WAREHOUSE_PAGE_SIZE = 16384
+
+# Covering indexes for the OLAP access paths in olap_queries.CANONICAL_QUERIES:
+# star joins that scan a dimension (clustered on its key, WITHOUT ROWID) and
+# search sale by customer. Only indexes the query plans use belong here
+# (tests/test_query_plans.py checks); every index slows the sale inserts.
+COVERING_INDEXES = {
+    "idx_sale_customer_cover": "sale (customer_id, product_id, purchase_date, sale_amount_usd, quantity_sold)",
+}
+
+# Additive sale measures that derived structures sum up
+SALE_METRICS = ("sale_amount_usd", "quantity_sold")
 
 def create_schema(cursor: sqlite3.Cursor) -> None:
     """Create tables in the data warehouse if they don't exist."""
@@ -21,9 +62,9 @@ def create_schema(cursor: sqlite3.Cursor) -> None:
             customer_name TEXT,
             customer_region TEXT,
             customer_join_date TEXT,
-            customer_lifetime_value INTEGER,
+            customer_lifetime_value REAL,
             customer_tier TEXT
-        )
+        ) WITHOUT ROWID
     """)
     
     cursor.execute("""
@@ -34,7 +75,7 @@ def create_schema(cursor: sqlite3.Cursor) -> None:
             unit_price_usd REAL,
             manufacturing_cost_usd INTEGER,
             brand_name TEXT
-        )
+        ) WITHOUT ROWID
     """)
     
     cursor.execute("""
@@ -53,9 +94,49 @@ def create_schema(cursor: sqlite3.Cursor) -> None:
             FOREIGN KEY (product_id) REFERENCES product (product_id)
         )
     """)
+
+    # Derived from sale and kept current by refresh_sales_aggregates
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS customer_metrics (
+            customer_id INTEGER PRIMARY KEY,
+            total_revenue_usd REAL NOT NULL,
+            order_count INTEGER NOT NULL,
+            units_sold INTEGER NOT NULL,
+            first_purchase_date TEXT,
+            last_purchase_date TEXT,
+            avg_basket_usd REAL
+        ) WITHOUT ROWID
+    """)
+
+    # Stratified sample of sale for approximate queries (see scripts/sale_sample.py)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sale_sample (
+            transaction_id INTEGER PRIMARY KEY,
+            customer_region TEXT NOT NULL,
+            product_category TEXT NOT NULL,
+            sale_month TEXT NOT NULL,
+            sale_amount_usd REAL,
+            quantity_sold INTEGER,
+            sample_weight REAL NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sale_sample_strata (
+            customer_region TEXT NOT NULL,
+            product_category TEXT NOT NULL,
+            sale_month TEXT NOT NULL,
+            population_rows INTEGER NOT NULL,
+            cutoff_draw REAL NOT NULL,
+            PRIMARY KEY (customer_region, product_category, sale_month)
+        ) WITHOUT ROWID
+    """)
+
 def delete_existing_records(cursor: sqlite3.Cursor) -> None:
     """Drop and recreate tables to ensure schema consistency."""
     print("Dropping existing tables (if they exist)...")
+    cursor.execute("DROP TABLE IF EXISTS customer_metrics")
+    cursor.execute("DROP TABLE IF EXISTS sale_sample")
+    cursor.execute("DROP TABLE IF EXISTS sale_sample_strata")
     cursor.execute("DROP TABLE IF EXISTS sale")
     cursor.execute("DROP TABLE IF EXISTS product")
     cursor.execute("DROP TABLE IF EXISTS customer")
@@ -75,33 +156,412 @@ def insert_sales(sales_df: pd.DataFrame, cursor: sqlite3.Cursor) -> None:
     """Insert sales data into the sales table."""
     sales_df.to_sql("sale", cursor.connection, if_exists="append", index=False)
 
-def load_data_to_db() -> None:
-    conn = None  # Initialize before the try block
-    try:
-         # Ensure the directory exists
-        DW_DIR.mkdir(parents=True, exist_ok=True)
-        # Connect to SQLite – will create the file if it doesn't exist
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-
-        # Create schema and clear existing records
-        create_schema(cursor)
-        delete_existing_records(cursor)
-
-        # Load prepared data using pandas
-        customers_df = pd.read_csv(PREPARED_DATA_DIR.joinpath("prepared_customers_data.csv"))
-        products_df = pd.read_csv(PREPARED_DATA_DIR.joinpath("prepared_products_data.csv"))
-        sales_df = pd.read_csv(PREPARED_DATA_DIR.joinpath("prepared_sales_data.csv"))
-
-        # Insert data into the database
-        insert_customers(customers_df, cursor)
-        insert_products(products_df, cursor)
-        insert_sales(sales_df, cursor)
-
-        conn.commit()
-    finally:
-        if conn:
-            conn.close()
+# Warehouse table for each prepared/raw file stem
+TABLE_FOR_STEM = {
+    "customers_data": "customer",
+    "products_data": "product",
+    "sales_data": "sale",
+}
+
+def format_dates_for_db(df: pd.DataFrame) -> pd.DataFrame:
+    """Store datetime columns as YYYY-MM-DD text, matching what the prepared CSV files contain."""
+    datetime_columns = df.select_dtypes(include="datetime").columns
+    if len(datetime_columns) == 0:
+        return df
+    df = df.copy()
+    for column in datetime_columns:
+        df[column] = df[column].dt.strftime("%Y-%m-%d")
+    return df
+
+def insert_table(table: str, df: pd.DataFrame, cursor: sqlite3.Cursor) -> None:
+    """Insert a prepared DataFrame into the named warehouse table."""
+    inserters = {"customer": insert_customers, "product": insert_products, "sale": insert_sales}
+    inserters[table](format_dates_for_db(df), cursor)
+
+def sales_with_dimensions(sales_df: pd.DataFrame, conn: sqlite3.Connection) -> pd.DataFrame:
+    """Attach customer_region and product_category from the warehouse to a batch of sales rows."""
+    customers = pd.read_sql_query("SELECT customer_id, customer_region FROM customer", conn)
+    products = pd.read_sql_query("SELECT product_id, product_category FROM product", conn)
+    return (
+        sales_df.merge(customers, on="customer_id", how="left")
+        .merge(products, on="product_id", how="left")
+    )
+
+CUSTOMER_METRIC_COLUMNS = [
+    "customer_id", "total_revenue_usd", "order_count", "units_sold",
+    "first_purchase_date", "last_purchase_date", "avg_basket_usd",
+]
+
+def customer_metrics_for(sales_df: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate a batch of sales rows (dates as YYYY-MM-DD text) into one customer_metrics row per customer."""
+    metrics = (
+        sales_df.dropna(subset=["customer_id"])
+        .groupby("customer_id")
+        .agg(
+            total_revenue_usd=("sale_amount_usd", "sum"),
+            order_count=("sale_amount_usd", "size"),
+            units_sold=("quantity_sold", "sum"),
+            first_purchase_date=("purchase_date", "min"),
+            last_purchase_date=("purchase_date", "max"),
+        )
+        .reset_index()
+    )
+    metrics["avg_basket_usd"] = metrics["total_revenue_usd"] / metrics["order_count"]
+    return metrics[CUSTOMER_METRIC_COLUMNS]
+
+def recompute_customer_metrics(conn: sqlite3.Connection, customer_ids: Optional[List[int]] = None) -> None:
+    """Rebuild customer_metrics rows from the sale table, for the given customers or for everyone."""
+    aggregate = """
+        SELECT customer_id, SUM(sale_amount_usd), COUNT(*), SUM(quantity_sold),
+               MIN(purchase_date), MAX(purchase_date), SUM(sale_amount_usd) / COUNT(*)
+        FROM sale {where} GROUP BY customer_id
+    """
+    if customer_ids is None:
+        conn.execute("DELETE FROM customer_metrics")
+        conn.execute("INSERT INTO customer_metrics " + aggregate.format(where="WHERE customer_id IS NOT NULL"))
+        return
+    for start in range(0, len(customer_ids), 900):
+        chunk = customer_ids[start:start + 900]
+        placeholders = ", ".join("?" for _ in chunk)
+        # Customers left without sales lose their row
+        conn.execute(f"DELETE FROM customer_metrics WHERE customer_id IN ({placeholders})", chunk)
+        conn.execute("INSERT INTO customer_metrics " + aggregate.format(where=f"WHERE customer_id IN ({placeholders})"), chunk)
+
+def update_customer_metrics(conn: sqlite3.Connection, sales_df: pd.DataFrame, rebuild: bool = False, removed_df: Optional[pd.DataFrame] = None) -> None:
+    """
+    Merge a batch of new sales rows into customer_metrics.
+
+    Sums and counts are added with an UPSERT and the purchase date range is
+    widened, so a batch costs one groupby plus one write per customer it
+    touches. First/last dates cannot be retracted, so when rows were
+    removed (updates or deletes) the affected customers are recomputed from
+    sale instead; the sale table must already reflect the change. An empty
+    sales_df may have no columns at all (a CDC run that only deletes rows).
+    """
+    # A delete-only change set may come with no sale columns at all
+    new_ids = sales_df["customer_id"] if "customer_id" in sales_df.columns else pd.Series(dtype="float64")
+    if rebuild:
+        conn.execute("DELETE FROM customer_metrics")
+    elif removed_df is not None and len(removed_df) > 0:
+        affected = pd.concat([removed_df["customer_id"], new_ids]).dropna().unique()
+        recompute_customer_metrics(conn, [int(customer_id) for customer_id in affected])
+        return
+    elif conn.execute("SELECT NOT EXISTS (SELECT 1 FROM customer_metrics)").fetchone()[0]:
+        # First incremental batch on a warehouse loaded before the table existed
+        recompute_customer_metrics(conn)
+        return
+    if new_ids.empty:
+        return
+
+    metrics = customer_metrics_for(sales_df)
+    columns = ", ".join(CUSTOMER_METRIC_COLUMNS)
+    conn.executemany(
+        f"""
+        INSERT INTO customer_metrics ({columns}) VALUES ({", ".join("?" for _ in CUSTOMER_METRIC_COLUMNS)})
+        ON CONFLICT (customer_id) DO UPDATE SET
+            total_revenue_usd = total_revenue_usd + excluded.total_revenue_usd,
+            order_count = order_count + excluded.order_count,
+            units_sold = units_sold + excluded.units_sold,
+            first_purchase_date = min(coalesce(first_purchase_date, excluded.first_purchase_date), excluded.first_purchase_date),
+            last_purchase_date = max(coalesce(last_purchase_date, excluded.last_purchase_date), excluded.last_purchase_date),
+            avg_basket_usd = (total_revenue_usd + excluded.total_revenue_usd) / (order_count + excluded.order_count)
+        """,
+        metrics.astype(object).where(metrics.notna(), None).itertuples(index=False, name=None),
+    )
+
+def artifact_dir_for(conn: sqlite3.Connection) -> pathlib.Path:
+    """The folder of the connection's database file (DW_DIR for an in-memory database)."""
+    path = conn.execute("PRAGMA database_list").fetchone()[2]
+    return pathlib.Path(path).parent if path else DW_DIR
+
+def refresh_sales_aggregates(sales_df: pd.DataFrame, conn: sqlite3.Connection, rebuild: bool = False, removed_df: Optional[pd.DataFrame] = None, artifact_dir: Optional[pathlib.Path] = None) -> None:
+    """
+    Update the structures derived from the sale table with a batch of new sales rows.
+
+    With rebuild=True (a full reload) they are recreated from sales_df alone;
+    otherwise sales_df must contain only rows not counted before.
+    removed_df holds previously counted rows that were updated or deleted;
+    they are subtracted. The time-series index and leaderboards are saved in
+    artifact_dir, by default next to the connection's database file.
+    """
+    artifact_dir = artifact_dir or artifact_dir_for(conn)
+    if "customer_id" not in sales_df.columns and removed_df is not None:
+        # Delete-only change set: no new rows, but keep the sale columns for the joins below
+        sales_df = removed_df.iloc[:0]
+    batch = format_dates_for_db(sales_df)
+    update_customer_metrics(conn, batch, rebuild, removed_df)
+    joined = sales_with_dimensions(batch, conn)
+    removed_joined = None
+    if removed_df is not None and len(removed_df) > 0:
+        removed_joined = sales_with_dimensions(format_dates_for_db(removed_df), conn)
+    update_sale_sample(conn, joined, rebuild, removed=removed_joined)
+    if removed_joined is not None:
+        retracted = removed_joined.copy()
+        retracted[list(SALE_METRICS)] = -retracted[list(SALE_METRICS)]
+        joined = pd.concat([joined, retracted], ignore_index=True)
+    index_path = artifact_dir.joinpath(TIMESERIES_INDEX_PATH.name)
+    index = TimeSeriesIndex() if rebuild else TimeSeriesIndex.load(index_path)
+    index.extend(joined)
+    index.save(index_path)
+
+    leaderboards_path = artifact_dir.joinpath(LEADERBOARDS_PATH.name)
+    leaderboards = LeaderboardSet() if rebuild else LeaderboardSet.load(leaderboards_path, totals=True)
+    leaderboards.update_from_sales(joined)
+    leaderboards.save(leaderboards_path)
+
+def stored_sales(conn: sqlite3.Connection, transaction_ids: List[int]) -> pd.DataFrame:
+    """The sale rows currently stored for the given transaction ids."""
+    # Stay under SQLite's bound-parameter limit
+    chunks = [transaction_ids[start:start + 900] for start in range(0, len(transaction_ids), 900)] or [[]]
+    return pd.concat(
+        [
+            pd.read_sql_query(f"SELECT * FROM sale WHERE transaction_id IN ({', '.join('?' for _ in chunk)})", conn, params=chunk)
+            for chunk in chunks
+        ],
+        ignore_index=True,
+    )
+
+def apply_changes(conn: sqlite3.Connection, table: str, key_column: str, upserts_df: pd.DataFrame, deleted_keys: List[int], artifact_dir: Optional[pathlib.Path] = None) -> None:
+    """
+    Apply a change set to one warehouse table: upsert the given rows and delete the given keys.
+
+    For the sale table the derived structures are corrected too: the stored
+    versions of updated or deleted rows are subtracted and the new rows added.
+    """
+    upserts_df = format_dates_for_db(upserts_df)
+    changed_keys = [int(key) for key in upserts_df[key_column]] if len(upserts_df) > 0 else []
+    affected_keys = changed_keys + list(deleted_keys)
+
+    previous_rows = stored_sales(conn, affected_keys) if table == "sale" and affected_keys else None
+
+    cursor = conn.cursor()
+    if len(upserts_df) > 0:
+        columns = list(upserts_df.columns)
+        statement = f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+        rows = upserts_df.astype(object).where(upserts_df.notna(), None).itertuples(index=False, name=None)
+        cursor.executemany(statement, rows)
+    if deleted_keys:
+        cursor.executemany(f"DELETE FROM {table} WHERE {key_column} = ?", [(key,) for key in deleted_keys])
+
+    if table == "sale" and affected_keys:
+        refresh_sales_aggregates(upserts_df, conn, removed_df=previous_rows, artifact_dir=artifact_dir)
+
+def create_indexes(cursor: sqlite3.Cursor) -> None:
+    """Create the covering indexes used by the star joins and roll-ups."""
+    for name, definition in COVERING_INDEXES.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+
+def optimize_for_reads(conn: sqlite3.Connection) -> None:
+    """Read-optimization stage at the end of a load: covering indexes, fresh statistics, PRAGMA optimize."""
+    create_indexes(conn.cursor())
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.execute("PRAGMA optimize")
+    conn.commit()
+
+def read_prepared_data() -> Dict[str, pd.DataFrame]:
+    """Load the prepared CSV files, keyed by warehouse table, reading only the columns the warehouse stores."""
+    return {
+        table: read_source(PREPARED_DATA_DIR.joinpath(f"prepared_{stem}.csv"), consumer="warehouse")
+        for stem, table in TABLE_FOR_STEM.items()
+    }
+
+def staging_path_for(db_path: pathlib.Path = DB_PATH) -> pathlib.Path:
+    """
+    Create a new staging folder next to db_path and return the path of the staged database in it.
+
+    Every build gets a folder of its own, so two staged builds at once (a
+    CLI load while run is active) never clear each other's files; the
+    later swap wins. The swap removes the folder; discard_staging removes
+    it after a failed build.
+    """
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    return pathlib.Path(tempfile.mkdtemp(prefix=STAGING_DIR_PREFIX, dir=db_path.parent)).joinpath(db_path.name)
+
+def discard_staging(staging_path: pathlib.Path) -> None:
+    """Remove the staging folder of a build that will not be swapped in."""
+    shutil.rmtree(staging_path.parent, ignore_errors=True)
+
+def set_page_size(conn: sqlite3.Connection) -> None:
+    """Rewrite an existing database with WAREHOUSE_PAGE_SIZE pages; cheap while its tables are empty."""
+    if conn.execute("PRAGMA page_size").fetchone()[0] == WAREHOUSE_PAGE_SIZE:
+        return
+    # The page size of a WAL database cannot change; VACUUM applies it in rollback mode
+    journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    if journal_mode == "wal":
+        conn.execute("PRAGMA journal_mode=DELETE")
+    conn.execute(f"PRAGMA page_size={WAREHOUSE_PAGE_SIZE}")
+    conn.execute("VACUUM")
+    if journal_mode == "wal":
+        conn.execute("PRAGMA journal_mode=WAL")
+
+def configure_for_build(conn: sqlite3.Connection) -> None:
+    """Pragmas for a database nobody else can see yet: no journal, no fsyncs, large pages."""
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute(f"PRAGMA page_size={WAREHOUSE_PAGE_SIZE}")
+
+def build_warehouse(conn: sqlite3.Connection, frames: Dict[str, pd.DataFrame], artifact_dir: Optional[pathlib.Path] = None) -> None:
+    """
+    Create the schema in an empty database, insert every table, then index and ANALYZE it.
+
+    The derived files go to artifact_dir (by default next to the database file).
+    """
+    cursor = conn.cursor()
+    create_schema(cursor)
+    for table in ("customer", "product", "sale"):
+        insert_table(table, frames[table], cursor)
+    refresh_sales_aggregates(frames["sale"], conn, rebuild=True, artifact_dir=artifact_dir)
+    conn.commit()
+    optimize_for_reads(conn)
+
+@contextlib.contextmanager
+def warehouse_write_lock(db_path: pathlib.Path = DB_PATH, timeout: float = WRITE_LOCK_TIMEOUT) -> Iterator[None]:
+    """
+    Hold the writer lock of the live warehouse (an OS lock on <db>.lock).
+
+    Everything that writes the live file (ingest daemon, CDC, in-place loads)
+    opens and closes its connection inside this lock, and swap_into_place
+    takes it before replacing the file, so no writer is attached to the old
+    file, or still appending to its WAL, when it is swapped out.
+    Raises TimeoutError if the lock is not free within timeout seconds.
+    """
+    lock_path = db_path.with_name(db_path.name + ".lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a+b") as handle:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if os.name == "nt":
+                    handle.seek(0)
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+                else:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Timed out waiting for the writer lock on {db_path}")
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if os.name == "nt":
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+def swap_into_place(staging_path: pathlib.Path, db_path: pathlib.Path, attempts: int = 10, timeout: float = 30.0) -> None:
+    """
+    Atomically replace db_path with the finished staging database.
+
+    Readers that already have the old file open keep reading that snapshot;
+    new connections see the new warehouse. Under the writer lock, the old
+    file's WAL is checkpointed and truncated; if readers keep the checkpoint
+    busy for all attempts the swap is aborted with RuntimeError and the
+    staging file is left in place. The old -wal/-shm files are removed after
+    the rename so they cannot be laid over the new file. When the staging file
+    is in its own folder, the derived files built with it (DERIVED_ARTIFACTS)
+    are moved into place in the same locked step.
+    """
+    with warehouse_write_lock(db_path):
+        if db_path.exists():
+            old = sqlite3.connect(db_path, timeout=timeout)
+            try:
+                for attempt in range(attempts):
+                    busy, _, _ = old.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+                    if not busy:
+                        break
+                    time.sleep(0.1 * (attempt + 1))
+                else:
+                    raise RuntimeError(
+                        f"Readers kept the WAL of {db_path} busy; swap aborted, new warehouse left at {staging_path}."
+                    )
+            finally:
+                old.close()
+        # Flush the staging file to disk before the rename makes it visible
+        with open(staging_path, "rb+") as handle:
+            os.fsync(handle.fileno())
+        os.replace(staging_path, db_path)
+        for suffix in ("-wal", "-shm"):
+            try:
+                db_path.with_name(db_path.name + suffix).unlink(missing_ok=True)
+            except PermissionError:
+                pass  # Windows: still mapped by a reader of the old file; the WAL was truncated above
+        if staging_path.parent != db_path.parent:
+            for name in DERIVED_ARTIFACTS:
+                if staging_path.parent.joinpath(name).exists():
+                    os.replace(staging_path.parent.joinpath(name), db_path.parent.joinpath(name))
+            shutil.rmtree(staging_path.parent, ignore_errors=True)
+
+def load_data_to_db(export_dashboard: bool = True, staged: bool = True, in_memory: bool = False, frames: Optional[Dict[str, pd.DataFrame]] = None) -> None:
+    """
+    Load the prepared files into the warehouse.
+
+    frames ({"customer": df, "product": df, "sale": df}) loads cleaned
+    DataFrames handed over in process instead of reading data/prepared.
+
+    staged=True (default) builds a complete new database, with its derived
+    files, in a staging folder in data/dw and swaps it in with an atomic rename, so dashboard readers never
+    see missing tables or wait on the load's locks. in_memory=True builds
+    the staging copy in RAM and writes it out with the SQLite backup API.
+    staged=False keeps the old drop-and-reload in place.
+    """
+    # Ensure the directory exists
+    DW_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Load prepared data using pandas, unless the cleaned frames were handed over
+    if frames is None:
+        frames = read_prepared_data()
+
+    if staged:
+        staging_path = staging_path_for(DB_PATH)
+        try:
+            conn = sqlite3.connect(":memory:" if in_memory else staging_path)
+            try:
+                configure_for_build(conn)
+                build_warehouse(conn, frames, artifact_dir=staging_path.parent)
+                if in_memory:
+                    target = sqlite3.connect(staging_path)
+                    try:
+                        conn.backup(target)
+                    finally:
+                        target.close()
+            finally:
+                conn.close()
+        except BaseException:
+            discard_staging(staging_path)
+            raise
+        swap_into_place(staging_path, DB_PATH)
+    else:
+        conn = None  # Initialize before the try block
+        with warehouse_write_lock(DB_PATH):
+            try:
+                # Connect to SQLite – will create the file if it doesn't exist
+                conn = sqlite3.connect(DB_PATH)
+                cursor = conn.cursor()
+
+                # Create schema and clear existing records
+                create_schema(cursor)
+                delete_existing_records(cursor)
+                conn.commit()
+                set_page_size(conn)
+
+                # Insert data into the database
+                for table in ("customer", "product", "sale"):
+                    insert_table(table, frames[table], cursor)
+
+                # Rebuild the derived sales structures from this load
+                refresh_sales_aggregates(frames["sale"], conn, rebuild=True)
+                conn.commit()
+                optimize_for_reads(conn)
+            finally:
+                if conn:
+                    conn.close()
+
+    # Export stage: refresh the static dashboard datasets from the new load
+    if export_dashboard:
+        export_dashboard_artifacts(DB_PATH)
 
 if __name__ == "__main__":
     load_data_to_db()
\ No newline at end of file
@@ -0,0 +1,253 @@
+"""
+scripts/export_dashboard.py
+
+Export stage that writes precomputed dashboard datasets next to the warehouse.
+
+Dashboards read these static files with load_dashboard_dataset() (or
+`python -m scripts.smart_store dashboard <name>`) instead of querying
+smart_sales.db every time they load:
+
+    data/dw/dashboard/
+        manifest.json                          artifact list with content hashes
+        region_category_month/<YYYY-MM>.json   total sales per region x category, one file per month
+        monthly_trend.json                     total sales per region per month
+        top_customers.json                     top N customers by revenue
+
+Each file is compact JSON in pandas "split" layout: {"columns": [...], "data": [[...], ...]}.
+
+The fact rows never leave SQLite: the export reads one row per month x
+region x category (ROLLUP_QUERY, aggregated over the covering sale index)
+and the top customers from the customer_metrics table. Every writer of the
+warehouse (full loads, the ingest daemon, CDC) refreshes the files.
+
+Regeneration is incremental. A writer that knows which sale months it
+touched passes them as months=, and only those months are aggregated; the
+other months keep their fingerprints and files. Each month's rollup rows
+get a fingerprint, and a monthly artifact is rewritten only when its
+month's fingerprint changed. The all-history artifacts are rebuilt on
+every export (they are small) and rewritten only when their content hash
+changed, so a customer rename reaches top_customers.json even though no
+month changed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DW_DIR = pathlib.Path("data").joinpath("dw")
+DB_PATH = DW_DIR.joinpath("smart_sales.db")
+DASHBOARD_DIR = DW_DIR.joinpath("dashboard")
+MANIFEST_NAME = "manifest.json"
+
+ROLLUP_QUERY = """
+    SELECT
+        substr(s.purchase_date, 1, 7) AS sale_month,
+        c.customer_region,
+        p.product_category,
+        COUNT(*) AS row_count,
+        SUM(s.sale_amount_usd) AS total_sales
+    FROM sale s
+    JOIN customer c ON s.customer_id = c.customer_id
+    JOIN product p ON s.product_id = p.product_id
+    {where}
+    GROUP BY sale_month, c.customer_region, p.product_category
+"""
+
+# Date range of one month in ROLLUP_QUERY; dates are stored as YYYY-MM-DD text
+MONTH_RANGE = "(s.purchase_date >= ? AND s.purchase_date < ?)"
+
+TOP_CUSTOMERS_QUERY = """
+    SELECT m.customer_id, c.customer_name, m.total_revenue_usd AS total_spent
+    FROM customer_metrics m
+    JOIN customer c ON c.customer_id = m.customer_id
+    ORDER BY m.total_revenue_usd DESC
+    LIMIT ?
+"""
+
+
+def partition_fingerprints(rollup_df: pd.DataFrame) -> Dict[str, str]:
+    """Return an order-independent fingerprint of the rollup rows in each sale_month."""
+    # Totals are compared at the precision the artifacts are written with
+    rows = rollup_df.assign(total_sales=rollup_df["total_sales"].round(2))
+    row_hashes = pd.util.hash_pandas_object(rows, index=False).to_numpy()
+    months = rows["sale_month"].to_numpy()
+    fingerprints = {}
+    for month in np.unique(months):
+        month_hashes = row_hashes[months == month]
+        # Summing (mod 2**64) makes the fingerprint independent of row order
+        total = int(month_hashes.sum(dtype=np.uint64))
+        fingerprints[str(month)] = f"{len(month_hashes)}-{total:016x}"
+    return fingerprints
+
+
+def sale_months(conn: sqlite3.Connection, key_column: str, keys: Iterable[int]) -> Set[str]:
+    """The months (YYYY-MM) of the stored sales whose key_column is one of keys."""
+    keys = [int(key) for key in keys]
+    months = set()
+    # Stay under SQLite's bound-parameter limit
+    for start in range(0, len(keys), 900):
+        chunk = keys[start:start + 900]
+        rows = conn.execute(
+            f"SELECT DISTINCT substr(purchase_date, 1, 7) FROM sale WHERE {key_column} IN ({', '.join('?' for _ in chunk)})", chunk
+        )
+        months.update(month for (month,) in rows if month)
+    return months
+
+
+def read_rollup(conn: sqlite3.Connection, months: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """ROLLUP_QUERY over every month, or over the given months (YYYY-MM) only."""
+    if months is None:
+        return pd.read_sql_query(ROLLUP_QUERY.format(where=""), conn)
+    months = sorted(months)
+    params = []
+    for month in months:
+        params += [f"{month}-01", f"{pd.Period(month, 'M') + 1}-01"]
+    where = "WHERE " + (" OR ".join(MONTH_RANGE for _ in months) or "0")
+    return pd.read_sql_query(ROLLUP_QUERY.format(where=where), conn, params=params)
+
+
+def _artifact_payload(df: pd.DataFrame) -> bytes:
+    return df.to_json(orient="split", index=False, double_precision=2).encode("utf-8")
+
+
+def _write_artifact(out_dir: pathlib.Path, relative_path: str, payload: bytes) -> str:
+    """Write a compact split-layout JSON payload atomically and return its sha256."""
+    target = out_dir.joinpath(relative_path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp = target.with_suffix(".tmp")
+    temp.write_bytes(payload)
+    os.replace(temp, target)
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _load_manifest(out_dir: pathlib.Path) -> Dict:
+    manifest_path = out_dir.joinpath(MANIFEST_NAME)
+    if manifest_path.exists():
+        return json.loads(manifest_path.read_text())
+    return {"partitions": {}, "artifacts": {}}
+
+
+def export_dashboard_artifacts(
+    db_path: pathlib.Path = DB_PATH,
+    out_dir: Optional[pathlib.Path] = None,
+    top_n: int = 10,
+    force: bool = False,
+    months: Optional[Iterable[str]] = None,
+) -> Dict[str, List[str]]:
+    """
+    Regenerate the dashboard artifacts whose inputs changed.
+
+    out_dir defaults to the dashboard folder next to db_path. months lists
+    the sale months (YYYY-MM) the writer touched; only those are aggregated
+    again. With months=None (or no previous export) every month is.
+    Returns {"written": [...], "unchanged": [...], "removed": [...]} with artifact paths.
+    """
+    out_dir = out_dir or pathlib.Path(db_path).parent.joinpath(DASHBOARD_DIR.name)
+    manifest = {"partitions": {}, "artifacts": {}} if force else _load_manifest(out_dir)
+    old_partitions = manifest.get("partitions", {})
+    old_artifacts = manifest.get("artifacts", {})
+    trend_path = out_dir.joinpath("monthly_trend.json")
+    incremental = months is not None and "monthly_trend.json" in old_artifacts and trend_path.exists()
+    scope = set(months) if incremental else None
+    conn = sqlite3.connect(db_path)
+    try:
+        rollup_df = read_rollup(conn, scope)
+        top_customers_df = pd.read_sql_query(TOP_CUSTOMERS_QUERY, conn, params=[top_n])
+    finally:
+        conn.close()
+
+    partitions = partition_fingerprints(rollup_df)
+    if incremental:
+        # Months outside the writer's scope keep their fingerprints and files
+        partitions.update({month: fingerprint for month, fingerprint in old_partitions.items() if month not in scope})
+        partitions = dict(sorted(partitions.items()))
+    summary = {"written": [], "unchanged": [], "removed": []}
+    artifacts = {}
+
+    # One region x category artifact per month, rebuilt only when that month changed
+    changed_months = [month for month, fingerprint in partitions.items() if old_partitions.get(month) != fingerprint]
+    for month in partitions:
+        relative_path = f"region_category_month/{month}.json"
+        if month in changed_months or relative_path not in old_artifacts:
+            totals = rollup_df.loc[rollup_df["sale_month"] == month, ["customer_region", "product_category", "total_sales"]]
+            totals = totals.assign(sale_month=month).reset_index(drop=True)
+            artifacts[relative_path] = {"sha256": _write_artifact(out_dir, relative_path, _artifact_payload(totals)), "inputs": [month]}
+            summary["written"].append(relative_path)
+        else:
+            artifacts[relative_path] = old_artifacts[relative_path]
+            summary["unchanged"].append(relative_path)
+
+    for month in set(old_partitions) - set(partitions):
+        relative_path = f"region_category_month/{month}.json"
+        out_dir.joinpath(relative_path).unlink(missing_ok=True)
+        summary["removed"].append(relative_path)
+
+    # All-history artifacts are small: rebuild them and write only when the content changed
+    trend = rollup_df.groupby(["customer_region", "sale_month"], as_index=False).agg(total_sales=("total_sales", "sum"))
+    if incremental:
+        previous_trend = _read_artifact(trend_path)
+        trend = pd.concat([previous_trend[~previous_trend["sale_month"].isin(scope)], trend], ignore_index=True)
+    history = {
+        "monthly_trend.json": (trend.sort_values(["customer_region", "sale_month"]), sorted(partitions)),
+        "top_customers.json": (top_customers_df, ["customer_metrics", "customer"]),
+    }
+    for relative_path, (df, inputs) in history.items():
+        payload = _artifact_payload(df)
+        sha256 = hashlib.sha256(payload).hexdigest()
+        if old_artifacts.get(relative_path, {}).get("sha256") == sha256 and out_dir.joinpath(relative_path).exists():
+            artifacts[relative_path] = old_artifacts[relative_path]
+            summary["unchanged"].append(relative_path)
+        else:
+            artifacts[relative_path] = {"sha256": _write_artifact(out_dir, relative_path, payload), "inputs": inputs}
+            summary["written"].append(relative_path)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir.joinpath(MANIFEST_NAME)
+    temp = manifest_path.with_suffix(".tmp")
+    temp.write_text(json.dumps({"partitions": partitions, "artifacts": artifacts}, indent=1, sort_keys=True))
+    os.replace(temp, manifest_path)
+
+    logger.info(f"Dashboard artifacts: {len(summary['written'])} written, {len(summary['unchanged'])} unchanged, {len(summary['removed'])} removed.")
+    return summary
+
+
+DATASETS = ("region_category_month", "monthly_trend", "top_customers")
+
+
+def load_dashboard_dataset(name: str, out_dir: pathlib.Path = DASHBOARD_DIR) -> pd.DataFrame:
+    """
+    Read a dashboard dataset from the static artifacts (no database access).
+
+    name is one of DATASETS.
+    """
+    if name not in DATASETS:
+        raise ValueError(f"Unknown dashboard dataset '{name}'. Choose from: {', '.join(DATASETS)}")
+    if name == "region_category_month":
+        paths = sorted(out_dir.joinpath("region_category_month").glob("*.json"))
+        frames = [_read_artifact(path) for path in paths]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    return _read_artifact(out_dir.joinpath(f"{name}.json"))
+
+
+def _read_artifact(path: pathlib.Path) -> pd.DataFrame:
+    payload = json.loads(path.read_text())
+    return pd.DataFrame(payload["data"], columns=payload["columns"])
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    export_dashboard_artifacts()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+scripts/ingest_daemon.py
+
+Long-running micro-batch ingestion for sales extracts dropped by the stores.
+
+The daemon polls an inbox folder for new CSV files and, for each one:
+1. claims it by renaming it into a processing folder (atomic on one filesystem,
+   so two daemons never pick up the same file),
+2. cleans it with data_prep2.clean_dataframe, as the batch prepare does
+   (without outlier removal, which means nothing on a small batch),
+3. appends the rows to the warehouse sale table and updates the derived
+   tables in one transaction (inserted batch_size rows per executemany call),
+4. moves the file to the archive folder, stamped with the time it was loaded.
+
+The archive is part of the sales source: a full rebuild (prepare, run, the
+pipeline) reads the archived files together with data/raw/sales_data.csv
+(common_utils.with_ingested_sales), so it keeps every row the daemon
+loaded. Keep the archive as long as the warehouse is rebuilt from data/raw.
+
+After each poll that loaded files, the dashboard files next to the
+warehouse are refreshed (incrementally, see export_dashboard).
+
+Producers should write to a temporary name and rename the file into the inbox
+when complete; files younger than `min_file_age` seconds are left alone as a
+safety net for producers that write in place.
+
+When the inbox backlog grows past `high_water_mark` files the daemon creates
+a BACKPRESSURE marker file in the inbox and removes it once the backlog drops
+below `low_water_mark`, so upstream jobs can slow down.
+
+Run from the project root:
+
+    python scripts/ingest_daemon.py
+    python scripts/ingest_daemon.py --once
+"""
+
+import argparse
+import logging
+import os
+import pathlib
+import sqlite3
+import sys
+import time
+from typing import Dict, List, Optional, Set
+
+import pandas as pd
+
+# For local imports, temporarily add project root to sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.data_preparation.common_utils import INGEST_ARCHIVE_DIR, standardize_column_names, read_source, COLUMN_STANDARDIZATION  # noqa: E402
+from scripts.data_preparation.data_prep2 import clean_dataframe  # noqa: E402
+from scripts.export_dashboard import export_dashboard_artifacts  # noqa: E402
+from scripts.etl_to_dw import DB_PATH, WAREHOUSE_PAGE_SIZE, create_schema, refresh_sales_aggregates, stored_sales, warehouse_write_lock  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+# Constants
+INBOX_DIR = pathlib.Path("data").joinpath("inbox")
+PROCESSING_DIR = INBOX_DIR.joinpath("processing")
+FAILED_DIR = INBOX_DIR.joinpath("failed")
+ARCHIVE_DIR = INGEST_ARCHIVE_DIR
+BACKPRESSURE_MARKER = "BACKPRESSURE"
+
+SALE_COLUMNS = [
+    "transaction_id", "purchase_date", "customer_id", "product_id", "store_id",
+    "campaign_id", "sale_amount_usd", "quantity_sold", "payment_method", "sales_channel",
+]
+
+REQUIRED_COLUMNS = ["Transaction_ID", "Product_ID", "Customer_ID", "Purchase_Date", "Quantity_Sold", "Sale_Amount_USD"]
+
+
+def connect_warehouse(db_path: pathlib.Path = DB_PATH) -> sqlite3.Connection:
+    """Open the warehouse for appending without blocking dashboard readers."""
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    # Only takes effect when this creates the file; a full load sets it otherwise
+    conn.execute(f"PRAGMA page_size={WAREHOUSE_PAGE_SIZE}")
+    # WAL lets readers keep querying while small append transactions commit
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    create_schema(conn.cursor())
+    conn.commit()
+    return conn
+
+
+def claim_files(inbox: pathlib.Path, processing_dir: pathlib.Path, max_files: int, min_file_age: float) -> List[pathlib.Path]:
+    """Move up to max_files settled CSV files from the inbox into the processing folder."""
+    processing_dir.mkdir(parents=True, exist_ok=True)
+    now = time.time()
+    candidates = []
+    for path in inbox.glob("*.csv"):
+        try:
+            modified = path.stat().st_mtime
+        except FileNotFoundError:
+            continue  # claimed by another worker
+        if now - modified >= min_file_age:
+            candidates.append((modified, path))
+
+    claimed = []
+    for _, path in sorted(candidates)[:max_files]:
+        target = processing_dir.joinpath(path.name)
+        try:
+            os.replace(path, target)
+        except FileNotFoundError:
+            continue
+        claimed.append(target)
+    return claimed
+
+
+def update_backpressure(inbox: pathlib.Path, high_water_mark: int, low_water_mark: int) -> int:
+    """Create or remove the backpressure marker based on the inbox backlog. Returns the backlog size."""
+    backlog = sum(1 for _ in inbox.glob("*.csv"))
+    marker = inbox.joinpath(BACKPRESSURE_MARKER)
+    if backlog >= high_water_mark and not marker.exists():
+        marker.write_text(f"{backlog} files waiting\n")
+        logger.warning(f"Inbox backlog at {backlog} files; backpressure marker set.")
+    elif backlog <= low_water_mark and marker.exists():
+        marker.unlink()
+        logger.info(f"Inbox backlog down to {backlog} files; backpressure marker cleared.")
+    return backlog
+
+
+def prepare_sales_batch(df: pd.DataFrame, change_log=None) -> pd.DataFrame:
+    """Clean a raw sales extract the way the batch prepare does and shape it like the warehouse sale table."""
+    change_log = [] if change_log is None else change_log
+    df = standardize_column_names(df, COLUMN_STANDARDIZATION)
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        raise ValueError(f"Missing columns {missing_columns} in sales extract.")
+    # clean_dataframe casts the IDs to int64, which one missing ID would fail for the whole file
+    incomplete = df[REQUIRED_COLUMNS].isna().any(axis=1)
+    if incomplete.any():
+        change_log.append(f"Dropped {incomplete.sum()} rows missing a required value.")
+        df = df[~incomplete]
+    df = clean_dataframe(df, change_log, remove_outliers=False)
+    df["purchase_date"] = df["purchase_date"].dt.strftime("%Y-%m-%d")
+    return df.reindex(columns=SALE_COLUMNS)
+
+
+def append_sales(conn: sqlite3.Connection, sales_df: pd.DataFrame, batch_size: int) -> List[Dict[str, float]]:
+    """Insert rows into the sale table batch_size rows per executemany call. Returns per-chunk metrics; the caller commits."""
+    placeholders = ", ".join("?" for _ in SALE_COLUMNS)
+    # Re-delivered transactions replace the earlier copy, so retries are idempotent
+    statement = f"INSERT OR REPLACE INTO sale ({', '.join(SALE_COLUMNS)}) VALUES ({placeholders})"
+    rows = sales_df.astype(object).where(sales_df.notna(), None).itertuples(index=False, name=None)
+    rows = list(rows)
+
+    metrics = []
+    for start in range(0, len(rows), batch_size):
+        chunk = rows[start:start + batch_size]
+        started = time.perf_counter()
+        conn.executemany(statement, chunk)
+        elapsed = time.perf_counter() - started
+        metrics.append({
+            "rows": len(chunk),
+            "seconds": elapsed,
+            "rows_per_second": len(chunk) / elapsed if elapsed > 0 else float("inf"),
+        })
+    return metrics
+
+
+def ingest_file(conn: sqlite3.Connection, path: pathlib.Path, archive_dir: pathlib.Path, batch_size: int, months: Optional[Set[str]] = None) -> int:
+    """
+    Clean, load and archive one claimed file. Returns the number of rows loaded.
+
+    The sale months (YYYY-MM) the file added to or replaced are added to months when given.
+    """
+    arrived = path.stat().st_mtime
+    # Inbox batches carry the sales_data.csv layout whatever the file is called
+    raw_df = read_source(path, source="sales_data.csv")
+    raw_count = len(raw_df)
+    change_log = []
+    sales_df = prepare_sales_batch(raw_df, change_log)
+
+    # The rows and every derived table they touch are committed together
+    with conn:
+        # Re-delivered rows replace the stored copy, which is retracted from the aggregates
+        previous_rows = stored_sales(conn, [int(key) for key in sales_df["transaction_id"].dropna().unique()])
+        metrics = append_sales(conn, sales_df, batch_size)
+        refresh_sales_aggregates(sales_df, conn, removed_df=previous_rows)
+    if months is not None:
+        months.update(pd.concat([sales_df["purchase_date"], previous_rows["purchase_date"]]).dropna().str[:7])
+    for number, chunk in enumerate(metrics, start=1):
+        logger.info(
+            f"{path.name} insert chunk {number} of {len(metrics)}: {chunk['rows']} rows in {chunk['seconds'] * 1000:.1f} ms "
+            f"({chunk['rows_per_second']:.0f} rows/s)"
+        )
+
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    target = archive_dir.joinpath(path.name)
+    if target.exists():
+        # A re-delivered file name must not replace rows archived under it before
+        target = archive_dir.joinpath(f"{path.stem}.{time.time_ns()}{path.suffix}")
+    os.replace(path, target)
+    # Rebuilds order the archived files by this time (see common_utils.with_ingested_sales)
+    os.utime(target)
+    logger.info(
+        f"Ingested {len(sales_df)} of {raw_count} rows from {path.name} "
+        f"{time.time() - arrived:.1f} s after arrival. {' '.join(change_log)}"
+    )
+    return len(sales_df)
+
+
+def run(
+    inbox: pathlib.Path = INBOX_DIR,
+    processing_dir: pathlib.Path = PROCESSING_DIR,
+    archive_dir: pathlib.Path = ARCHIVE_DIR,
+    failed_dir: pathlib.Path = FAILED_DIR,
+    db_path: pathlib.Path = DB_PATH,
+    poll_interval: float = 2.0,
+    batch_size: int = 500,
+    max_files_per_poll: int = 10,
+    min_file_age: float = 1.0,
+    high_water_mark: int = 100,
+    low_water_mark: int = 20,
+    once: bool = False,
+) -> None:
+    """
+    Poll the inbox and ingest new files until interrupted (or once, if once=True).
+
+    Each file is loaded on its own connection under the warehouse writer lock,
+    so a full load can swap a new warehouse in between files.
+    """
+    inbox.mkdir(parents=True, exist_ok=True)
+    try:
+        # Files left in processing by a previous crash are retried first
+        pending = sorted(processing_dir.glob("*.csv")) if processing_dir.exists() else []
+        while True:
+            months = set()
+            backlog = update_backpressure(inbox, high_water_mark, low_water_mark)
+            if not pending:
+                pending = claim_files(inbox, processing_dir, max_files_per_poll, min_file_age)
+
+            for path in pending:
+                try:
+                    with warehouse_write_lock(db_path):
+                        conn = connect_warehouse(db_path)
+                        try:
+                            ingest_file(conn, path, archive_dir, batch_size, months)
+                        finally:
+                            conn.close()
+                except Exception as e:
+                    logger.error(f"Failed to ingest {path.name}: {e}")
+                    failed_dir.mkdir(parents=True, exist_ok=True)
+                    os.replace(path, failed_dir.joinpath(path.name))
+            claimed_any = bool(pending)
+            pending = []
+            if claimed_any and db_path.exists():
+                try:
+                    export_dashboard_artifacts(db_path, months=months)
+                except Exception as e:
+                    logger.error(f"Could not refresh the dashboard files: {e}")
+
+            if once:
+                break
+            # Keep draining without sleeping while there is a backlog
+            if not claimed_any or backlog <= max_files_per_poll:
+                time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        logger.info("Ingestion daemon stopped.")
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Micro-batch ingestion of new sales files into the warehouse.")
+    parser.add_argument("--inbox", type=pathlib.Path, default=INBOX_DIR)
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds between inbox polls.")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows per executemany call; each file is committed in one transaction.")
+    parser.add_argument("--max-files-per-poll", type=int, default=10)
+    parser.add_argument("--once", action="store_true", help="Process the current inbox and exit.")
+    args = parser.parse_args()
+    run(
+        inbox=args.inbox,
+        processing_dir=args.inbox.joinpath("processing"),
+        failed_dir=args.inbox.joinpath("failed"),
+        poll_interval=args.poll_interval,
+        batch_size=args.batch_size,
+        max_files_per_poll=args.max_files_per_poll,
+        once=args.once,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+scripts/leaderboards.py
+
+Top-N leaderboards maintained incrementally from sales batches.
+
+Each Leaderboard keeps a running total per entity plus the current top K.
+A batch is aggregated with one groupby, its per-entity deltas are added to
+the totals, and the new top K is picked from the old top K plus the
+entities the batch touched. While deltas are non-negative, an entity
+outside the old top K that the batch did not touch cannot have passed
+anyone in it. A negative delta (a refund) triggers a full recompute.
+
+The top K lists are saved in leaderboards.json and the per-entity totals,
+which only writers need, in leaderboards_totals.json next to it. Readers
+load the top K lists alone, O(K) however many entities have been loaded;
+writers pass totals=True to load both.
+
+Boards kept by LeaderboardSet:
+- customers_by_revenue   customer_id -> SUM(sale_amount_usd)
+- products_by_units      product_id  -> SUM(quantity_sold)
+- stores_by_revenue      store_id    -> SUM(sale_amount_usd)
+- regions_per_category   product_category -> (customer_region -> SUM(sale_amount_usd))
+"""
+
+import heapq
+import json
+import os
+import pathlib
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import pandas as pd
+
+# Constants
+DW_DIR = pathlib.Path("data").joinpath("dw")
+LEADERBOARDS_PATH = DW_DIR.joinpath("leaderboards.json")
+
+# board name -> (entity column, metric column)
+BOARDS = {
+    "customers_by_revenue": ("customer_id", "sale_amount_usd"),
+    "products_by_units": ("product_id", "quantity_sold"),
+    "stores_by_revenue": ("store_id", "sale_amount_usd"),
+}
+
+
+def totals_path_for(path: pathlib.Path) -> pathlib.Path:
+    """leaderboards_totals.json next to leaderboards.json: the per-entity totals only writers read."""
+    path = pathlib.Path(path)
+    return path.with_name(f"{path.stem}_totals{path.suffix}")
+
+
+class Leaderboard:
+    """Running totals per key with the top k entries kept current."""
+
+    def __init__(self, k: int = 10):
+        self.k = k
+        # None for a board loaded for reading, without its totals
+        self.totals: Optional[Dict[Hashable, float]] = {}
+        self.top: List[Tuple[float, Hashable]] = []
+
+    def update(self, deltas: Dict[Hashable, float]) -> None:
+        """Add per-key deltas to the running totals and refresh the top k."""
+        if not deltas:
+            return
+        if self.totals is None:
+            raise ValueError("Leaderboard was loaded without its totals; load it with totals=True to update it.")
+        for key, delta in deltas.items():
+            self.totals[key] = self.totals.get(key, 0.0) + delta
+
+        if any(delta < 0 for delta in deltas.values()):
+            candidates = self.totals.keys()
+        else:
+            candidates = {key for _, key in self.top} | set(deltas)
+        self.top = heapq.nlargest(self.k, ((self.totals[key], key) for key in candidates))
+
+    def top_k(self) -> List[Tuple[Hashable, float]]:
+        """Return [(key, total), ...] for the current leaders, highest first."""
+        return [(key, total) for total, key in self.top]
+
+    def to_dict(self) -> Dict:
+        return {"k": self.k, "top": [[key, total] for total, key in self.top]}
+
+    @classmethod
+    def from_dict(cls, data: Dict, totals: Optional[List] = None) -> "Leaderboard":
+        """A board from its saved top list; with totals ([[key, total], ...]) the top is recomputed from them."""
+        board = cls(data["k"])
+        if totals is None:
+            board.totals = None
+            board.top = [(total, key) for key, total in data["top"]]
+        else:
+            board.totals = {key: total for key, total in totals}
+            board.top = heapq.nlargest(board.k, ((total, key) for key, total in board.totals.items()))
+        return board
+
+
+def _deltas(df: pd.DataFrame, key_column: str, metric_column: str) -> Dict[Hashable, float]:
+    grouped = df.groupby(key_column)[metric_column].sum()
+    return {_plain(key): float(total) for key, total in grouped.items()}
+
+
+def _plain(value):
+    """Turn numpy scalars into plain Python values so keys survive a JSON round trip."""
+    return value.item() if hasattr(value, "item") else value
+
+
+class LeaderboardSet:
+    """All leaderboards kept for the warehouse, updated together from each sales batch."""
+
+    def __init__(self, k: int = 10):
+        self.k = k
+        self.boards = {name: Leaderboard(k) for name in BOARDS}
+        self.regions_per_category: Dict[str, Leaderboard] = {}
+
+    def update_from_sales(self, sales_df: pd.DataFrame) -> None:
+        """
+        Fold a batch of sales rows into every leaderboard.
+
+        sales_df needs the BOARDS columns and, for regions_per_category,
+        customer_region and product_category.
+        """
+        if sales_df.empty:
+            return
+        for name, (key_column, metric_column) in BOARDS.items():
+            if key_column in sales_df.columns:
+                self.boards[name].update(_deltas(sales_df.dropna(subset=[key_column]), key_column, metric_column))
+
+        if {"customer_region", "product_category"}.issubset(sales_df.columns):
+            grouped = sales_df.groupby(["product_category", "customer_region"])["sale_amount_usd"].sum()
+            for category, category_totals in grouped.groupby(level=0):
+                board = self.regions_per_category.setdefault(category, Leaderboard(self.k))
+                board.update({region: float(total) for (_, region), total in category_totals.items()})
+
+    def top(self, name: str) -> List[Tuple[Hashable, float]]:
+        """Top entries of one board, e.g. top("customers_by_revenue")."""
+        return self.boards[name].top_k()
+
+    def top_regions(self, category: str) -> List[Tuple[Hashable, float]]:
+        """Regions ranked by revenue within one product category."""
+        board = self.regions_per_category.get(category)
+        return board.top_k() if board else []
+
+    def save(self, path: pathlib.Path = LEADERBOARDS_PATH) -> None:
+        """Write the totals file, then the top K file readers load (each replaced atomically)."""
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        boards = dict(self.boards, **{f"category:{category}": board for category, board in self.regions_per_category.items()})
+        if any(board.totals is None for board in boards.values()):
+            raise ValueError("Leaderboards were loaded without their totals; load them with totals=True to save them.")
+        totals = {name: [[key, total] for key, total in board.totals.items()] for name, board in boards.items()}
+        data = {
+            "k": self.k,
+            "boards": {name: board.to_dict() for name, board in self.boards.items()},
+            "regions_per_category": {category: board.to_dict() for category, board in self.regions_per_category.items()},
+        }
+        for target, content in ((totals_path_for(path), totals), (path, data)):
+            temp = target.with_suffix(".tmp")
+            temp.write_text(json.dumps(content))
+            os.replace(temp, target)
+
+    @classmethod
+    def load(cls, path: pathlib.Path = LEADERBOARDS_PATH, k: int = 10, totals: bool = False) -> "LeaderboardSet":
+        """
+        Load the saved leaderboards. By default only the top K lists are read,
+        which is all top() and top_regions() need; totals=True also reads the
+        per-entity totals so the set can be updated and saved.
+        """
+        path = pathlib.Path(path)
+        if not path.exists():
+            return cls(k)
+        data = json.loads(path.read_text())
+        saved_totals = json.loads(totals_path_for(path).read_text()) if totals else {}
+        leaderboards = cls(data["k"])
+        leaderboards.boards.update({
+            name: Leaderboard.from_dict(board, saved_totals.get(name) if totals else None) for name, board in data["boards"].items()
+        })
+        leaderboards.regions_per_category = {
+            category: Leaderboard.from_dict(board, saved_totals.get(f"category:{category}") if totals else None)
+            for category, board in data["regions_per_category"].items()
+        }
+        return leaderboards
@@ -0,0 +1,187 @@
+"""
+scripts/olap_queries.py
+
+Canonical OLAP queries against the smart_sales warehouse.
+
+These are the queries documented in the README and used by Smart_Sales.ipynb
+(region x category x month totals, top customers, and the roll-ups built on
+them). Keeping them in one place lets the CLI, the benchmarks and the
+query-plan checks all run exactly the same SQL.
+
+Months are taken with substr(purchase_date, 1, 7), which equals
+strftime('%Y-%m', purchase_date) for the YYYY-MM-DD text the ETL stores.
+
+The region/category/month totals can also be answered approximately from
+the stratified sale_sample (run_query(..., approximate=True)); the result
+then carries total_sales_low/total_sales_high confidence bounds, and the
+average sale per group (avg_sale_usd, total_sales over the exact row_count)
+with its bounds.
+
+run_query(..., engine="duckdb") runs the same SQL on the embedded DuckDB
+engine (scripts/duckdb_engine.py), over the warehouse or the prepared files.
+"""
+
+import pathlib
+import sqlite3
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+
+DB_PATH = pathlib.Path("data").joinpath("dw").joinpath("smart_sales.db")
+
+# Memory-map up to 256 MiB of the warehouse for readers
+READ_MMAP_SIZE = 256 * 1024 * 1024
+
+CANONICAL_QUERIES: Dict[str, str] = {
+    "sales_by_region_category_month": """
+        SELECT
+            c.customer_region AS customer_region,
+            p.product_category AS product_category,
+            substr(s.purchase_date, 1, 7) AS sale_month,
+            SUM(s.sale_amount_usd) AS total_sales
+        FROM sale s
+        JOIN customer c ON s.customer_id = c.customer_id
+        JOIN product p ON s.product_id = p.product_id
+        GROUP BY customer_region, product_category, sale_month
+        ORDER BY customer_region, product_category, sale_month
+    """,
+    "top_customers": """
+        SELECT c.customer_name AS customer_name, SUM(s.sale_amount_usd) AS total_spent
+        FROM sale s
+        JOIN customer c ON s.customer_id = c.customer_id
+        GROUP BY c.customer_name
+        ORDER BY total_spent DESC
+    """,
+    "sales_by_region_category": """
+        SELECT
+            c.customer_region AS customer_region,
+            p.product_category AS product_category,
+            SUM(s.sale_amount_usd) AS total_sales
+        FROM sale s
+        JOIN customer c ON s.customer_id = c.customer_id
+        JOIN product p ON s.product_id = p.product_id
+        GROUP BY customer_region, product_category
+        ORDER BY customer_region, product_category
+    """,
+    "monthly_sales_by_region": """
+        SELECT
+            c.customer_region AS customer_region,
+            substr(s.purchase_date, 1, 7) AS sale_month,
+            SUM(s.sale_amount_usd) AS total_sales
+        FROM sale s
+        JOIN customer c ON s.customer_id = c.customer_id
+        GROUP BY customer_region, sale_month
+        ORDER BY customer_region, sale_month
+    """,
+    # Reads the incrementally maintained customer_metrics (one row per customer), not sale
+    "customer_value_by_tier": """
+        SELECT
+            c.customer_tier AS customer_tier,
+            COUNT(*) AS customers,
+            SUM(m.total_revenue_usd) AS total_revenue,
+            AVG(m.total_revenue_usd) AS avg_revenue_per_customer,
+            SUM(m.total_revenue_usd) / SUM(m.order_count) AS avg_basket
+        FROM customer c
+        JOIN customer_metrics m ON m.customer_id = c.customer_id
+        GROUP BY customer_tier
+        ORDER BY total_revenue DESC
+    """,
+}
+
+ENGINES = ("sqlite", "duckdb")
+
+# Names the canonical queries give the customer- and product-grained tables (EXPLAIN QUERY PLAN shows these)
+DIMENSION_ALIASES = ("c", "p", "m")
+
+# Canonical queries that approximate mode can answer: name -> grouping columns
+APPROXIMATE_QUERIES: Dict[str, List[str]] = {
+    "sales_by_region_category_month": ["customer_region", "product_category", "sale_month"],
+    "sales_by_region_category": ["customer_region", "product_category"],
+    "monthly_sales_by_region": ["customer_region", "sale_month"],
+}
+
+
+def connect(db_path: pathlib.Path = DB_PATH) -> sqlite3.Connection:
+    """Open the warehouse for reading."""
+    if not pathlib.Path(db_path).exists():
+        raise FileNotFoundError(f"Warehouse not found at {db_path}. Run the load step first.")
+    conn = sqlite3.connect(f"file:{pathlib.Path(db_path).as_posix()}?mode=ro", uri=True)
+    conn.execute(f"PRAGMA mmap_size={READ_MMAP_SIZE}")
+    return conn
+
+
+def explain_query(name: str, conn: sqlite3.Connection) -> List[str]:
+    """Return the EXPLAIN QUERY PLAN detail lines for one canonical query."""
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + CANONICAL_QUERIES[name])]
+
+
+def full_scans(plan: List[str]) -> List[str]:
+    """
+    Plan lines that read a whole table instead of a covering index or a keyed search.
+
+    A join may scan the customer- or product-grained table it starts from:
+    customer, product and customer_metrics are clustered on their key
+    (WITHOUT ROWID), so an index over them would only duplicate the table.
+    """
+    return [
+        line for line in plan
+        if line.startswith("SCAN ") and "COVERING INDEX" not in line and line.split()[1] not in DIMENSION_ALIASES
+    ]
+
+
+def approximate_query(name: str, conn: sqlite3.Connection, confidence: float = 0.95) -> pd.DataFrame:
+    """
+    Answer one of the APPROXIMATE_QUERIES from the stratified sample, with confidence bounds.
+
+    Besides the query's total_sales the result has row_count (exact), the
+    average sale avg_sale_usd = total_sales / row_count with its bounds, and
+    sample_rows, the number of sampled rows behind each estimate.
+    """
+    from scripts.sale_sample import approximate_aggregate
+
+    if name not in APPROXIMATE_QUERIES:
+        raise ValueError(f"No approximate mode for '{name}'. Choose from: {', '.join(APPROXIMATE_QUERIES)}")
+    group_by = APPROXIMATE_QUERIES[name]
+    estimate = approximate_aggregate(conn, group_by, "sale_amount_usd", confidence)
+    estimate = estimate.rename(columns={
+        "sum": "total_sales", "sum_low": "total_sales_low", "sum_high": "total_sales_high",
+        "avg": "avg_sale_usd", "avg_low": "avg_sale_usd_low", "avg_high": "avg_sale_usd_high",
+    })
+    return estimate[
+        group_by + ["total_sales", "total_sales_low", "total_sales_high", "row_count",
+                    "avg_sale_usd", "avg_sale_usd_low", "avg_sale_usd_high", "sample_rows"]
+    ]
+
+
+def run_query(name: str, db_path: pathlib.Path = DB_PATH, params: Optional[Sequence] = None,
+              approximate: bool = False, confidence: float = 0.95, engine: str = "sqlite",
+              prepared_dir: Optional[pathlib.Path] = None) -> pd.DataFrame:
+    """
+    Run one of the CANONICAL_QUERIES by name and return the result (estimated from the sample if approximate).
+
+    engine="duckdb" runs it on DuckDB, over the warehouse or, if prepared_dir
+    is given, over the prepared files. Approximate answers read the sample
+    in the SQLite warehouse.
+    """
+    if name not in CANONICAL_QUERIES:
+        raise ValueError(f"Unknown query '{name}'. Choose from: {', '.join(CANONICAL_QUERIES)}")
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'. Choose from: {', '.join(ENGINES)}")
+    if engine == "duckdb":
+        if approximate:
+            raise ValueError("Approximate mode reads the sample in the SQLite warehouse; use engine='sqlite'.")
+        from scripts import duckdb_engine
+
+        duck = duckdb_engine.connect(db_path, prepared_dir)
+        try:
+            return duckdb_engine.run_query(name, duck, params)
+        finally:
+            duck.close()
+
+    conn = connect(db_path)
+    try:
+        if approximate:
+            return approximate_query(name, conn, confidence)
+        return pd.read_sql_query(CANONICAL_QUERIES[name], conn, params=params)
+    finally:
+        conn.close()
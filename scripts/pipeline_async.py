@@ -0,0 +1,257 @@
+"""
+scripts/pipeline_async.py
+
+Pipelined prepare-and-load run built on asyncio.
+
+The batch scripts run each stage to completion before starting the next one:
+read every raw file, clean it, write the prepared CSV, then read the prepared
+files again and insert them. This module connects the stages with bounded
+queues so they overlap:
+
+    reader (thread)  ->  queue  ->  cleaners (process pool)  ->  queue  ->  writer/loader (thread)
+
+- the reader parses raw CSV files in a worker thread,
+- cleaners run data_prep2.clean_dataframe in a process pool (CPU-bound),
+- the writer/loader writes the prepared CSV and inserts into SQLite at the same time.
+
+The bounded queues give backpressure: a fast reader waits when the cleaners
+fall behind instead of holding every file in memory. The unit of work is one
+file, since cleaning needs the whole table for dedup and z-scores.
+
+A monitor task samples queue depths while the pipeline runs; the returned
+stats report max/mean depth per queue and busy time per stage, which is what
+to look at when tuning queue sizes and worker counts. With enough files the
+wall time approaches the busiest stage rather than the sum of all stages.
+
+Run from the project root:
+
+    python scripts/pipeline_async.py
+"""
+
+import asyncio
+import logging
+import os
+import pathlib
+import sqlite3
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+# For local imports, temporarily add project root to sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.data_preparation import data_prep2  # noqa: E402
+from scripts.export_dashboard import export_dashboard_artifacts  # noqa: E402
+from scripts.etl_to_dw import (  # noqa: E402
+    DB_PATH, TABLE_FOR_STEM, configure_for_build, create_schema, insert_table, optimize_for_reads, refresh_sales_aggregates,
+    discard_staging, staging_path_for, swap_into_place,
+)
+
+logger = logging.getLogger(__name__)
+
+RAW_DATA_DIR = pathlib.Path("data").joinpath("raw")
+
+# Marks the end of the stream on a queue
+_DONE = None
+
+
+def _clean_in_worker(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
+    """Process-pool entry point: clean one raw DataFrame and return it with its change log."""
+    change_log = []
+    return data_prep2.clean_dataframe(df, change_log), change_log
+
+
+class _StageTimer:
+    """Accumulates the time a stage spends doing work (not waiting on queues)."""
+
+    def __init__(self):
+        self.busy = 0.0
+        self.items = 0
+
+    def add(self, seconds: float) -> None:
+        self.busy += seconds
+        self.items += 1
+
+
+async def _reader(paths: List[pathlib.Path], out_queue: asyncio.Queue, cleaners: int, timer: _StageTimer) -> None:
+    for path in paths:
+        started = time.perf_counter()
+        try:
+            df = await asyncio.to_thread(data_prep2.read_raw_file, path)
+        except Exception as e:
+            logger.error(f"An error occurred while reading {path.name}: {e}")
+            await asyncio.to_thread(data_prep2.save_error_report, path, e)
+            continue
+        timer.add(time.perf_counter() - started)
+        await out_queue.put((path, df))
+    for _ in range(cleaners):
+        await out_queue.put(_DONE)
+
+
+async def _cleaner(in_queue: asyncio.Queue, out_queue: asyncio.Queue, executor: Executor, timer: _StageTimer) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        item = await in_queue.get()
+        if item is _DONE:
+            await out_queue.put(_DONE)
+            return
+        path, df = item
+        started = time.perf_counter()
+        try:
+            cleaned, change_log = await loop.run_in_executor(executor, _clean_in_worker, df)
+        except Exception as e:
+            logger.error(f"An error occurred while cleaning {path.name}: {e}")
+            await asyncio.to_thread(data_prep2.save_error_report, path, e)
+            continue
+        timer.add(time.perf_counter() - started)
+        await out_queue.put((path, cleaned, change_log))
+
+
+def _write_prepared(path: pathlib.Path, df: pd.DataFrame, change_log: List[str]) -> None:
+    prepared_file_path = data_prep2.prepared_path_for(path)
+    prepared_file_path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(prepared_file_path, index=False)
+    data_prep2.save_report(path, change_log)
+
+
+def _load_table(conn: sqlite3.Connection, table: str, df: pd.DataFrame) -> None:
+    insert_table(table, df, conn.cursor())
+    conn.commit()
+
+
+async def _writer_loader(
+    in_queue: asyncio.Queue, cleaners: int, conn: sqlite3.Connection, write_prepared: bool, timer: _StageTimer,
+    loaded: Dict[str, pd.DataFrame],
+) -> None:
+    finished = 0
+    while finished < cleaners:
+        item = await in_queue.get()
+        if item is _DONE:
+            finished += 1
+            continue
+        path, df, change_log = item
+        table = TABLE_FOR_STEM.get(pathlib.Path(path).stem)
+        started = time.perf_counter()
+        jobs = []
+        if write_prepared:
+            jobs.append(asyncio.to_thread(_write_prepared, path, df, change_log))
+        if table is not None:
+            jobs.append(asyncio.to_thread(_load_table, conn, table, df))
+            loaded[table] = df
+        else:
+            logger.warning(f"No warehouse table for {path.name}; prepared file only.")
+        try:
+            await asyncio.gather(*jobs)
+        except Exception as e:
+            raise RuntimeError(f"Could not write or load {path.name}: {e}") from e
+        timer.add(time.perf_counter() - started)
+        logger.info(f"Finished {path.name}: {len(df)} rows")
+
+
+async def _monitor(queues: Dict[str, asyncio.Queue], interval: float, samples: Dict[str, List[int]]) -> None:
+    while True:
+        for name, queue in queues.items():
+            samples[name].append(queue.qsize())
+        logger.debug("Queue depths: " + ", ".join(f"{name}={queue.qsize()}/{queue.maxsize}" for name, queue in queues.items()))
+        await asyncio.sleep(interval)
+
+
+async def run_pipeline(
+    paths: List[pathlib.Path],
+    db_path: pathlib.Path = DB_PATH,
+    queue_size: int = 2,
+    cleaners: Optional[int] = None,
+    use_processes: bool = True,
+    write_prepared: bool = True,
+    monitor_interval: float = 0.05,
+) -> Dict:
+    """
+    Prepare and load the given raw files with overlapping stages.
+
+    Like the staged batch load, the warehouse is built in a staging folder
+    next to db_path and swapped in once every table is loaded. A file that
+    cannot be read or cleaned is logged with an error report and skipped;
+    if that leaves a warehouse table without data, RuntimeError is raised
+    and the live warehouse is left as it was.
+
+    Returns a stats dict with wall_seconds, busy seconds per stage and
+    max/mean queue depth per queue.
+    """
+    cleaners = cleaners or min(len(paths), os.cpu_count() or 1) or 1
+    read_queue = asyncio.Queue(maxsize=queue_size)
+    load_queue = asyncio.Queue(maxsize=queue_size)
+    timers = {"read": _StageTimer(), "clean": _StageTimer(), "write_load": _StageTimer()}
+    samples = {"read_queue": [], "load_queue": []}
+    loaded = {}
+
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    staging_path = staging_path_for(db_path)
+    started = time.perf_counter()
+    try:
+        # Only the writer/loader stage touches the connection, one call at a time
+        conn = sqlite3.connect(staging_path, check_same_thread=False)
+        executor = ProcessPoolExecutor(max_workers=cleaners) if use_processes else ThreadPoolExecutor(max_workers=cleaners)
+        try:
+            configure_for_build(conn)
+            create_schema(conn.cursor())
+            conn.commit()
+
+            monitor = asyncio.create_task(
+                _monitor({"read_queue": read_queue, "load_queue": load_queue}, monitor_interval, samples)
+            )
+            stages = [
+                asyncio.create_task(_reader(paths, read_queue, cleaners, timers["read"])),
+                *[asyncio.create_task(_cleaner(read_queue, load_queue, executor, timers["clean"])) for _ in range(cleaners)],
+                asyncio.create_task(_writer_loader(load_queue, cleaners, conn, write_prepared, timers["write_load"], loaded)),
+            ]
+            try:
+                await asyncio.gather(*stages)
+            finally:
+                # A failed stage would leave the others blocked on their queues
+                for task in stages + [monitor]:
+                    task.cancel()
+                await asyncio.gather(*stages, monitor, return_exceptions=True)
+
+            missing = [table for table in TABLE_FOR_STEM.values() if table not in loaded]
+            if missing:
+                raise RuntimeError(f"No data loaded for {', '.join(missing)}; see the error reports in {data_prep2.REPORT_DIR}. The live warehouse was not replaced.")
+
+            # Derived structures need every table loaded first
+            await asyncio.to_thread(refresh_sales_aggregates, loaded["sale"], conn, True)
+            await asyncio.to_thread(optimize_for_reads, conn)
+        finally:
+            executor.shutdown()
+            conn.close()
+    except BaseException:
+        # The live warehouse stays as it was; nothing of this build is kept
+        discard_staging(staging_path)
+        raise
+    await asyncio.to_thread(swap_into_place, staging_path, db_path)
+
+    await asyncio.to_thread(export_dashboard_artifacts, db_path)
+
+    stats = {"wall_seconds": time.perf_counter() - started}
+    for name, timer in timers.items():
+        stats[f"{name}_busy_seconds"] = timer.busy
+    for name, depths in samples.items():
+        stats[f"{name}_max_depth"] = max(depths, default=0)
+        stats[f"{name}_mean_depth"] = sum(depths) / len(depths) if depths else 0.0
+    logger.info(f"Pipeline stats: {stats}")
+    return stats
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    if not RAW_DATA_DIR.exists():
+        logger.error(f"Directory not found: {RAW_DATA_DIR}")
+        return
+    asyncio.run(run_pipeline(sorted(RAW_DATA_DIR.glob("*.csv"))))
+
+
+if __name__ == "__main__":
+    main()
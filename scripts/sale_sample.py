@@ -0,0 +1,275 @@
+"""
+scripts/sale_sample.py
+
+Stratified sample of the sale table for fast approximate aggregates.
+
+The sample is stratified by customer_region x product_category x sale_month
+and kept in two warehouse tables:
+
+- sale_sample          the sampled rows (dimensions denormalized) with
+                       sample_weight = 1 / inclusion probability
+- sale_sample_strata   the exact number of sale rows in every stratum
+                       and its cutoff_draw (see below)
+
+Every row gets a uniform draw, a hash of its transaction_id. A row is in
+the sample when its draw is below its stratum's probability: the larger of
+the stratum's rate and its cutoff_draw, the (MIN_STRATUM_ROWS + 1)-th
+smallest draw in the stratum (1.0 while the stratum has no more than
+MIN_STRATUM_ROWS rows). So small strata are kept whole, every stratum keeps
+at least MIN_STRATUM_ROWS rows, and the sample depends only on which rows
+were loaded, not on their order or batching: the daemon and CDC end up with
+the sample a full load would draw. A batch can only lower a stratum's
+cutoff; rows whose draw is no longer below the probability are dropped and
+the weights of the rest updated.
+
+Removed rows (CDC updates and deletes) are taken out of both tables and the
+cutoffs kept, so the rest is still a valid sample of the stratum, though it
+can be smaller than a reload's.
+
+approximate_aggregate() answers COUNT exactly from the stratum counts and
+SUM/AVG from the sample (a weighted mean per stratum scaled by the
+stratum's count) with a normal confidence interval. Reading the sample
+costs milliseconds whatever the size of sale. A stratum whose sampled rows
+were all removed is summed exactly from sale instead (only those strata
+touch sale). Like the leaderboards, rows keep the region/category they
+were loaded with; a full load resamples everything.
+"""
+
+import sqlite3
+from statistics import NormalDist
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Constants
+SAMPLE_RATE = 0.01
+MIN_STRATUM_ROWS = 30
+STRATUM_COLUMNS = ["customer_region", "product_category", "sale_month"]
+SAMPLE_COLUMNS = ["transaction_id"] + STRATUM_COLUMNS + ["sale_amount_usd", "quantity_sold", "sample_weight"]
+
+
+def _draws(transaction_ids: pd.Series) -> np.ndarray:
+    """A uniform [0, 1) number per transaction id, the same on every run."""
+    hashes = pd.util.hash_pandas_object(transaction_ids.astype("int64"), index=False).to_numpy()
+    return (hashes >> np.uint64(11)).astype("float64") / float(1 << 53)
+
+
+def _with_strata(joined: pd.DataFrame) -> pd.DataFrame:
+    """Rows that the exact queries count (known region and category) with their sale_month."""
+    rows = joined.dropna(subset=["customer_region", "product_category", "purchase_date"]).copy()
+    rows["sale_month"] = rows["purchase_date"].astype(str).str[:7]
+    return rows
+
+
+def _stratum_rows(rows: pd.DataFrame) -> List[Tuple]:
+    counts = rows.groupby(STRATUM_COLUMNS).size()
+    return [key + (int(count),) for key, count in counts.items()]
+
+
+def _sampled_rows(conn: sqlite3.Connection, strata: pd.DataFrame) -> pd.DataFrame:
+    """transaction_id, stratum and draw of the sampled rows in the given strata."""
+    keys = list(strata[STRATUM_COLUMNS].itertuples(index=False, name=None))
+    frames = []
+    for start in range(0, len(keys), 300):  # three parameters per stratum, under SQLite's limit
+        chunk = keys[start:start + 300]
+        frames.append(pd.read_sql_query(
+            f"""
+            SELECT transaction_id, {", ".join(STRATUM_COLUMNS)} FROM sale_sample
+            WHERE ({", ".join(STRATUM_COLUMNS)}) IN (VALUES {", ".join("(?, ?, ?)" for _ in chunk)})
+            """,
+            conn,
+            params=[value for key in chunk for value in key],
+        ))
+    sampled = pd.concat(frames, ignore_index=True)
+    return sampled.assign(draw=_draws(sampled["transaction_id"]))
+
+
+def _exact_strata(conn: sqlite3.Connection, strata: pd.DataFrame, measure: str) -> pd.DataFrame:
+    """Exact SUM of measure over sale for the given strata."""
+    keys = list(strata[STRATUM_COLUMNS].itertuples(index=False, name=None))
+    frames = []
+    for start in range(0, len(keys), 300):  # three parameters per stratum, under SQLite's limit
+        chunk = keys[start:start + 300]
+        frames.append(pd.read_sql_query(
+            f"""
+            SELECT c.customer_region, p.product_category, substr(s.purchase_date, 1, 7) AS sale_month,
+                   TOTAL(s.{measure}) AS exact_total
+            FROM sale s
+            JOIN customer c ON s.customer_id = c.customer_id
+            JOIN product p ON s.product_id = p.product_id
+            WHERE (c.customer_region, p.product_category, substr(s.purchase_date, 1, 7)) IN (VALUES {", ".join("(?, ?, ?)" for _ in chunk)})
+            GROUP BY 1, 2, 3
+            """,
+            conn,
+            params=[value for key in chunk for value in key],
+        ))
+    return pd.concat(frames, ignore_index=True)
+
+
+def update_sale_sample(conn: sqlite3.Connection, joined: pd.DataFrame, rebuild: bool = False,
+                       removed: Optional[pd.DataFrame] = None, rate: float = SAMPLE_RATE,
+                       rates: Optional[Dict[Tuple[str, str], float]] = None,
+                       min_stratum_rows: int = MIN_STRATUM_ROWS) -> None:
+    """
+    Merge a batch of sales rows (joined with customer_region and product_category,
+    dates as YYYY-MM-DD text) into sale_sample and sale_sample_strata.
+
+    rates overrides the sampling rate for given (region, category) pairs; the
+    rates must not change between batches (reload to change them).
+    removed holds previously loaded rows that were updated or deleted.
+    """
+    cursor = conn.cursor()
+    if rebuild:
+        cursor.execute("DELETE FROM sale_sample")
+        cursor.execute("DELETE FROM sale_sample_strata")
+
+    if removed is not None and len(removed) > 0:
+        # The cutoffs stay: the rest of each stratum is still a sample at its probability
+        removed_ids = [(int(key),) for key in removed["transaction_id"]]
+        cursor.executemany("DELETE FROM sale_sample WHERE transaction_id = ?", removed_ids)
+        cursor.executemany(
+            """
+            UPDATE sale_sample_strata SET population_rows = population_rows - ?
+            WHERE customer_region = ? AND product_category = ? AND sale_month = ?
+            """,
+            [(row[-1],) + row[:-1] for row in _stratum_rows(_with_strata(removed))],
+        )
+        cursor.execute("DELETE FROM sale_sample_strata WHERE population_rows <= 0")
+
+    rows = _with_strata(joined)
+    if rows.empty:
+        return
+    draws = _draws(rows["transaction_id"])
+    codes = rows.groupby(STRATUM_COLUMNS, sort=False).ngroup().to_numpy()
+    strata = rows[STRATUM_COLUMNS].iloc[np.unique(codes, return_index=True)[1]].reset_index(drop=True)
+    strata["batch_rows"] = np.bincount(codes)
+    strata = strata.merge(pd.read_sql_query("SELECT * FROM sale_sample_strata", conn), on=STRATUM_COLUMNS, how="left")
+    old_cutoff = strata["cutoff_draw"].fillna(1.0).to_numpy()
+    sampled = _sampled_rows(conn, strata).merge(strata[STRATUM_COLUMNS].assign(code=strata.index), on=STRATUM_COLUMNS)
+    sampled_codes = sampled["code"].to_numpy()
+
+    # The lowest min_stratum_rows + 1 draws of a stratum are among its new rows,
+    # the sampled rows below the old cutoff and the old cutoff itself
+    below = sampled["draw"].to_numpy() < old_cutoff[sampled_codes]
+    known = old_cutoff < 1.0
+    candidate_codes = np.concatenate([codes, sampled_codes[below], np.flatnonzero(known)])
+    candidate_draws = np.concatenate([draws, sampled["draw"].to_numpy()[below], old_cutoff[known]])
+    order = np.lexsort((candidate_draws, candidate_codes))
+    candidate_codes, candidate_draws = candidate_codes[order], candidate_draws[order]
+    rank = np.arange(len(order)) - np.searchsorted(candidate_codes, candidate_codes)
+    cutoff = np.ones(len(strata))
+    cutoff[candidate_codes[rank == min_stratum_rows]] = candidate_draws[rank == min_stratum_rows]
+
+    stratum_rate = np.full(len(strata), rate)
+    for (region, category), override in (rates or {}).items():
+        stratum_rate[((strata["customer_region"] == region) & (strata["product_category"] == category)).to_numpy()] = override
+    probability = np.maximum(stratum_rate, cutoff)
+
+    # A row stays in the sample while its draw is below its stratum's probability
+    cursor.executemany(
+        "DELETE FROM sale_sample WHERE transaction_id = ?",
+        [(int(key),) for key in sampled.loc[sampled["draw"].to_numpy() >= probability[sampled_codes], "transaction_id"]],
+    )
+    cursor.executemany(
+        """
+        UPDATE sale_sample SET sample_weight = ?
+        WHERE customer_region = ? AND product_category = ? AND sale_month = ?
+        """,
+        [(1.0 / stratum_probability, *key) for stratum_probability, key in zip(probability, strata[STRATUM_COLUMNS].itertuples(index=False, name=None))],
+    )
+    keep = draws < probability[codes]
+    new_rows = rows[keep].assign(sample_weight=1.0 / probability[codes[keep]])[SAMPLE_COLUMNS]
+    cursor.executemany(
+        f"INSERT OR REPLACE INTO sale_sample ({', '.join(SAMPLE_COLUMNS)}) VALUES ({', '.join('?' for _ in SAMPLE_COLUMNS)})",
+        new_rows.astype(object).where(new_rows.notna(), None).itertuples(index=False, name=None),
+    )
+    cursor.executemany(
+        """
+        INSERT INTO sale_sample_strata (customer_region, product_category, sale_month, population_rows, cutoff_draw)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (customer_region, product_category, sale_month)
+        DO UPDATE SET population_rows = population_rows + excluded.population_rows, cutoff_draw = excluded.cutoff_draw
+        """,
+        [
+            (*key, int(batch_rows), float(stratum_cutoff))
+            for key, batch_rows, stratum_cutoff in zip(strata[STRATUM_COLUMNS].itertuples(index=False, name=None), strata["batch_rows"], cutoff)
+        ],
+    )
+
+
+def approximate_aggregate(conn: sqlite3.Connection, group_by: List[str], measure: str = "sale_amount_usd",
+                          confidence: float = 0.95) -> pd.DataFrame:
+    """
+    Estimate COUNT, SUM and AVG of a measure per group from the sample.
+
+    group_by is any subset of STRATUM_COLUMNS. Returns the group columns and
+    row_count (exact), sum, sum_low, sum_high, avg, avg_low, avg_high and
+    sample_rows. Each stratum's mean is the ratio sum(w * y) / sum(w) over
+    its sampled rows; the stratum totals (row count x mean) and their
+    variances are added up per group, and the bounds are the normal interval.
+    The averages are the sums over the exact row counts.
+
+    A stratum with rows but no sampled measure values (removals took them
+    all) is summed exactly from sale, with no variance. If sale no longer
+    has it either (its customers or products changed dimension since), its
+    group gets NaN estimates rather than a total that leaves it out.
+
+    For a skewed measure the normal interval under-covers strata with few
+    sampled rows: with lognormal sale amounts about 88-92% of the 95%
+    intervals cover the exact total at ~170 sampled rows per stratum, and
+    close to 95% from ~350. Raise the rate (or min_stratum_rows) where small
+    strata matter.
+    """
+    unknown = [column for column in group_by if column not in STRATUM_COLUMNS]
+    if unknown or not group_by:
+        raise ValueError(f"group_by must be a subset of {STRATUM_COLUMNS}, got {group_by}")
+    if measure not in ("sale_amount_usd", "quantity_sold"):
+        raise ValueError(f"Unknown measure '{measure}'")
+
+    strata = ", ".join(STRATUM_COLUMNS)
+    # (w * w - w) = (1 - p) / p^2, the Poisson-sampling variance weight
+    per_stratum = pd.read_sql_query(
+        f"""
+        SELECT {strata},
+               COUNT(*) AS sample_rows,
+               SUM(sample_weight) AS w,
+               SUM(sample_weight * {measure}) AS wy,
+               SUM((sample_weight * sample_weight - sample_weight) * {measure} * {measure}) AS v_yy,
+               SUM((sample_weight * sample_weight - sample_weight) * {measure}) AS v_y,
+               SUM(sample_weight * sample_weight - sample_weight) AS v_1
+        FROM sale_sample
+        GROUP BY {strata}
+        """,
+        conn,
+    )
+    population = pd.read_sql_query("SELECT * FROM sale_sample_strata", conn)
+    per_stratum = population.merge(per_stratum, on=STRATUM_COLUMNS, how="left")
+
+    mean = per_stratum["wy"] / per_stratum["w"]
+    mean_variance = (per_stratum["v_yy"] - 2 * mean * per_stratum["v_y"] + mean * mean * per_stratum["v_1"]) / (per_stratum["w"] ** 2)
+    per_stratum["total"] = per_stratum["population_rows"] * mean
+    per_stratum["total_variance"] = per_stratum["population_rows"] ** 2 * mean_variance.clip(lower=0)
+    unsampled = per_stratum["total"].isna()
+    if unsampled.any():
+        exact = per_stratum.loc[unsampled, STRATUM_COLUMNS].merge(_exact_strata(conn, per_stratum[unsampled], measure), on=STRATUM_COLUMNS, how="left")
+        per_stratum.loc[unsampled, "total"] = exact["exact_total"].to_numpy()
+        per_stratum.loc[unsampled, "total_variance"] = 0.0
+    per_stratum["unestimated"] = per_stratum["total"].isna()
+
+    result = per_stratum.groupby(group_by, as_index=False).agg(
+        row_count=("population_rows", "sum"),
+        sum=("total", "sum"),
+        variance=("total_variance", "sum"),
+        sample_rows=("sample_rows", "sum"),
+        unestimated=("unestimated", "any"),
+    )
+    result.loc[result["unestimated"], ["sum", "variance"]] = np.nan
+    result["sample_rows"] = result["sample_rows"].fillna(0).astype("int64")
+    margin = NormalDist().inv_cdf(0.5 + confidence / 2) * np.sqrt(result["variance"])
+    result["sum_low"] = result["sum"] - margin
+    result["sum_high"] = result["sum"] + margin
+    for column in ("", "_low", "_high"):
+        result[f"avg{column}"] = result[f"sum{column}"] / result["row_count"]
+    columns = group_by + ["row_count", "sum", "sum_low", "sum_high", "avg", "avg_low", "avg_high", "sample_rows"]
+    return result[columns].sort_values(group_by, ignore_index=True)
@@ -0,0 +1,201 @@
+"""
+scripts/smart_store.py
+
+Single command-line entry point for the smart store pipeline.
+
+Run from the project root:
+
+    python -m scripts.smart_store --help
+    python -m scripts.smart_store prepare            # raw -> prepared CSV files
+    python -m scripts.smart_store prepare --pipeline # prepare and load with overlapping stages
+    python -m scripts.smart_store prepare --backend dask  # clean files larger than memory
+    python -m scripts.smart_store load               # prepared CSV files -> warehouse
+    python -m scripts.smart_store run                # prepare and load in one process, no CSV round trip
+    python -m scripts.smart_store query --list
+    python -m scripts.smart_store query top_customers
+    python -m scripts.smart_store query sales_by_region_category --approx  # from the sample, with bounds
+    python -m scripts.smart_store bench              # time the canonical queries
+    python -m scripts.smart_store bench --engine duckdb --prepared data/prepared
+    python -m scripts.smart_store bench --rows 1000000 10000000  # SQLite vs DuckDB on synthetic data
+    python -m scripts.smart_store dashboard top_customers  # read a precomputed dashboard dataset
+    python -m scripts.smart_store schema             # regenerate data/schema_registry.json
+
+Only the standard library is imported at startup. pandas, scipy and the
+pipeline modules are imported inside each subcommand, so `--help` and
+argument errors return immediately.
+"""
+
+import argparse
+import logging
+import pathlib
+import sys
+import time
+from typing import List, Optional
+
+# For local imports, temporarily add project root to sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+DEFAULT_DB_PATH = pathlib.Path("data").joinpath("dw").joinpath("smart_sales.db")
+
+
+def cmd_prepare(args: argparse.Namespace) -> int:
+    if args.pipeline:
+        import asyncio
+        from scripts import pipeline_async
+
+        raw_files = sorted(pathlib.Path("data").joinpath("raw").glob("*.csv"))
+        asyncio.run(pipeline_async.run_pipeline(raw_files, db_path=args.db))
+    else:
+        from scripts.data_preparation import data_prep2
+
+        data_prep2.main(backend=args.backend, persist=args.persist)
+    return 0
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    from scripts.data_preparation import data_prep2
+
+    data_prep2.prepare_and_load(write_prepared=not args.no_prepared_files, staged=not args.in_place, in_memory=args.in_memory)
+    return 0
+
+
+def cmd_load(args: argparse.Namespace) -> int:
+    from scripts import etl_to_dw
+
+    etl_to_dw.load_data_to_db(staged=not args.in_place, in_memory=args.in_memory)
+    return 0
+
+
+def cmd_query(args: argparse.Namespace) -> int:
+    from scripts import olap_queries
+
+    if args.list or not args.name:
+        print("\n".join(olap_queries.CANONICAL_QUERIES))
+        return 0
+    if args.explain:
+        conn = olap_queries.connect(args.db)
+        try:
+            print("\n".join(olap_queries.explain_query(args.name, conn)))
+        finally:
+            conn.close()
+        return 0
+    result = olap_queries.run_query(
+        args.name, db_path=args.db, approximate=args.approx, confidence=args.confidence,
+        engine=args.engine, prepared_dir=args.prepared,
+    )
+    print(result.to_string(index=False))
+    return 0
+
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    from scripts import olap_queries
+
+    if args.rows:
+        from scripts import benchmark_engines
+
+        results = benchmark_engines.run_benchmark(args.rows, args.names, args.repeat, bench_dir=args.bench_dir)
+        table = results.pivot_table(index=["rows", "query"], columns="engine", values="best_ms", dropna=False)
+        print(f"Best of {args.repeat} runs, ms")
+        print(table.round(1).to_string())
+        return 0
+
+    names = args.names or list(olap_queries.CANONICAL_QUERIES)
+    for name in names:
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            olap_queries.run_query(name, db_path=args.db, engine=args.engine, prepared_dir=args.prepared)
+            timings.append(time.perf_counter() - started)
+        print(f"{name}: best {min(timings) * 1000:.2f} ms, mean {sum(timings) / len(timings) * 1000:.2f} ms over {args.repeat} runs")
+    return 0
+
+
+def cmd_dashboard(args: argparse.Namespace) -> int:
+    from scripts import export_dashboard
+
+    out_dir = args.db.parent.joinpath(export_dashboard.DASHBOARD_DIR.name)
+    if args.export or not out_dir.joinpath(export_dashboard.MANIFEST_NAME).exists():
+        export_dashboard.export_dashboard_artifacts(args.db, out_dir)
+    if not args.name:
+        print("\n".join(export_dashboard.DATASETS))
+        return 0
+    print(export_dashboard.load_dashboard_dataset(args.name, out_dir).to_string(index=False))
+    return 0
+
+
+def cmd_schema(args: argparse.Namespace) -> int:
+    from scripts.data_preparation import common_utils
+
+    registry = common_utils.build_schema_registry(sample_rows=args.sample_rows)
+    common_utils.save_schema_registry(registry)
+    print(f"Registered {len(registry['sources'])} sources in {common_utils.SCHEMA_REGISTRY_PATH}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="smart-store", description="Prepare, load and query the smart store data warehouse.")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Show INFO log messages.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    prepare = subparsers.add_parser("prepare", help="Clean the raw CSV files into data/prepared.")
+    prepare.add_argument("--pipeline", action="store_true", help="Prepare and load with the pipelined asyncio executor.")
+    prepare.add_argument("--backend", choices=["pandas", "dask"], default="pandas", help="dask cleans each file out of core on all cores.")
+    prepare.add_argument("--persist", action="store_true", help="With --backend dask: keep each file in memory between cleaning steps (faster; only for files that fit in memory).")
+    prepare.add_argument("--db", type=pathlib.Path, default=DEFAULT_DB_PATH)
+    prepare.set_defaults(handler=cmd_prepare)
+
+    load = subparsers.add_parser("load", help="Load the prepared files into the warehouse.")
+    load.add_argument("--in-place", action="store_true", help="Drop and reload tables in the live database instead of swapping in a staged copy.")
+    load.add_argument("--in-memory", action="store_true", help="Build the staged copy in memory and write it out with the backup API.")
+    load.set_defaults(handler=cmd_load)
+
+    run = subparsers.add_parser("run", help="Prepare and load in one process, handing cleaned tables straight to the loader.")
+    run.add_argument("--no-prepared-files", action="store_true", help="Skip writing data/prepared (written in the background otherwise).")
+    run.add_argument("--in-place", action="store_true", help="Drop and reload tables in the live database instead of swapping in a staged copy.")
+    run.add_argument("--in-memory", action="store_true", help="Build the staged copy in memory and write it out with the backup API.")
+    run.set_defaults(handler=cmd_run)
+
+    query = subparsers.add_parser("query", help="Run a canonical OLAP query.")
+    query.add_argument("name", nargs="?", help="Query name (see --list).")
+    query.add_argument("--list", action="store_true", help="List the available queries.")
+    query.add_argument("--explain", action="store_true", help="Print the SQLite query plan instead of the result.")
+    query.add_argument("--approx", action="store_true", help="Estimate from the stratified sale sample, with confidence bounds.")
+    query.add_argument("--confidence", type=float, default=0.95, help="Confidence level for --approx (default: 0.95).")
+    query.add_argument("--engine", choices=["sqlite", "duckdb"], default="sqlite", help="Query engine (default: sqlite).")
+    query.add_argument("--prepared", type=pathlib.Path, help="With --engine duckdb: read this folder of prepared files instead of the warehouse.")
+    query.add_argument("--db", type=pathlib.Path, default=DEFAULT_DB_PATH)
+    query.set_defaults(handler=cmd_query)
+
+    bench = subparsers.add_parser("bench", help="Time the canonical OLAP queries.")
+    bench.add_argument("names", nargs="*", help="Queries to time (default: all).")
+    bench.add_argument("--repeat", type=int, default=5)
+    bench.add_argument("--db", type=pathlib.Path, default=DEFAULT_DB_PATH)
+    bench.add_argument("--engine", choices=["sqlite", "duckdb"], default="sqlite", help="Query engine (default: sqlite).")
+    bench.add_argument("--prepared", type=pathlib.Path, help="With --engine duckdb: read this folder of prepared files instead of the warehouse.")
+    bench.add_argument("--rows", type=int, nargs="+", help="Compare SQLite and DuckDB on synthetic data of these sizes, e.g. --rows 1000000 10000000 100000000.")
+    bench.add_argument("--bench-dir", type=pathlib.Path, default=pathlib.Path("data").joinpath("bench"), help="Where synthetic data is generated and kept.")
+    bench.set_defaults(handler=cmd_bench)
+
+    dashboard = subparsers.add_parser("dashboard", help="Print a precomputed dashboard dataset.")
+    dashboard.add_argument("name", nargs="?", help="Dataset name (omit to list them).")
+    dashboard.add_argument("--export", action="store_true", help="Refresh the dashboard files from the warehouse first.")
+    dashboard.add_argument("--db", type=pathlib.Path, default=DEFAULT_DB_PATH)
+    dashboard.set_defaults(handler=cmd_dashboard)
+
+    schema = subparsers.add_parser("schema", help="Regenerate the schema registry from the raw and prepared files.")
+    schema.add_argument("--sample-rows", type=int, default=1000, help="Rows sampled per file to infer unlisted column types.")
+    schema.set_defaults(handler=cmd_schema)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+scripts/timeseries_index.py
+
+Prefix-sum time-series index over the sales fact.
+
+For each series (all sales, each customer region, each product category) the
+index keeps daily cumulative sums of sale_amount_usd and quantity_sold:
+
+    prefix[i] = total of all days before day i  (prefix[0] == 0)
+
+so any date-range total is prefix[end + 1] - prefix[start], an O(1)
+lookup. Moving averages and period-over-period comparisons are built from
+two such lookups.
+
+The index is built during etl_to_dw loads and extended from each new batch.
+A batch that only adds later days touches just the appended part of each
+array.
+
+Usage:
+
+    index = TimeSeriesIndex.load()
+    index.range_total("region", "East", "sale_amount_usd", "2024-01-01", "2024-03-31")
+    index.moving_average("category", "Electronics", "quantity_sold", "2024-06-30", window_days=30)
+"""
+
+import pathlib
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Constants
+DW_DIR = pathlib.Path("data").joinpath("dw")
+INDEX_PATH = DW_DIR.joinpath("sales_timeseries.npz")
+
+METRICS = ("sale_amount_usd", "quantity_sold")
+
+# Dimension name -> column in the joined sales frame (None means all sales)
+DIMENSIONS = {"all": None, "region": "customer_region", "category": "product_category"}
+
+SeriesKey = Tuple[str, str, str]  # (dimension, value, metric)
+
+
+def _to_day(value) -> np.datetime64:
+    return np.datetime64(pd.Timestamp(value).date(), "D")
+
+
+class TimeSeriesIndex:
+    """Daily prefix sums per (dimension, value, metric) for O(1) date-range queries."""
+
+    def __init__(self):
+        self.start = None  # first day covered, np.datetime64[D]
+        self.days = 0
+        self.prefix: Dict[SeriesKey, np.ndarray] = {}
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def _resize(self, first_day: np.datetime64, last_day: np.datetime64) -> None:
+        """Grow every array so it covers first_day..last_day."""
+        if self.start is None:
+            self.start = first_day
+            self.days = int((last_day - first_day).astype(int)) + 1
+            return
+        front = max(int((self.start - first_day).astype(int)), 0)
+        end = self.start + np.timedelta64(self.days - 1, "D")
+        back = max(int((last_day - end).astype(int)), 0)
+        if front == 0 and back == 0:
+            return
+        for key, prefix in self.prefix.items():
+            # Earlier days add leading zeros; later days repeat the running total
+            self.prefix[key] = np.concatenate([np.zeros(front), prefix, np.full(back, prefix[-1])])
+        self.start = self.start - np.timedelta64(front, "D")
+        self.days += front + back
+
+    def extend(self, sales_df: pd.DataFrame) -> None:
+        """
+        Add a batch of sales rows to the index.
+
+        sales_df needs purchase_date, customer_region, product_category and
+        the METRICS columns. Rows with no date are ignored.
+        """
+        dates = pd.to_datetime(sales_df["purchase_date"], errors="coerce")
+        valid = dates.notna().to_numpy()
+        if not valid.any():
+            return
+        days = dates[valid].to_numpy().astype("datetime64[D]")
+        batch = sales_df.loc[valid]
+        self._resize(days.min(), days.max())
+
+        offsets = (days - self.start).astype(np.int64)
+        first = int(offsets.min())
+        span = self.days - first
+        local_offsets = offsets - first
+
+        weights = {
+            metric: pd.to_numeric(batch[metric], errors="coerce").fillna(0).to_numpy(dtype="float64")
+            for metric in METRICS
+        }
+        for dimension, column in DIMENSIONS.items():
+            if column is None:
+                groups = {"all": np.ones(len(batch), dtype=bool)}
+            else:
+                labels = batch[column].astype("object").to_numpy()
+                codes, uniques = pd.factorize(labels)
+                groups = {str(value): codes == code for code, value in enumerate(uniques)}
+            for value, mask in groups.items():
+                for metric in METRICS:
+                    daily = np.bincount(local_offsets[mask], weights=weights[metric][mask], minlength=span)
+                    key = (dimension, value, metric)
+                    if key not in self.prefix:
+                        self.prefix[key] = np.zeros(self.days + 1)
+                    # Only days from the batch's first day onward change
+                    self.prefix[key][first + 1:] += np.cumsum(daily)
+
+    @classmethod
+    def build(cls, sales_df: pd.DataFrame) -> "TimeSeriesIndex":
+        index = cls()
+        index.extend(sales_df)
+        return index
+
+    # ------------------------------------------------------------------
+    # Queries (each is a constant number of array lookups)
+    # ------------------------------------------------------------------
+
+    def range_total(self, dimension: str, value: str, metric: str, start, end) -> float:
+        """Total of metric for the series between start and end dates, inclusive."""
+        prefix = self.prefix.get((dimension, value, metric))
+        if prefix is None or self.start is None:
+            return 0.0
+        first = int((_to_day(start) - self.start).astype(int))
+        last = int((_to_day(end) - self.start).astype(int))
+        first = min(max(first, 0), self.days)
+        last = min(max(last + 1, 0), self.days)
+        if last <= first:
+            return 0.0
+        return float(prefix[last] - prefix[first])
+
+    def moving_average(self, dimension: str, value: str, metric: str, end, window_days: int) -> float:
+        """Daily average of metric over the window_days days ending on end."""
+        end_day = _to_day(end)
+        start_day = end_day - np.timedelta64(window_days - 1, "D")
+        return self.range_total(dimension, value, metric, start_day, end_day) / window_days
+
+    def period_over_period(self, dimension: str, value: str, metric: str, start, end) -> Dict[str, float]:
+        """Compare start..end with the period of equal length just before it."""
+        start_day, end_day = _to_day(start), _to_day(end)
+        length = end_day - start_day + np.timedelta64(1, "D")
+        current = self.range_total(dimension, value, metric, start_day, end_day)
+        previous = self.range_total(dimension, value, metric, start_day - length, start_day - np.timedelta64(1, "D"))
+        growth = (current - previous) / previous if previous else float("nan")
+        return {"current": current, "previous": previous, "growth": growth}
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: pathlib.Path = INDEX_PATH) -> None:
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {f"{dimension}|{value}|{metric}": prefix for (dimension, value, metric), prefix in self.prefix.items()}
+        start = np.array([] if self.start is None else [self.start], dtype="datetime64[D]")
+        with open(path, "wb") as handle:
+            np.savez(handle, __start__=start, **arrays)
+
+    @classmethod
+    def load(cls, path: pathlib.Path = INDEX_PATH) -> "TimeSeriesIndex":
+        index = cls()
+        path = pathlib.Path(path)
+        if not path.exists():
+            return index
+        with np.load(path, allow_pickle=False) as data:
+            start = data["__start__"]
+            if start.size:
+                index.start = start[0]
+            for name in data.files:
+                if name == "__start__":
+                    continue
+                dimension, rest = name.split("|", 1)
+                value, metric = rest.rsplit("|", 1)
+                index.prefix[(dimension, value, metric)] = data[name]
+        if index.prefix:
+            index.days = len(next(iter(index.prefix.values()))) - 1
+        return index
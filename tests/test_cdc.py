@@ -0,0 +1,126 @@
+r"""
+tests/test_cdc.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_cdc.py
+    python3 tests\test_cdc.py
+
+This test suite checks that snapshot diffing finds inserts, updates and deletes, and that
+CDC runs leave the warehouse holding the same rows a full load would.
+"""
+
+import pathlib
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts import etl_to_dw  # noqa: E402
+from scripts.data_preparation import data_prep2  # noqa: E402
+from scripts.data_preparation.cdc import diff_snapshot, run_cdc  # noqa: E402
+from scripts.data_preparation.common_utils import read_source  # noqa: E402
+
+RAW_DATA_DIR = PROJECT_ROOT.joinpath("data", "raw")
+
+day_one = pd.DataFrame({
+    "TransactionID": ["1", "2", "3"],
+    "SaleAmount": ["10.00", "20.00", "30.00"],
+})
+
+
+class TestDiffSnapshot(unittest.TestCase):
+
+    def test_first_snapshot_is_all_inserts(self):
+        """Without previous state every row is an insert."""
+        changes = diff_snapshot(day_one, "TransactionID", None)
+        self.assertEqual(changes["inserts"]["TransactionID"].tolist(), ["1", "2", "3"])
+        self.assertTrue(changes["updates"].empty)
+        self.assertTrue(changes["deletes"].empty)
+
+    def test_second_snapshot_finds_changes(self):
+        """A changed value is an update, a new key an insert, a missing key a delete."""
+        state = diff_snapshot(day_one, "TransactionID", None)["state"]
+        day_two = pd.DataFrame({
+            "TransactionID": ["1", "2", "4"],
+            "SaleAmount": ["10.00", "25.00", "40.00"],
+        })
+        changes = diff_snapshot(day_two, "TransactionID", state)
+        self.assertEqual(changes["inserts"]["TransactionID"].tolist(), ["4"])
+        self.assertEqual(changes["updates"]["TransactionID"].tolist(), ["2"])
+        self.assertEqual(changes["deletes"].tolist(), ["3"])
+
+    def test_unchanged_snapshot_has_no_changes(self):
+        """Re-sending the same snapshot produces an empty change set."""
+        state = diff_snapshot(day_one, "TransactionID", None)["state"]
+        changes = diff_snapshot(day_one.copy(), "TransactionID", state)
+        self.assertTrue(changes["inserts"].empty and changes["updates"].empty and changes["deletes"].empty)
+
+
+class TestRunCdc(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        root = pathlib.Path(self.folder.name)
+        self.raw_dir = root.joinpath("raw")
+        self.state_dir = root.joinpath("cdc")
+        self.db_path = root.joinpath("dw", "smart_sales.db")
+        shutil.copytree(RAW_DATA_DIR, self.raw_dir)
+        self.db_path.parent.mkdir()
+
+        # Full load of the raw files, as prepare_and_load does it
+        frames = {
+            etl_to_dw.TABLE_FOR_STEM[path.stem]: data_prep2.clean_dataframe(read_source(path), [])
+            for path in sorted(self.raw_dir.glob("*.csv"))
+        }
+        conn = sqlite3.connect(self.db_path)
+        try:
+            etl_to_dw.build_warehouse(conn, frames)
+        finally:
+            conn.close()
+        self.full_load_ids = set(frames["sale"]["transaction_id"])
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def sale_ids(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return {row[0] for row in conn.execute("SELECT transaction_id FROM sale")}
+        finally:
+            conn.close()
+
+    def test_first_run_matches_full_load(self):
+        """The first CDC run after a full load keeps the full load's outliers out."""
+        summary = run_cdc("sales_data.csv", raw_dir=self.raw_dir, db_path=self.db_path, state_dir=self.state_dir)
+        self.assertNotIn(550, self.sale_ids(), "Transaction 550 (quantity 100000) is an outlier")
+        self.assertEqual(self.sale_ids(), self.full_load_ids)
+        self.assertEqual(summary["loaded"], len(self.full_load_ids))
+
+        again = run_cdc("sales_data.csv", raw_dir=self.raw_dir, db_path=self.db_path, state_dir=self.state_dir)
+        self.assertEqual((again["inserts"], again["updates"], again["deletes"]), (0, 0, 0))
+
+    def test_dropped_update_deletes_stored_row(self):
+        """A changed row that cleaning drops leaves the warehouse instead of keeping its old version."""
+        run_cdc("sales_data.csv", raw_dir=self.raw_dir, db_path=self.db_path, state_dir=self.state_dir)
+        snapshot = pd.read_csv(self.raw_dir.joinpath("sales_data.csv"), dtype=str, keep_default_na=False)
+        snapshot.loc[snapshot["TransactionID"] == "551", "QuantitySold"] = "100000"
+        snapshot.to_csv(self.raw_dir.joinpath("sales_data.csv"), index=False)
+
+        summary = run_cdc("sales_data.csv", raw_dir=self.raw_dir, db_path=self.db_path, state_dir=self.state_dir)
+        self.assertEqual((summary["updates"], summary["dropped"]), (1, 1))
+        self.assertNotIn(551, self.sale_ids())
+        self.assertEqual(len(self.sale_ids()), len(self.full_load_ids) - 1)
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,75 @@
+r"""
+tests/test_cli.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_cli.py
+    python3 tests\test_cli.py
+
+This test suite keeps the smart-store CLI fast to start and checks that
+importing the project modules has no side effects.
+"""
+
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+# Budget for `smart-store --help`, including interpreter startup
+STARTUP_BUDGET_MS = 500
+
+HEAVY_MODULES = ["pandas", "numpy", "scipy", "sqlite3", "loguru"]
+
+
+def run_python(code: str, cwd: pathlib.Path) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT))
+    return subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, capture_output=True, text=True, check=True)
+
+
+class TestCli(unittest.TestCase):
+
+    def test_help_within_startup_budget(self):
+        """`smart-store --help` returns within the startup budget (best of 3 runs)."""
+        timings = []
+        for _ in range(3):
+            started = time.perf_counter()
+            subprocess.run([sys.executable, "-m", "scripts.smart_store", "--help"], cwd=PROJECT_ROOT, capture_output=True, check=True)
+            timings.append((time.perf_counter() - started) * 1000)
+        self.assertLess(min(timings), STARTUP_BUDGET_MS, f"smart-store --help took {min(timings):.0f} ms")
+
+    def test_cli_import_does_not_load_heavy_modules(self):
+        """Importing the CLI and parsing --help loads none of the heavy dependencies."""
+        code = (
+            "import sys\n"
+            "import scripts.smart_store as cli\n"
+            "cli.build_parser().format_help()\n"
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+        )
+        result = run_python(code, PROJECT_ROOT)
+        self.assertEqual(result.stdout.strip(), "", "Heavy modules imported at CLI startup")
+
+    def test_module_imports_have_no_side_effects(self):
+        """Importing the pipeline modules creates no folders and loads no scipy."""
+        code = (
+            "import sys\n"
+            "import scripts.data_preparation.data_prep2\n"
+            "import scripts.data_preparation.common_utils\n"
+            "import scripts.data_scrubber\n"
+            "import utils.logger\n"
+            "print('scipy' in sys.modules)\n"
+        )
+        with tempfile.TemporaryDirectory() as workdir:
+            result = run_python(code, pathlib.Path(workdir))
+            self.assertEqual(result.stdout.strip(), "False", "scipy imported at module load")
+            self.assertEqual(os.listdir(workdir), [], "Importing modules created files or folders")
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,128 @@
+r"""
+tests/test_common_utils.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_common_utils.py
+    python3 tests\test_common_utils.py
+
+This test suite verifies the shared cleaning helpers in scripts/data_preparation/common_utils.py.
+"""
+
+import unittest
+import pathlib
+import sqlite3
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.data_preparation.common_utils import WAREHOUSE_COLUMNS, build_schema_registry, clean_data, handle_outliers_zscore, normalize_numeric_columns, read_source  # noqa: E402
+from scripts.etl_to_dw import TABLE_FOR_STEM, create_schema  # noqa: E402
+
+
+class TestCommonUtils(unittest.TestCase):
+
+    def test_normalize_numeric_columns_parses_formatted_text(self):
+        """Thousands separators, currency symbols and whitespace are stripped."""
+        df = pd.DataFrame({"Customer_Lifetime_Value": ["5,000", " $1,200.50", "1000", "5,000", None]})
+        change_log = []
+        result = normalize_numeric_columns(df, {"Customer_Lifetime_Value": "float64"}, change_log)
+        expected = [5000.0, 1200.5, 1000.0, 5000.0, np.nan]
+        np.testing.assert_array_equal(result["Customer_Lifetime_Value"].to_numpy(), expected)
+        self.assertIn("Coerced 3 formatted values to numbers in column 'Customer_Lifetime_Value'.", change_log)
+
+    def test_normalize_numeric_columns_reports_unparseable(self):
+        """Values that are not numbers become NaN and are counted."""
+        df = pd.DataFrame({"Quantity_Sold": ["1", "two", "two"]})
+        change_log = []
+        result = normalize_numeric_columns(df, {"Quantity_Sold": "int64"}, change_log)
+        self.assertEqual(result["Quantity_Sold"].isna().sum(), 2)
+        self.assertIn("Set 2 unparseable values to NaN in column 'Quantity_Sold'.", change_log)
+
+    def test_normalize_numeric_columns_follows_expected_dtype(self):
+        """Whole numbers become int64 only in columns expected as integers."""
+        df = pd.DataFrame({"Sale_Amount_USD": ["$5,000", "12"], "Quantity_Sold": ["1,000", "3"]})
+        result = normalize_numeric_columns(df, {"Sale_Amount_USD": "float64", "Quantity_Sold": "int64"})
+        self.assertEqual(result["Sale_Amount_USD"].dtype, "float64")
+        self.assertEqual(result["Quantity_Sold"].dtype, "int64")
+        self.assertEqual(result["Sale_Amount_USD"].tolist(), [5000.0, 12.0])
+
+    def test_clean_data_keeps_lifetime_value(self):
+        """clean_data no longer turns quoted thousands into NaN."""
+        df = pd.DataFrame({"Customer_ID": [1001, 1002], "Customer_Lifetime_Value": ["5,000", "2,000"]})
+        result = clean_data(df, ["Customer_ID", "Customer_Lifetime_Value"])
+        self.assertEqual(result["Customer_Lifetime_Value"].tolist(), [5000, 2000])
+
+    def test_handle_outliers_zscore_by_group(self):
+        """A value that is normal for one store but extreme for another is only dropped in the second."""
+        df = pd.DataFrame({
+            "Store_ID": [401] * 12 + [402] * 12,
+            "Quantity_Sold": [100, 101, 99, 100, 102, 98, 100, 101, 99, 100, 102, 98] + [1, 2, 1, 2, 1, 2, 1, 2, 1, 2, 1, 100],
+        })
+        change_log = []
+        result = handle_outliers_zscore(df, "Quantity_Sold", threshold=3, change_log=change_log, by=["Store_ID"])
+        self.assertEqual(len(result), 23)
+        self.assertEqual(result.loc[result["Store_ID"] == 401, "Quantity_Sold"].tolist().count(100), 4)
+        self.assertIn("{402: 1}", change_log[0])
+
+    def test_read_source_applies_registry(self):
+        """Registered sources are read with fixed dtypes, parsed dates and only the known columns."""
+        with tempfile.TemporaryDirectory() as folder:
+            raw_dir = pathlib.Path(folder)
+            (raw_dir / "sales_data.csv").write_text("TransactionID,SaleDate,SaleAmount,QuantitySold\n1,1/6/2024,\"1,200.50\",2\n2,1/7/2024,10.00,N/A\n")
+            registry = build_schema_registry(raw_dir, raw_dir / "none")
+            self.assertEqual(registry["sources"]["sales_data.csv"]["columns"]["SaleDate"]["date_format"], "%m/%d/%Y")
+
+            # A column added upstream later is never parsed
+            (raw_dir / "sales_data.csv").write_text("TransactionID,SaleDate,SaleAmount,QuantitySold,Extra\n3,2/1/2024,5.00,1,x\n")
+            df = read_source(raw_dir / "sales_data.csv", registry=registry)
+        self.assertEqual(df.columns.tolist(), ["TransactionID", "SaleDate", "SaleAmount", "QuantitySold"])
+        self.assertEqual(str(df["QuantitySold"].dtype), "Int64")
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df["SaleDate"]))
+
+    def test_registry_consumers_read_only_stored_columns(self):
+        """Columns the warehouse does not store are left out of both consumers, and JoinDate is parsed as a date."""
+        with tempfile.TemporaryDirectory() as folder:
+            raw_dir = pathlib.Path(folder)
+            prepared_dir = raw_dir / "prepared"
+            prepared_dir.mkdir()
+            (raw_dir / "customers_data.csv").write_text("CustomerID,Name,JoinDate,Notes\n1001,Ann,11/11/2021,vip\n")
+            (prepared_dir / "prepared_customers_data.csv").write_text("customer_id,customer_name,customer_join_date,notes\n1001,Ann,2021-11-11,vip\n")
+            registry = build_schema_registry(raw_dir, prepared_dir)
+            df = read_source(raw_dir / "customers_data.csv", registry=registry)
+        self.assertEqual(registry["consumers"]["prepare"]["customers_data.csv"], ["CustomerID", "Name", "JoinDate"])
+        self.assertEqual(registry["consumers"]["warehouse"]["prepared_customers_data.csv"], ["customer_id", "customer_name", "customer_join_date"])
+        self.assertEqual(registry["sources"]["customers_data.csv"]["columns"]["JoinDate"]["date_format"], "%m/%d/%Y")
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df["JoinDate"]))
+
+    def test_warehouse_columns_match_schema(self):
+        """WAREHOUSE_COLUMNS lists exactly the columns of the table each source loads into."""
+        conn = sqlite3.connect(":memory:")
+        create_schema(conn.cursor())
+        for stem, columns in WAREHOUSE_COLUMNS.items():
+            with self.subTest(source=stem):
+                table_columns = [row[1] for row in conn.execute(f"PRAGMA table_info({TABLE_FOR_STEM[stem]})")]
+                self.assertEqual(columns, table_columns)
+        conn.close()
+
+    def test_read_source_falls_back_when_file_does_not_match(self):
+        """A value that breaks the registered dtype falls back to type inference instead of failing."""
+        with tempfile.TemporaryDirectory() as folder:
+            raw_dir = pathlib.Path(folder)
+            (raw_dir / "products_data.csv").write_text("ProductID,UnitPrice\n101,793.12\n")
+            registry = build_schema_registry(raw_dir, raw_dir / "none")
+            (raw_dir / "products_data.csv").write_text("ProductID,UnitPrice\n101,$793.12\n")
+            df = read_source(raw_dir / "products_data.csv", registry=registry)
+        self.assertEqual(df["UnitPrice"].tolist(), ["$793.12"])
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,108 @@
+r"""
+tests/test_customer_metrics.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_customer_metrics.py
+    python3 tests\test_customer_metrics.py
+
+This test suite checks that customer_metrics kept up to date batch by batch matches
+a full recomputation from the sale table.
+"""
+
+import pathlib
+import sqlite3
+import sys
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.etl_to_dw import (  # noqa: E402
+    apply_changes, create_schema, format_dates_for_db, insert_table, recompute_customer_metrics, update_customer_metrics,
+)
+
+rng = np.random.default_rng(11)
+sales = pd.DataFrame({
+    "transaction_id": np.arange(3000),
+    "purchase_date": pd.to_datetime("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, 3000), unit="D"),
+    "customer_id": rng.integers(1000, 1050, 3000),
+    "product_id": rng.integers(100, 130, 3000),
+    "store_id": rng.integers(401, 406, 3000),
+    "campaign_id": rng.integers(0, 4, 3000),
+    "sale_amount_usd": rng.uniform(5, 900, 3000).round(2),
+    "quantity_sold": rng.integers(1, 10, 3000),
+    "payment_method": rng.choice(["Cash", "Credit Card"], 3000),
+    "sales_channel": rng.choice(["Online", "In Store"], 3000),
+})
+
+
+def metrics_table(conn):
+    return pd.read_sql_query("SELECT * FROM customer_metrics ORDER BY customer_id", conn)
+
+
+class TestCustomerMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        create_schema(self.conn.cursor())
+
+    def tearDown(self):
+        self.conn.close()
+
+    def load_batch(self, batch, rebuild=False):
+        insert_table("sale", batch, self.conn.cursor())
+        update_customer_metrics(self.conn, format_dates_for_db(batch), rebuild=rebuild)
+
+    def expected(self):
+        recompute_customer_metrics(self.conn)
+        return metrics_table(self.conn)
+
+    def test_incremental_batches_match_full_recompute(self):
+        """Merging three batches gives the same rows as aggregating the whole sale table."""
+        self.load_batch(sales.iloc[:1000], rebuild=True)
+        self.load_batch(sales.iloc[1000:2000])
+        self.load_batch(sales.iloc[2000:])
+        actual = metrics_table(self.conn)
+        pd.testing.assert_frame_equal(actual, self.expected(), check_exact=False)
+        self.assertEqual(actual["order_count"].sum(), len(sales))
+
+    def test_removed_rows_recompute_affected_customers(self):
+        """Deleted sales narrow the date range and drop customers with no sales left."""
+        self.load_batch(sales, rebuild=True)
+        removed = sales[sales["customer_id"] == 1000]
+        self.conn.execute("DELETE FROM sale WHERE customer_id = 1000")
+        update_customer_metrics(self.conn, format_dates_for_db(sales.iloc[:0]), removed_df=format_dates_for_db(removed))
+        actual = metrics_table(self.conn)
+        self.assertNotIn(1000, actual["customer_id"].tolist())
+        pd.testing.assert_frame_equal(actual, self.expected(), check_exact=False)
+
+    def test_delete_only_change_set(self):
+        """A column-less frame of new rows (CDC runs that only delete) is accepted."""
+        self.load_batch(sales, rebuild=True)
+        self.conn.execute("DELETE FROM sale WHERE transaction_id < 10")
+        update_customer_metrics(self.conn, pd.DataFrame(), removed_df=format_dates_for_db(sales.iloc[:10]))
+        pd.testing.assert_frame_equal(metrics_table(self.conn), self.expected(), check_exact=False)
+
+        with tempfile.TemporaryDirectory() as folder:
+            apply_changes(self.conn, "sale", "transaction_id", pd.DataFrame(), [10, 11, 12], artifact_dir=pathlib.Path(folder))
+        actual = metrics_table(self.conn)
+        self.assertEqual(actual["order_count"].sum(), len(sales) - 13)
+        pd.testing.assert_frame_equal(actual, self.expected(), check_exact=False)
+
+    def test_first_incremental_batch_backfills(self):
+        """A warehouse loaded before the table existed is backfilled from sale on the first batch."""
+        insert_table("sale", sales.iloc[:2000], self.conn.cursor())
+        self.load_batch(sales.iloc[2000:])
+        self.assertEqual(metrics_table(self.conn)["order_count"].sum(), len(sales))
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,103 @@
+r"""
+tests/test_dask_scrubber.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_dask_scrubber.py
+    python3 tests\test_dask_scrubber.py
+
+This test suite checks that the dask backend gives the same results as the in-memory DataScrubber,
+and that its merged quartiles stay within the documented rank tolerance on larger data.
+"""
+
+import pathlib
+import sys
+import unittest
+import numpy as np
+import pandas as pd
+import dask.dataframe as dd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.data_scrubber import DataScrubber  # noqa: E402
+from scripts.dask_scrubber import DaskDataScrubber  # noqa: E402
+from scripts.data_preparation.common_utils import QUANTILE_SKETCH_POINTS, dask_quartiles  # noqa: E402
+
+rng = np.random.default_rng(7)
+sales = pd.DataFrame({
+    "Quantity": rng.integers(1, 20, 4000),
+    "Store": rng.integers(401, 406, 4000),
+    "Channel": rng.choice(["In Store", "Online", " in-store"], 4000),
+})
+sales.loc[10, "Quantity"] = 100000
+# Duplicates spread across partitions
+sales = pd.concat([sales, sales.iloc[::7]], ignore_index=True)
+
+
+class TestDaskDataScrubber(unittest.TestCase):
+
+    def scrubbers(self):
+        # The synchronous scheduler keeps the tests fast; results do not depend on the scheduler
+        return DataScrubber(sales.copy()), DaskDataScrubber(dd.from_pandas(sales, npartitions=4), scheduler="sync")
+
+    def test_dask_frame_selects_backend(self):
+        """DataScrubber(dask_df) returns the dask backend."""
+        self.assertIsInstance(DataScrubber(dd.from_pandas(sales, npartitions=2)), DaskDataScrubber)
+
+    def test_stays_out_of_core_by_default(self):
+        """Only persist=True keeps data in worker memory; the default re-reads the source."""
+        self.assertFalse(DataScrubber(dd.from_pandas(sales, npartitions=2)).persist)
+        self.assertTrue(DataScrubber(dd.from_pandas(sales, npartitions=2), persist=True).persist)
+
+    def test_global_semantics_match_pandas(self):
+        """Dedup, IQR and z-score over partitions keep exactly the rows pandas keeps."""
+        for step in ("remove_duplicate_records", "remove_outliers_iqr", "remove_outliers_zscore"):
+            in_memory, partitioned = self.scrubbers()
+            args = () if step == "remove_duplicate_records" else ("Quantity",)
+            getattr(in_memory, step)(*args)
+            getattr(partitioned, step)(*args)
+            expected = in_memory.df.sort_index()
+            actual = partitioned.compute().sort_index()
+            self.assertEqual(actual.index.tolist(), expected.index.tolist(), f"{step} kept different rows")
+
+    def test_groupwise_iqr_matches_pandas(self):
+        """Per-group IQR over partitions keeps the rows pandas keeps (small groups are sketched exactly)."""
+        for persist in (True, False):
+            in_memory = DataScrubber(sales.copy())
+            partitioned = DaskDataScrubber(dd.from_pandas(sales, npartitions=4), scheduler="sync", persist=persist)
+            in_memory.remove_outliers_iqr("Quantity", by=["Store"])
+            partitioned.remove_outliers_iqr("Quantity", by=["Store"])
+            self.assertEqual(partitioned.compute().sort_index().index.tolist(), in_memory.df.sort_index().index.tolist())
+
+    def test_quartiles_within_rank_tolerance(self):
+        """On partitions too big to keep whole, merged quartiles sit within 1 / QUANTILE_SKETCH_POINTS of the target rank."""
+        values = rng.lognormal(size=200_000)
+        groups = rng.integers(0, 3, len(values))
+        df = dd.from_pandas(pd.DataFrame({"Amount": values, "Group": groups}), npartitions=8)
+        tolerance = 1 / QUANTILE_SKETCH_POINTS
+
+        for target, quartile in zip((0.25, 0.75), dask_quartiles(df, "Amount", scheduler="sync")):
+            self.assertLessEqual(abs((values < quartile).mean() - target), tolerance)
+        q1, q3 = dask_quartiles(df, "Amount", by=["Group"], scheduler="sync")
+        for group in range(3):
+            group_values = values[groups == group]
+            self.assertLessEqual(abs((group_values < q1[group]).mean() - 0.25), tolerance)
+            self.assertLessEqual(abs((group_values < q3[group]).mean() - 0.75), tolerance)
+
+    def test_profile_matches_pandas(self):
+        """The reduced profile has the same counts and numeric summary as the in-memory one."""
+        in_memory, partitioned = self.scrubbers()
+        expected, actual = in_memory.profile(), partitioned.profile()
+        self.assertEqual(actual["row_count"], expected["row_count"])
+        self.assertEqual(actual["duplicate_count"], expected["duplicate_count"])
+        pd.testing.assert_frame_equal(actual["numeric_summary"], expected["numeric_summary"])
+        self.assertEqual(actual["histograms"]["Quantity"][0].tolist(), expected["histograms"]["Quantity"][0].tolist())
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
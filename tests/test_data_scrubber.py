@@ -63,6 +63,24 @@ class TestDataScrubber(unittest.TestCase):
         self.assertEqual(consistency['null_counts'].sum(), 0, "Null values not cleared in CLEAN stage")
         self.assertEqual(consistency['duplicate_count'], 0, "Duplicates not removed in CLEAN stage")
 
+    def test_profile_is_cached_until_mutation(self):
+        """Profile is computed once and recomputed only after the data changes."""
+        profile = self.scrubber.profile()
+        self.assertIs(self.scrubber.profile(), profile, "Profile should be reused while the data is unchanged")
+        self.assertEqual(profile['null_counts']['Score'], 1, "Null count for Score should be 1")
+        self.assertEqual(profile['duplicate_count'], self.scrubber.df.duplicated().sum(), "Duplicate count should match pandas")
+        self.assertEqual(profile['numeric_summary'].loc['max', 'Score'], 30, "Max Score should be 30")
+        self.scrubber.handle_missing_data(fill_value=0)
+        self.assertIsNot(self.scrubber.profile(), profile, "Profile should be recomputed after a mutating operation")
+        self.assertEqual(self.scrubber.profile()['null_counts'].sum(), 0, "Profile should reflect filled values")
+
+    def test_profile_approximate_distinct_counts(self):
+        """HyperLogLog distinct counts stay close to the exact count."""
+        large = pd.DataFrame({'Key': range(20000), 'Group': [i % 7 for i in range(20000)]})
+        distinct = DataScrubber(large).profile()['distinct_counts']
+        self.assertAlmostEqual(distinct['Key'], 20000, delta=20000 * 0.05, msg="Distinct estimate too far off")
+        self.assertEqual(distinct['Group'], 7, "Small distinct counts should be exact")
+
     def test_convert_column_to_new_data_type(self):
         df_converted = self.scrubber.convert_column_to_new_data_type('Score', 'float')
         self.assertEqual(df_converted['Score'].dtype, 'float64', "Data type not converted correctly")
@@ -85,6 +103,53 @@ class TestDataScrubber(unittest.TestCase):
         self.assertEqual(df_formatted['Name'].str.contains(' ').sum(), 0, "Strings not formatted to uppercase correctly")
         self.assertTrue(df_formatted['Name'].str.isupper().all(), "Strings not formatted to uppercase correctly")
     
+    def test_normalize_string_columns(self):
+        """Distinct values are trimmed, collapsed, cased and mapped to synonyms in one pass."""
+        messy = pd.DataFrame({
+            'Channel': [' In  Store', 'in-store', 'Online ', None, 'online'],
+            'Region': ['East ', 'east', 'West', 'WEST', ' west'],
+        })
+        scrubber = DataScrubber(messy)
+        scrubber.normalize_string_columns(['Channel'], case='title', synonyms={'In-Store': 'In Store'})
+        df_normalized = scrubber.normalize_string_columns(['Region'], case='title', as_category=True)
+        self.assertEqual(df_normalized['Channel'].tolist()[:3], ['In Store', 'In Store', 'Online'], "Channel values not normalized correctly")
+        self.assertTrue(pd.isna(df_normalized['Channel'].iloc[3]), "Missing values should stay missing")
+        self.assertIsInstance(df_normalized['Region'].dtype, pd.CategoricalDtype, "Region should come back as category")
+        self.assertEqual(sorted(df_normalized['Region'].cat.categories), ['East', 'West'], "Region values not collapsed correctly")
+        self.assertEqual(scrubber.report['normalized_string_columns']['Region'], (5, 2), "Distinct counts not reported")
+
+    def test_normalize_string_columns_synonyms_ignore_case(self):
+        """Synonyms match whatever the casing and keep the canonical value."""
+        channels = pd.DataFrame({'Channel': ['In-Store', 'IN STORE', 'On-Line', 'ONLINE', 'phone']})
+        scrubber = DataScrubber(channels)
+        df_normalized = scrubber.normalize_string_columns(['Channel'], synonyms={'in-store': 'In Store', 'in store': 'In Store', 'on-line': 'Online', 'online': 'Online'})
+        self.assertEqual(df_normalized['Channel'].tolist(), ['In Store', 'In Store', 'Online', 'Online', 'phone'], "Synonyms not matched case-insensitively")
+
+    def test_normalize_string_columns_keeps_categories(self):
+        """Category columns come back as category columns holding the cleaned values."""
+        tiers = pd.DataFrame({'Tier': pd.Categorical(['A ', 'a', 'B', None])})
+        df_normalized = DataScrubber(tiers).normalize_string_columns(['Tier'], case='lower')
+        self.assertIsInstance(df_normalized['Tier'].dtype, pd.CategoricalDtype, "Tier should stay a category column")
+        self.assertEqual(df_normalized['Tier'].tolist()[:3], ['a', 'a', 'b'], "Categorical values lost while lowercasing")
+        self.assertTrue(pd.isna(df_normalized['Tier'].iloc[3]), "Missing values should stay missing")
+
+    def test_remove_outliers_by_group(self):
+        """Outliers are judged per group; single-row and constant groups keep their rows."""
+        quantities = pd.DataFrame({
+            'Product': [101] * 12 + [102] * 12 + [103],
+            'Quantity': [1, 2, 1, 2, 1, 2, 1, 2, 1, 2, 1, 500] + [400, 410, 390, 400, 405, 395, 400, 410, 390, 400, 405, 395] + [9999],
+        })
+        change_log = []
+        scrubber = DataScrubber(quantities)
+        df_filtered = scrubber.remove_outliers_iqr('Quantity', change_log=change_log, by=['Product'])
+        self.assertNotIn(500, df_filtered['Quantity'].tolist(), "Spike within product 101 not removed")
+        self.assertEqual(len(df_filtered), 24, "Only the spike should be removed")
+        self.assertEqual(scrubber.report['outliers_removed_by_group']["Quantity by ['Product'] (iqr)"], {101: 1})
+        self.assertEqual(len(change_log), 1, "Group-wise removal should be logged once")
+
+        df_filtered = DataScrubber(quantities).remove_outliers_zscore('Quantity', threshold=3, by=['Product'])
+        self.assertIn(9999, df_filtered['Quantity'].tolist(), "A single-row group has no outliers")
+
     def test_handle_missing_data(self):
         df_filled = self.scrubber.handle_missing_data(fill_value=0)
         self.assertEqual(df_filled.isnull().sum().sum(), 0, "Missing values not handled correctly")
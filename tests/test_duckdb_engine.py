@@ -0,0 +1,149 @@
+r"""
+tests/test_duckdb_engine.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_duckdb_engine.py
+    python3 tests\test_duckdb_engine.py
+
+This test suite checks that the canonical queries give the same answers on DuckDB
+(over prepared CSV or Parquet files, or the warehouse) as on SQLite.
+"""
+
+import os
+import pathlib
+import sqlite3
+import sys
+import tempfile
+import unittest
+import duckdb
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts import duckdb_engine  # noqa: E402
+from scripts.etl_to_dw import create_schema, insert_table, recompute_customer_metrics  # noqa: E402
+from scripts.olap_queries import run_query  # noqa: E402
+
+rng = np.random.default_rng(9)
+frames = {
+    "customers_data": pd.DataFrame({
+        "customer_id": np.arange(1000, 1080),
+        "customer_name": [f"Customer {i}" for i in range(80)],
+        "customer_region": rng.choice(["East", "West", "North"], 80),
+        "customer_join_date": "1/1/2023",
+        "customer_lifetime_value": rng.uniform(100, 5000, 80).round(2),
+        "customer_tier": rng.choice(["Gold", "Silver"], 80),
+    }),
+    "products_data": pd.DataFrame({
+        "product_id": np.arange(100, 115),
+        "product_name": [f"product {i}" for i in range(15)],
+        "product_category": rng.choice(["Electronics", "Clothing", "Sports"], 15),
+        "unit_price_usd": rng.uniform(5, 800, 15).round(2),
+        "manufacturing_cost_usd": rng.integers(1, 100, 15),
+        "brand_name": rng.choice(["Nike", "HP"], 15),
+    }),
+    "sales_data": pd.DataFrame({
+        "transaction_id": np.arange(2000),
+        "purchase_date": (pd.to_datetime("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, 2000), unit="D")).strftime("%Y-%m-%d"),
+        "customer_id": rng.integers(1000, 1080, 2000),
+        "product_id": rng.integers(100, 115, 2000),
+        "store_id": rng.integers(401, 406, 2000),
+        "campaign_id": rng.integers(0, 4, 2000),
+        "sale_amount_usd": rng.uniform(5, 900, 2000).round(2),
+        "quantity_sold": rng.integers(1, 10, 2000),
+        "payment_method": rng.choice(["Cash", "Credit Card"], 2000),
+        "sales_channel": rng.choice(["Online", "In Store"], 2000),
+    }),
+}
+TABLES = {"customers_data": "customer", "products_data": "product", "sales_data": "sale"}
+FILE_QUERIES = ["sales_by_region_category_month", "sales_by_region_category", "monthly_sales_by_region", "top_customers"]
+
+
+def assert_same_result(test, actual, expected):
+    """Same group labels; totals equal up to floating-point summation order."""
+    key = [column for column in expected.columns if not pd.api.types.is_numeric_dtype(expected[column])]
+    actual = actual.sort_values(key, ignore_index=True)
+    expected = expected.sort_values(key, ignore_index=True)
+    test.assertEqual(actual[key].values.tolist(), expected[key].values.tolist())
+    for column in expected.columns.difference(key):
+        np.testing.assert_allclose(actual[column].astype(float), expected[column].astype(float))
+
+
+class TestDuckDBEngine(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.folder = tempfile.TemporaryDirectory()
+        cls.prepared_dir = pathlib.Path(cls.folder.name)
+        cls.db_path = cls.prepared_dir.joinpath("smart_sales.db")
+        conn = sqlite3.connect(cls.db_path)
+        create_schema(conn.cursor())
+        for stem, df in frames.items():
+            df.to_csv(cls.prepared_dir.joinpath(f"prepared_{stem}.csv"), index=False)
+            insert_table(TABLES[stem], df, conn.cursor())
+        recompute_customer_metrics(conn)
+        conn.commit()
+        conn.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.folder.cleanup()
+
+    def test_prepared_csv_matches_sqlite(self):
+        """Each query over the prepared CSV files returns the SQLite result."""
+        for name in FILE_QUERIES:
+            with self.subTest(query=name):
+                expected = run_query(name, db_path=self.db_path)
+                actual = run_query(name, db_path=self.db_path, engine="duckdb", prepared_dir=self.prepared_dir)
+                assert_same_result(self, actual, expected)
+
+    def test_parquet_copies_are_preferred(self):
+        """After export_parquet the views read the Parquet files, with the same results."""
+        with tempfile.TemporaryDirectory() as folder:
+            parquet_dir = pathlib.Path(folder)
+            for stem in frames:
+                parquet_dir.joinpath(f"prepared_{stem}.csv").write_bytes(self.prepared_dir.joinpath(f"prepared_{stem}.csv").read_bytes())
+            written = duckdb_engine.export_parquet(parquet_dir)
+            self.assertEqual(len(written), 3)
+            for path in written:
+                path.with_suffix(".csv").unlink()
+            expected = run_query("sales_by_region_category_month", db_path=self.db_path)
+            actual = run_query("sales_by_region_category_month", db_path=self.db_path, engine="duckdb", prepared_dir=parquet_dir)
+            assert_same_result(self, actual, expected)
+
+    def test_stale_parquet_is_exported_again(self):
+        """A prepared CSV rewritten after export_parquet replaces its older Parquet copy before the query."""
+        with tempfile.TemporaryDirectory() as folder:
+            parquet_dir = pathlib.Path(folder)
+            for stem in frames:
+                parquet_dir.joinpath(f"prepared_{stem}.csv").write_bytes(self.prepared_dir.joinpath(f"prepared_{stem}.csv").read_bytes())
+            duckdb_engine.export_parquet(parquet_dir)
+            # The prepare step runs again and keeps only half of the sales
+            sales_csv = parquet_dir.joinpath("prepared_sales_data.csv")
+            frames["sales_data"].iloc[:1000].to_csv(sales_csv, index=False)
+            later = parquet_dir.joinpath("prepared_sales_data.parquet").stat().st_mtime + 10
+            os.utime(sales_csv, (later, later))
+            with self.assertLogs(duckdb_engine.logger, "WARNING"):
+                result = run_query("sales_by_region_category", db_path=self.db_path, engine="duckdb", prepared_dir=parquet_dir)
+        np.testing.assert_allclose(result["total_sales"].sum(), frames["sales_data"]["sale_amount_usd"].iloc[:1000].sum())
+
+    def test_warehouse_through_sqlite_scanner(self):
+        """Queries on the warehouse itself, including derived tables, match SQLite."""
+        try:
+            duckdb_engine.connect(self.db_path).close()
+        except duckdb.Error as error:
+            self.skipTest(f"DuckDB sqlite extension not available: {error}")
+        for name in FILE_QUERIES + ["customer_value_by_tier"]:
+            with self.subTest(query=name):
+                assert_same_result(self, run_query(name, db_path=self.db_path, engine="duckdb"), run_query(name, db_path=self.db_path))
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
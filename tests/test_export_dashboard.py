@@ -0,0 +1,170 @@
+r"""
+tests/test_export_dashboard.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_export_dashboard.py
+    python3 tests\test_export_dashboard.py
+
+This test suite checks that the dashboard files hold the same totals as the warehouse,
+that a change rewrites only the affected month and the all-history files, and that
+an export limited to the months a writer touched gives the same files as a full one.
+"""
+
+import pathlib
+import sqlite3
+import sys
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.etl_to_dw import apply_changes, build_warehouse  # noqa: E402
+from scripts.export_dashboard import MONTH_RANGE, ROLLUP_QUERY, export_dashboard_artifacts, load_dashboard_dataset  # noqa: E402
+from scripts.olap_queries import full_scans  # noqa: E402
+
+rng = np.random.default_rng(13)
+frames = {
+    "customer": pd.DataFrame({
+        "customer_id": np.arange(1000, 1030),
+        "customer_name": [f"Customer {i}" for i in range(30)],
+        "customer_region": rng.choice(["East", "West", "North"], 30),
+    }),
+    "product": pd.DataFrame({
+        "product_id": np.arange(100, 106),
+        "product_name": [f"product {i}" for i in range(6)],
+        "product_category": rng.choice(["Electronics", "Sports"], 6),
+    }),
+    "sale": pd.DataFrame({
+        "transaction_id": np.arange(600),
+        "purchase_date": pd.to_datetime("2024-01-01") + pd.to_timedelta(rng.integers(0, 180, 600), unit="D"),
+        "customer_id": rng.integers(1000, 1030, 600),
+        "product_id": rng.integers(100, 106, 600),
+        "store_id": 401,
+        "campaign_id": 0,
+        "sale_amount_usd": rng.uniform(5, 900, 600).round(2),
+        "quantity_sold": rng.integers(1, 10, 600),
+        "payment_method": "Cash",
+        "sales_channel": "Online",
+    }),
+}
+
+FACT_QUERY = """
+    SELECT substr(s.purchase_date, 1, 7) AS sale_month, s.customer_id, c.customer_name, c.customer_region,
+           p.product_category, s.sale_amount_usd
+    FROM sale s
+    JOIN customer c ON s.customer_id = c.customer_id
+    JOIN product p ON s.product_id = p.product_id
+"""
+
+
+class TestExportDashboard(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.db_path = pathlib.Path(self.folder.name).joinpath("smart_sales.db")
+        self.out_dir = pathlib.Path(self.folder.name).joinpath("dashboard")
+        conn = sqlite3.connect(self.db_path)
+        try:
+            build_warehouse(conn, frames)
+        finally:
+            conn.close()
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def fact(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return pd.read_sql_query(FACT_QUERY, conn)
+        finally:
+            conn.close()
+
+    def assert_same_totals(self, actual, expected, key):
+        actual = actual.sort_values(key, ignore_index=True)
+        expected = expected.sort_values(key, ignore_index=True)
+        self.assertEqual(actual[key].values.tolist(), expected[key].values.tolist())
+        np.testing.assert_allclose(actual.drop(columns=key).astype(float), expected.drop(columns=key).astype(float), atol=0.01)
+
+    def test_exported_values_match_warehouse(self):
+        """Each dataset read back from the files equals the same aggregate computed from sale."""
+        export_dashboard_artifacts(self.db_path, self.out_dir, top_n=5)
+        fact = self.fact()
+
+        expected = fact.groupby(["customer_region", "product_category", "sale_month"], as_index=False).agg(total_sales=("sale_amount_usd", "sum"))
+        actual = load_dashboard_dataset("region_category_month", self.out_dir)
+        self.assert_same_totals(actual[expected.columns], expected, ["customer_region", "product_category", "sale_month"])
+
+        expected = fact.groupby(["customer_region", "sale_month"], as_index=False).agg(total_sales=("sale_amount_usd", "sum"))
+        self.assert_same_totals(load_dashboard_dataset("monthly_trend", self.out_dir), expected, ["customer_region", "sale_month"])
+
+        expected = (
+            fact.groupby(["customer_id", "customer_name"], as_index=False).agg(total_spent=("sale_amount_usd", "sum"))
+            .nlargest(5, "total_spent")
+        )
+        self.assert_same_totals(load_dashboard_dataset("top_customers", self.out_dir), expected, ["customer_id", "customer_name"])
+
+    def test_change_rewrites_only_affected_month(self):
+        """Updating one sale rewrites its month and the all-history files; other months stay."""
+        first = export_dashboard_artifacts(self.db_path, self.out_dir)
+        self.assertEqual(first["unchanged"], [])
+        self.assertEqual(export_dashboard_artifacts(self.db_path, self.out_dir)["written"], [])
+
+        changed = frames["sale"].iloc[[0]].assign(sale_amount_usd=5000.0)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            apply_changes(conn, "sale", "transaction_id", changed, [])
+            conn.commit()
+        finally:
+            conn.close()
+        summary = export_dashboard_artifacts(self.db_path, self.out_dir)
+        month = changed["purchase_date"].dt.strftime("%Y-%m").iloc[0]
+        self.assertEqual(sorted(summary["written"]), sorted([f"region_category_month/{month}.json", "monthly_trend.json", "top_customers.json"]))
+        self.assertEqual(len(summary["unchanged"]), len(first["written"]) - 3)
+
+    def test_customer_rename_rewrites_top_customers(self):
+        """A customer change leaves every month alone but reaches top_customers.json."""
+        export_dashboard_artifacts(self.db_path, self.out_dir)
+        top_customer = int(load_dashboard_dataset("top_customers", self.out_dir)["customer_id"].iloc[0])
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("UPDATE customer SET customer_name = 'RENAMED' WHERE customer_id = ?", (top_customer,))
+            conn.commit()
+        finally:
+            conn.close()
+        summary = export_dashboard_artifacts(self.db_path, self.out_dir, months=[])
+        self.assertEqual(summary["written"], ["top_customers.json"])
+        self.assertEqual(load_dashboard_dataset("top_customers", self.out_dir)["customer_name"].iloc[0], "RENAMED")
+
+    def test_export_of_touched_months_matches_full_export(self):
+        """Re-aggregating only the changed months gives the files a full export would write."""
+        export_dashboard_artifacts(self.db_path, self.out_dir)
+        changed = frames["sale"].iloc[[0, 1]].assign(sale_amount_usd=5000.0)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            apply_changes(conn, "sale", "transaction_id", changed, [int(frames["sale"]["transaction_id"].iloc[2])])
+            conn.commit()
+            plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + ROLLUP_QUERY.format(where="WHERE " + MONTH_RANGE), ["2024-01-01", "2024-02-01"])]
+        finally:
+            conn.close()
+        self.assertEqual(full_scans(plan), [], "\n".join(plan))
+
+        months = set(frames["sale"]["purchase_date"].iloc[:3].dt.strftime("%Y-%m"))
+        summary = export_dashboard_artifacts(self.db_path, self.out_dir, months=months)
+        self.assertEqual(sorted(summary["written"]), sorted([f"region_category_month/{month}.json" for month in months] + ["monthly_trend.json", "top_customers.json"]))
+        full_dir = pathlib.Path(self.folder.name).joinpath("full")
+        export_dashboard_artifacts(self.db_path, full_dir)
+        for name in ("region_category_month", "monthly_trend", "top_customers"):
+            with self.subTest(dataset=name):
+                pd.testing.assert_frame_equal(load_dashboard_dataset(name, self.out_dir), load_dashboard_dataset(name, full_dir))
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,210 @@
+r"""
+tests/test_ingest_daemon.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_ingest_daemon.py
+    python3 tests\test_ingest_daemon.py
+
+This test suite checks that the ingestion daemon claims settled inbox files, archives
+or parks them, signals backpressure, and loads them into the warehouse together with
+the derived tables, retracting the old copy of re-delivered rows. It also checks that daemon rows
+are cleaned like batch rows and that a rebuild from data/raw keeps them.
+"""
+
+import os
+import pathlib
+import sqlite3
+import sys
+import tempfile
+import time
+import unittest
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts import ingest_daemon  # noqa: E402
+from scripts.data_preparation.common_utils import read_source, with_ingested_sales  # noqa: E402
+from scripts.etl_to_dw import create_schema, insert_table, recompute_customer_metrics  # noqa: E402
+from scripts.leaderboards import LeaderboardSet  # noqa: E402
+
+rng = np.random.default_rng(17)
+customers = pd.DataFrame({
+    "customer_id": np.arange(1000, 1010),
+    "customer_name": [f"Customer {i}" for i in range(10)],
+    "customer_region": rng.choice(["East", "West"], 10),
+})
+products = pd.DataFrame({
+    "product_id": np.arange(100, 104),
+    "product_name": [f"product {i}" for i in range(4)],
+    "product_category": rng.choice(["Electronics", "Sports"], 4),
+})
+raw_sales = pd.DataFrame({
+    "TransactionID": np.arange(1, 201),
+    "SaleDate": [f"{month}/{day}/2024" for month, day in zip(rng.integers(1, 13, 200), rng.integers(1, 29, 200))],
+    "CustomerID": rng.integers(1000, 1010, 200),
+    "ProductID": rng.integers(100, 104, 200),
+    "StoreID": rng.integers(401, 406, 200),
+    "CampaignID": 0,
+    "SaleAmount": rng.uniform(5, 500, 200).round(2),
+    "QuantitySold": rng.integers(1, 5, 200),
+    "PaymentMethod": "Cash",
+    "SalesChannel": "Online",
+})
+
+
+class TestIngestDaemon(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        root = pathlib.Path(self.folder.name)
+        self.db_path = root.joinpath("dw", "smart_sales.db")
+        self.inbox = root.joinpath("inbox")
+        self.processing_dir = self.inbox.joinpath("processing")
+        self.archive_dir = root.joinpath("archive")
+        self.inbox.mkdir()
+        conn = ingest_daemon.connect_warehouse(self.db_path)
+        insert_table("customer", customers, conn.cursor())
+        insert_table("product", products, conn.cursor())
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def drop(self, name, df, folder=None):
+        path = (folder or self.processing_dir).joinpath(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(path, index=False)
+        return path
+
+    def ingest(self, name, df):
+        conn = ingest_daemon.connect_warehouse(self.db_path)
+        try:
+            return ingest_daemon.ingest_file(conn, self.drop(name, df), self.archive_dir, batch_size=50)
+        finally:
+            conn.close()
+
+    def query(self, sql):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return pd.read_sql_query(sql, conn)
+        finally:
+            conn.close()
+
+    def assert_derived_tables_match_sale(self):
+        actual = self.query("SELECT * FROM customer_metrics ORDER BY customer_id")
+        conn = sqlite3.connect(":memory:")
+        create_schema(conn.cursor())
+        self.query("SELECT * FROM sale").to_sql("sale", conn, index=False, if_exists="append")
+        recompute_customer_metrics(conn)
+        expected = pd.read_sql_query("SELECT * FROM customer_metrics ORDER BY customer_id", conn)
+        conn.close()
+        pd.testing.assert_frame_equal(actual, expected, check_exact=False, check_dtype=False)
+
+        sale = self.query("SELECT * FROM sale")
+        strata_rows = self.query("SELECT SUM(population_rows) AS n FROM sale_sample_strata")["n"].iloc[0]
+        self.assertEqual(strata_rows, len(sale))
+        board = LeaderboardSet.load(self.db_path.parent.joinpath("leaderboards.json"))
+        top_customer, top_revenue = board.top("customers_by_revenue")[0]
+        revenue = sale.groupby("customer_id")["sale_amount_usd"].sum()
+        self.assertEqual(top_customer, revenue.idxmax())
+        self.assertAlmostEqual(top_revenue, revenue.max(), places=4)
+
+    def test_claim_files(self):
+        """Settled files are claimed oldest first, up to the limit; files still being written are left alone."""
+        old = time.time() - 60
+        for number in range(3):
+            path = self.drop(f"batch_{number}.csv", raw_sales.iloc[:5], self.inbox)
+            os.utime(path, (old + number, old + number))
+        self.drop("fresh.csv", raw_sales.iloc[:5], self.inbox)
+
+        claimed = ingest_daemon.claim_files(self.inbox, self.processing_dir, max_files=2, min_file_age=10)
+        self.assertEqual([path.name for path in claimed], ["batch_0.csv", "batch_1.csv"])
+        self.assertTrue(all(path.parent == self.processing_dir and path.exists() for path in claimed))
+        self.assertEqual(sorted(path.name for path in self.inbox.glob("*.csv")), ["batch_2.csv", "fresh.csv"])
+
+    def test_run_archives_and_parks_failures(self):
+        """A run ingests good files into the archive and moves unreadable ones to the failed folder."""
+        self.drop("good.csv", raw_sales.iloc[:50], self.inbox)
+        self.drop("bad.csv", raw_sales.drop(columns=["CustomerID"]).iloc[:10], self.inbox)
+        failed_dir = self.inbox.joinpath("failed")
+        ingest_daemon.run(
+            inbox=self.inbox, processing_dir=self.processing_dir, archive_dir=self.archive_dir, failed_dir=failed_dir,
+            db_path=self.db_path, min_file_age=0, once=True,
+        )
+        self.assertTrue(self.archive_dir.joinpath("good.csv").exists())
+        self.assertTrue(failed_dir.joinpath("bad.csv").exists())
+        self.assertEqual(list(self.processing_dir.glob("*.csv")), [])
+        self.assertEqual(len(self.query("SELECT * FROM sale")), 50)
+
+    def test_backpressure_marker(self):
+        """The marker appears at the high-water mark and goes away at the low-water mark."""
+        marker = self.inbox.joinpath(ingest_daemon.BACKPRESSURE_MARKER)
+        for number in range(5):
+            self.drop(f"batch_{number}.csv", raw_sales.iloc[:1], self.inbox)
+        self.assertEqual(ingest_daemon.update_backpressure(self.inbox, high_water_mark=5, low_water_mark=2), 5)
+        self.assertTrue(marker.exists())
+        for number in range(3):
+            self.inbox.joinpath(f"batch_{number}.csv").unlink()
+        ingest_daemon.update_backpressure(self.inbox, high_water_mark=5, low_water_mark=2)
+        self.assertFalse(marker.exists())
+
+    def test_redelivered_file_is_not_double_counted(self):
+        """Delivering the same file twice leaves one copy of each row in sale and the derived tables."""
+        self.ingest("batch_1.csv", raw_sales)
+        before = self.query("SELECT * FROM customer_metrics ORDER BY customer_id")
+        self.ingest("batch_1.csv", raw_sales)
+        self.assertEqual(len(self.query("SELECT * FROM sale")), len(raw_sales))
+        pd.testing.assert_frame_equal(self.query("SELECT * FROM customer_metrics ORDER BY customer_id"), before)
+        self.assert_derived_tables_match_sale()
+
+    def test_ingest_commits_derived_tables(self):
+        """Rows, customer_metrics and sale_sample are all visible to a new connection after ingest_file."""
+        loaded = self.ingest("batch_1.csv", raw_sales.iloc[:120])
+        self.assertEqual(loaded, 120)
+        self.assertEqual(len(self.query("SELECT * FROM sale")), 120)
+        self.assertGreater(len(self.query("SELECT * FROM sale_sample")), 0)
+        self.assert_derived_tables_match_sale()
+
+    def test_text_is_normalized_like_the_batch_path(self):
+        """Channel spellings are mapped to the canonical values the batch prepare stores."""
+        self.ingest("batch_1.csv", raw_sales.iloc[:20].assign(SalesChannel=["in-store", " ONLINE"] * 10))
+        self.assertEqual(sorted(self.query("SELECT DISTINCT sales_channel FROM sale")["sales_channel"]), ["In Store", "Online"])
+
+    def test_rebuild_keeps_ingested_rows(self):
+        """The raw sales read for a rebuild includes the archived batches, later deliveries winning."""
+        snapshot = self.drop("sales_data.csv", raw_sales.iloc[:100], pathlib.Path(self.folder.name).joinpath("raw"))
+        old = time.time() - 60
+        os.utime(snapshot, (old, old))
+        changed = raw_sales.iloc[90:150].assign(SaleAmount=1.0)
+        self.ingest("batch_1.csv", changed)
+        self.ingest("batch_1.csv", raw_sales.iloc[150:200])
+
+        rebuilt = with_ingested_sales(read_source(snapshot, source="sales_data.csv"), snapshot, self.archive_dir)
+        self.assertEqual(len(list(self.archive_dir.glob("*.csv"))), 2, "A re-delivered file name must not overwrite the archive")
+        self.assertEqual(sorted(rebuilt["TransactionID"]), raw_sales["TransactionID"].tolist())
+        amounts = rebuilt.set_index("TransactionID")["SaleAmount"]
+        np.testing.assert_allclose(amounts.loc[changed["TransactionID"]], 1.0)
+        np.testing.assert_allclose(amounts.loc[raw_sales["TransactionID"].iloc[:90]], raw_sales["SaleAmount"].iloc[:90])
+
+    def test_redelivered_changes_are_retracted(self):
+        """A re-delivered transaction with new values replaces the old one in every derived table."""
+        self.ingest("batch_1.csv", raw_sales.iloc[:120])
+        changed = raw_sales.iloc[100:200].copy()
+        changed.loc[changed.index[:20], "SaleAmount"] = changed["SaleAmount"].iloc[:20] * 3
+        self.ingest("batch_2.csv", changed)
+        sale = self.query("SELECT * FROM sale ORDER BY transaction_id")
+        self.assertEqual(len(sale), 200)
+        np.testing.assert_allclose(sale["sale_amount_usd"].iloc[100:120], changed["SaleAmount"].iloc[:20])
+        self.assert_derived_tables_match_sale()
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
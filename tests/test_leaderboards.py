@@ -0,0 +1,105 @@
+r"""
+tests/test_leaderboards.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_leaderboards.py
+    python3 tests\test_leaderboards.py
+
+This test suite checks that incrementally maintained leaderboards match a full sort,
+and that readers load only the saved top K lists while writers round-trip the totals.
+"""
+
+import json
+import pathlib
+import random
+import sys
+import tempfile
+import unittest
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.leaderboards import Leaderboard, LeaderboardSet, totals_path_for  # noqa: E402
+
+
+def make_sales(rows, seed):
+    rng = random.Random(seed)
+    return pd.DataFrame({
+        "customer_id": [rng.randint(1000, 1060) for _ in range(rows)],
+        "product_id": [rng.randint(100, 120) for _ in range(rows)],
+        "store_id": [rng.randint(400, 410) for _ in range(rows)],
+        "sale_amount_usd": [round(rng.uniform(1, 500), 2) for _ in range(rows)],
+        "quantity_sold": [rng.randint(1, 5) for _ in range(rows)],
+        "customer_region": [rng.choice(["East", "West", "North", "South"]) for _ in range(rows)],
+        "product_category": [rng.choice(["Clothing", "Electronics", "Sports"]) for _ in range(rows)],
+    })
+
+
+class TestLeaderboards(unittest.TestCase):
+
+    def test_incremental_batches_match_full_sort(self):
+        """Top K after many small batches equals sorting the full history."""
+        leaderboards = LeaderboardSet(k=5)
+        batches = [make_sales(40, seed) for seed in range(10)]
+        for batch in batches:
+            leaderboards.update_from_sales(batch)
+        history = pd.concat(batches)
+
+        expected = history.groupby("customer_id")["sale_amount_usd"].sum().nlargest(5)
+        actual = leaderboards.top("customers_by_revenue")
+        self.assertEqual([key for key, _ in actual], expected.index.tolist())
+        for (_, total), expected_total in zip(actual, expected.tolist()):
+            self.assertAlmostEqual(total, expected_total)
+
+        expected_units = history.groupby("product_id")["quantity_sold"].sum().sort_values(ascending=False)
+        self.assertEqual([total for _, total in leaderboards.top("products_by_units")], expected_units.head(5).tolist())
+
+        region_totals = history.groupby(["product_category", "customer_region"])["sale_amount_usd"].sum()
+        top_region = region_totals.loc["Electronics"].idxmax()
+        self.assertEqual(leaderboards.top_regions("Electronics")[0][0], top_region)
+
+    def test_readers_load_only_top_lists(self):
+        """The reader file holds K entries per board; a writer reload continues exactly where it left off."""
+        batches = [make_sales(40, seed) for seed in range(6)]
+        in_memory = LeaderboardSet(k=5)
+        for batch in batches:
+            in_memory.update_from_sales(batch)
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = pathlib.Path(folder).joinpath("leaderboards.json")
+            written = LeaderboardSet(k=5)
+            for batch in batches[:3]:
+                written.update_from_sales(batch)
+            written.save(path)
+            saved = json.loads(path.read_text())
+            self.assertTrue(all(len(board["top"]) <= 5 and "totals" not in board for board in saved["boards"].values()))
+            self.assertTrue(totals_path_for(path).exists())
+
+            for batch in batches[3:]:
+                writer = LeaderboardSet.load(path, totals=True)
+                writer.update_from_sales(batch)
+                writer.save(path)
+            reader = LeaderboardSet.load(path)
+            with self.assertRaises(ValueError):
+                reader.update_from_sales(batches[0])
+
+        for name in ("customers_by_revenue", "products_by_units", "stores_by_revenue"):
+            self.assertEqual(reader.top(name), in_memory.top(name))
+        self.assertEqual(reader.top_regions("Sports"), in_memory.top_regions("Sports"))
+
+    def test_negative_delta_recomputes(self):
+        """A refund that drops a leader out of the top K is handled."""
+        board = Leaderboard(k=2)
+        board.update({"a": 10.0, "b": 8.0, "c": 5.0})
+        board.update({"a": -9.0})
+        self.assertEqual([key for key, _ in board.top_k()], ["b", "c"])
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,100 @@
+r"""
+tests/test_pipeline_async.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_pipeline_async.py
+    python3 tests\test_pipeline_async.py
+
+This test suite checks that the pipelined prepare-and-load run builds the same warehouse
+as the batch path, and that a bad file is reported without replacing the live warehouse.
+"""
+
+import asyncio
+import os
+import pathlib
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts import etl_to_dw  # noqa: E402
+from scripts.data_preparation import data_prep2  # noqa: E402
+from scripts.data_preparation.common_utils import read_source  # noqa: E402
+from scripts.pipeline_async import run_pipeline  # noqa: E402
+
+RAW_DATA_DIR = pathlib.Path("data").joinpath("raw")
+
+
+def table_contents(db_path, table):
+    conn = sqlite3.connect(db_path)
+    try:
+        return pd.read_sql_query(f"SELECT * FROM {table} ORDER BY 1", conn)
+    finally:
+        conn.close()
+
+
+class TestPipelineAsync(unittest.TestCase):
+
+    def setUp(self):
+        # The pipeline reads, reports and exports relative to the project root
+        self.previous_dir = os.getcwd()
+        self.folder = tempfile.TemporaryDirectory()
+        os.chdir(self.folder.name)
+        shutil.copytree(PROJECT_ROOT.joinpath("data", "raw"), RAW_DATA_DIR)
+        self.paths = sorted(RAW_DATA_DIR.glob("*.csv"))
+
+    def tearDown(self):
+        os.chdir(self.previous_dir)
+        self.folder.cleanup()
+
+    def run_pipeline(self, paths):
+        return asyncio.run(run_pipeline(paths, db_path=etl_to_dw.DB_PATH, use_processes=False, monitor_interval=0.01))
+
+    def test_matches_batch_load(self):
+        """Every warehouse table holds what the batch prepare and load would have put there."""
+        stats = self.run_pipeline(self.paths)
+        self.assertGreater(stats["wall_seconds"], 0)
+        self.assertIn("load_queue_max_depth", stats)
+        for path in self.paths:
+            self.assertTrue(data_prep2.prepared_path_for(path).exists(), f"No prepared file for {path.name}")
+
+        batch_db = pathlib.Path("batch.db")
+        conn = sqlite3.connect(batch_db)
+        try:
+            etl_to_dw.build_warehouse(
+                conn,
+                {etl_to_dw.TABLE_FOR_STEM[path.stem]: data_prep2.clean_dataframe(read_source(path), []) for path in self.paths},
+                artifact_dir=pathlib.Path(self.folder.name),
+            )
+        finally:
+            conn.close()
+        for table in ("customer", "product", "sale", "customer_metrics", "sale_sample_strata"):
+            with self.subTest(table=table):
+                pd.testing.assert_frame_equal(table_contents(etl_to_dw.DB_PATH, table), table_contents(batch_db, table))
+        self.assertTrue(etl_to_dw.LEADERBOARDS_PATH.exists())
+        self.assertEqual(list(etl_to_dw.DW_DIR.glob(etl_to_dw.STAGING_DIR_PREFIX + "*")), [])
+
+    def test_bad_file_keeps_live_warehouse(self):
+        """An unreadable sales file stops the swap with an error naming the missing table."""
+        self.run_pipeline(self.paths)
+        live_sales = table_contents(etl_to_dw.DB_PATH, "sale")
+
+        broken = [path for path in self.paths if path.name != "sales_data.csv"] + [RAW_DATA_DIR.joinpath("missing", "sales_data.csv")]
+        with self.assertRaisesRegex(RuntimeError, "sale"):
+            self.run_pipeline(broken)
+        self.assertTrue(pathlib.Path(data_prep2.REPORT_DIR).joinpath("sales_data_error_report.txt").exists())
+        pd.testing.assert_frame_equal(table_contents(etl_to_dw.DB_PATH, "sale"), live_sales)
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,85 @@
+r"""
+tests/test_prepare_and_load.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_prepare_and_load.py
+    python3 tests\test_prepare_and_load.py
+
+This test suite checks that handing the cleaned frames straight to the loader fills the
+warehouse exactly as writing the prepared CSV files and loading them does, and that a raw
+file that cannot be cleaned stops the load with an error naming it.
+"""
+
+import os
+import pathlib
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts import etl_to_dw  # noqa: E402
+from scripts.data_preparation import data_prep2  # noqa: E402
+
+TABLES = ["customer", "product", "sale", "customer_metrics", "sale_sample", "sale_sample_strata"]
+
+
+def warehouse_tables():
+    conn = sqlite3.connect(etl_to_dw.DB_PATH)
+    try:
+        return {table: pd.read_sql_query(f"SELECT * FROM {table} ORDER BY 1, 2, 3", conn) for table in TABLES}
+    finally:
+        conn.close()
+
+
+class TestPrepareAndLoad(unittest.TestCase):
+
+    def setUp(self):
+        # Both paths read and write relative to the project root
+        self.previous_dir = os.getcwd()
+        self.folder = tempfile.TemporaryDirectory()
+        os.chdir(self.folder.name)
+        shutil.copytree(PROJECT_ROOT.joinpath("data", "raw"), data_prep2.RAW_DATA_DIR)
+
+    def tearDown(self):
+        os.chdir(self.previous_dir)
+        self.folder.cleanup()
+
+    def test_handoff_matches_file_based_load(self):
+        """Every warehouse table has the same contents after either path."""
+        data_prep2.main()
+        etl_to_dw.load_data_to_db(export_dashboard=False)
+        from_files = warehouse_tables()
+
+        data_prep2.prepare_and_load(write_prepared=False, export_dashboard=False)
+        handed_over = warehouse_tables()
+        for table in TABLES:
+            with self.subTest(table=table):
+                self.assertGreater(len(from_files[table]), 0)
+                pd.testing.assert_frame_equal(handed_over[table], from_files[table])
+
+    def test_unreadable_file_keeps_live_warehouse(self):
+        """An empty raw file fails to clean; it is named in the error and the live warehouse is not replaced."""
+        data_prep2.prepare_and_load(write_prepared=False, export_dashboard=False)
+        live = warehouse_tables()
+
+        data_prep2.RAW_DATA_DIR.joinpath("sales_data.csv").write_text("")
+        with self.assertRaisesRegex(RuntimeError, "sales_data.csv"):
+            data_prep2.prepare_and_load(write_prepared=False, export_dashboard=False)
+        self.assertTrue(data_prep2.REPORT_DIR.joinpath("sales_data_error_report.txt").exists())
+        for table, df in warehouse_tables().items():
+            with self.subTest(table=table):
+                pd.testing.assert_frame_equal(df, live[table])
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
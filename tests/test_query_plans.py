@@ -0,0 +1,105 @@
+r"""
+tests/test_query_plans.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_query_plans.py
+    python3 tests\test_query_plans.py
+
+This test suite builds a small warehouse with the load's read-optimization stage and
+checks EXPLAIN QUERY PLAN for every canonical OLAP query: no query may fall back to a
+full scan of sale, and every index the load creates is used by some query.
+"""
+
+import pathlib
+import sqlite3
+import sys
+import unittest
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.etl_to_dw import COVERING_INDEXES, create_schema, insert_table, optimize_for_reads, recompute_customer_metrics  # noqa: E402
+from scripts.olap_queries import CANONICAL_QUERIES, explain_query, full_scans  # noqa: E402
+
+rng = np.random.default_rng(3)
+customers = pd.DataFrame({
+    "customer_id": np.arange(1000, 1200),
+    "customer_name": [f"Customer {i}" for i in range(200)],
+    "customer_region": rng.choice(["East", "West", "North", "South"], 200),
+    "customer_join_date": "1/1/2023",
+    "customer_lifetime_value": rng.uniform(100, 5000, 200).round(2),
+    "customer_tier": rng.choice(["Gold", "Silver", "Bronze"], 200),
+})
+products = pd.DataFrame({
+    "product_id": np.arange(100, 130),
+    "product_name": [f"product {i}" for i in range(30)],
+    "product_category": rng.choice(["Electronics", "Clothing", "Sports"], 30),
+    "unit_price_usd": rng.uniform(5, 800, 30).round(2),
+    "manufacturing_cost_usd": rng.integers(1, 100, 30),
+    "brand_name": rng.choice(["Nike", "HP", "Academy"], 30),
+})
+sales = pd.DataFrame({
+    "transaction_id": np.arange(5000),
+    "purchase_date": pd.to_datetime("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, 5000), unit="D"),
+    "customer_id": rng.integers(1000, 1200, 5000),
+    "product_id": rng.integers(100, 130, 5000),
+    "store_id": rng.integers(401, 406, 5000),
+    "campaign_id": rng.integers(0, 4, 5000),
+    "sale_amount_usd": rng.uniform(5, 900, 5000).round(2),
+    "quantity_sold": rng.integers(1, 10, 5000),
+    "payment_method": rng.choice(["Cash", "Credit Card"], 5000),
+    "sales_channel": rng.choice(["Online", "In Store", "Phone"], 5000),
+})
+
+
+class TestQueryPlans(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.conn = sqlite3.connect(":memory:")
+        cursor = cls.conn.cursor()
+        create_schema(cursor)
+        insert_table("customer", customers, cursor)
+        insert_table("product", products, cursor)
+        insert_table("sale", sales, cursor)
+        recompute_customer_metrics(cls.conn)
+        optimize_for_reads(cls.conn)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.conn.close()
+
+    def test_no_canonical_query_scans_a_table(self):
+        """Every canonical query reads sale through covering indexes or keyed searches."""
+        for name in CANONICAL_QUERIES:
+            with self.subTest(query=name):
+                plan = explain_query(name, self.conn)
+                self.assertEqual(full_scans(plan), [], f"{name} falls back to a full scan:\n" + "\n".join(plan))
+
+    def test_full_scans_flags_table_scans(self):
+        """The checker itself recognizes a plain scan of sale, and lets a join start from a dimension."""
+        self.assertEqual(full_scans(["SCAN s", "SCAN c", "SEARCH s USING COVERING INDEX idx_sale_customer_cover (customer_id=?)"]), ["SCAN s"])
+
+    def test_every_index_is_used(self):
+        """Each covering index shows up in the plan of at least one canonical query."""
+        plans = "\n".join(line for name in CANONICAL_QUERIES for line in explain_query(name, self.conn))
+        for index in COVERING_INDEXES:
+            with self.subTest(index=index):
+                self.assertIn(f"INDEX {index} ", plans)
+
+    def test_dimensions_are_without_rowid(self):
+        """Dimension tables are clustered on their primary key."""
+        for table in ("customer", "product"):
+            sql = self.conn.execute("SELECT sql FROM sqlite_master WHERE name = ?", (table,)).fetchone()[0]
+            self.assertIn("WITHOUT ROWID", sql)
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
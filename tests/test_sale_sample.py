@@ -0,0 +1,157 @@
+r"""
+tests/test_sale_sample.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_sale_sample.py
+    python3 tests\test_sale_sample.py
+
+This test suite checks the stratified sale sample: exact counts per stratum, estimates
+whose confidence bounds cover the exact totals, and batch-by-batch maintenance that
+draws the same sample whatever the load order. Strata the removals emptied of sampled
+rows are summed exactly instead of dropping out of the totals.
+"""
+
+import pathlib
+import sqlite3
+import sys
+import unittest
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.etl_to_dw import create_schema, format_dates_for_db, insert_table, sales_with_dimensions  # noqa: E402
+from scripts.olap_queries import approximate_query  # noqa: E402
+from scripts.sale_sample import STRATUM_COLUMNS, approximate_aggregate, update_sale_sample  # noqa: E402
+
+rng = np.random.default_rng(5)
+customers = pd.DataFrame({
+    "customer_id": np.arange(1000, 1100),
+    "customer_name": [f"Customer {i}" for i in range(100)],
+    "customer_region": rng.choice(["East", "West", "North"], 100),
+})
+products = pd.DataFrame({
+    "product_id": np.arange(100, 110),
+    "product_name": [f"product {i}" for i in range(10)],
+    "product_category": rng.choice(["Electronics", "Clothing"], 10),
+})
+sales = pd.DataFrame({
+    "transaction_id": np.arange(120000),
+    "purchase_date": pd.to_datetime("2024-01-01") + pd.to_timedelta(rng.integers(0, 181, 120000), unit="D"),
+    "customer_id": rng.integers(1000, 1100, 120000),
+    "product_id": rng.integers(100, 110, 120000),
+    "sale_amount_usd": rng.lognormal(4, 1, 120000).round(2),
+    "quantity_sold": rng.integers(1, 10, 120000),
+})
+
+
+def exact_totals(df, conn, group_by):
+    joined = sales_with_dimensions(format_dates_for_db(df), conn)
+    joined["sale_month"] = joined["purchase_date"].str[:7]
+    return joined.groupby(group_by).agg(row_count=("sale_amount_usd", "size"), total=("sale_amount_usd", "sum")).reset_index()
+
+
+class TestSaleSample(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        cursor = self.conn.cursor()
+        create_schema(cursor)
+        insert_table("customer", customers, cursor)
+        insert_table("product", products, cursor)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def load(self, df, rebuild=False, removed=None, **options):
+        joined = sales_with_dimensions(format_dates_for_db(df), self.conn)
+        removed_joined = None if removed is None else sales_with_dimensions(format_dates_for_db(removed), self.conn)
+        update_sale_sample(self.conn, joined, rebuild, removed=removed_joined, **options)
+
+    def test_estimates_cover_exact_totals(self):
+        """Counts are exact and the 95% bounds contain the exact SUM for at least 90% of the strata."""
+        group_by = ["customer_region", "product_category", "sale_month"]
+        joined = sales_with_dimensions(format_dates_for_db(sales), self.conn)
+        exact = exact_totals(sales, self.conn, group_by)
+        covered = []
+        # Shifting the ids gives independent draws of the same data
+        for offset in range(0, 6_000_000, 1_000_000):
+            update_sale_sample(self.conn, joined.assign(transaction_id=joined["transaction_id"] + offset), rebuild=True, rate=0.1)
+            estimate = approximate_aggregate(self.conn, group_by)
+            merged = estimate.merge(exact, on=group_by, suffixes=("", "_exact"))
+            self.assertEqual(len(merged), len(estimate))
+            self.assertTrue((merged["row_count"] == merged["row_count_exact"]).all(), "Stratum counts should be exact")
+            covered.extend((merged["sum_low"] <= merged["total"]) & (merged["total"] <= merged["sum_high"]))
+            self.assertLess(estimate["sample_rows"].sum(), len(sales) * 0.2, "Sample should be much smaller than sale")
+        self.assertGreaterEqual(np.mean(covered), 0.9, "Confidence bounds miss the exact totals too often")
+
+    def test_small_strata_are_exact(self):
+        """While every stratum is below the minimum size the sample holds every row."""
+        few = sales.iloc[:300]
+        self.load(few, rebuild=True, min_stratum_rows=1000)
+        estimate = approximate_aggregate(self.conn, ["customer_region"])
+        exact = exact_totals(few, self.conn, ["customer_region"])
+        np.testing.assert_allclose(estimate["sum"], exact["total"])
+        np.testing.assert_allclose(estimate["sum_high"] - estimate["sum_low"], 0, atol=1e-6)
+
+    def sample_tables(self):
+        return [pd.read_sql_query(f"SELECT * FROM {table} ORDER BY 1, 2, 3", self.conn) for table in ("sale_sample", "sale_sample_strata")]
+
+    def test_batches_in_any_order(self):
+        """Loading shuffled batches draws the same sample, with the same weights and cutoffs, as one full load."""
+        self.load(sales, rebuild=True)
+        in_one_go = self.sample_tables()
+        shuffled = sales.sample(frac=1, random_state=3)
+        self.load(shuffled.iloc[:100], rebuild=True)
+        for start in range(100, len(shuffled), 29900):
+            self.load(shuffled.iloc[start:start + 29900])
+        for in_batches, expected in zip(self.sample_tables(), in_one_go):
+            pd.testing.assert_frame_equal(in_batches, expected)
+
+    def test_removals(self):
+        """Removed rows leave the counts and the sample."""
+        self.load(sales, rebuild=True)
+        removed = sales.iloc[:1000]
+        self.load(sales.iloc[:0], removed=removed)
+        counts = approximate_aggregate(self.conn, ["customer_region"])["row_count"].sum()
+        self.assertEqual(counts, len(sales) - len(removed))
+        remaining = pd.read_sql_query("SELECT MIN(transaction_id) FROM sale_sample", self.conn).iloc[0, 0]
+        self.assertGreaterEqual(remaining, 1000)
+
+    def test_stratum_without_sampled_rows_is_summed_exactly(self):
+        """When removals take every sampled row of a stratum, its rest is read from sale, not left out."""
+        insert_table("sale", sales.assign(payment_method="Cash", sales_channel="Online"), self.conn.cursor())
+        self.load(sales, rebuild=True)
+        stratum = pd.read_sql_query(f"SELECT {', '.join(STRATUM_COLUMNS)} FROM sale_sample LIMIT 1", self.conn).iloc[0]
+        sampled_ids = pd.read_sql_query(
+            "SELECT transaction_id FROM sale_sample WHERE customer_region = ? AND product_category = ? AND sale_month = ?",
+            self.conn, params=stratum.tolist(),
+        )["transaction_id"]
+        removed = sales[sales["transaction_id"].isin(sampled_ids)]
+        self.conn.executemany("DELETE FROM sale WHERE transaction_id = ?", [(int(key),) for key in sampled_ids])
+        self.load(sales.iloc[:0], removed=removed)
+
+        estimate = approximate_aggregate(self.conn, STRATUM_COLUMNS).set_index(STRATUM_COLUMNS).loc[tuple(stratum)]
+        remaining = sales[~sales["transaction_id"].isin(sampled_ids)]
+        exact = exact_totals(remaining, self.conn, STRATUM_COLUMNS).set_index(STRATUM_COLUMNS).loc[tuple(stratum)]
+        self.assertEqual(estimate["sample_rows"], 0)
+        self.assertAlmostEqual(estimate["sum"], exact["total"], places=4)
+        self.assertAlmostEqual(estimate["sum_high"] - estimate["sum_low"], 0)
+
+    def test_approximate_query_reports_the_average(self):
+        """The approximate canonical query keeps the average sale per group, over the exact count."""
+        self.load(sales, rebuild=True)
+        result = approximate_query("sales_by_region_category", self.conn)
+        np.testing.assert_allclose(result["avg_sale_usd"], result["total_sales"] / result["row_count"])
+        self.assertTrue((result["avg_sale_usd_low"] <= result["avg_sale_usd"]).all())
+        self.assertTrue((result["avg_sale_usd"] <= result["avg_sale_usd_high"]).all())
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
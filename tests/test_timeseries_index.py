@@ -0,0 +1,89 @@
+r"""
+tests/test_timeseries_index.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_timeseries_index.py
+    python3 tests\test_timeseries_index.py
+
+This test suite checks the prefix-sum time-series index against direct pandas sums.
+"""
+
+import pathlib
+import sys
+import tempfile
+import unittest
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.timeseries_index import TimeSeriesIndex  # noqa: E402
+
+sales = pd.DataFrame({
+    "purchase_date": ["2024-01-01", "2024-01-03", "2024-01-03", "2024-02-10", "2024-02-11", "2024-03-01"],
+    "customer_region": ["East", "West", "East", "East", "West", "East"],
+    "product_category": ["Clothing", "Electronics", "Electronics", "Clothing", "Sports", "Electronics"],
+    "sale_amount_usd": [10.0, 20.0, 30.0, 40.0, 50.0, 60.0],
+    "quantity_sold": [1, 2, 3, 4, 5, 6],
+})
+
+
+def direct_total(df, column, value, metric, start, end):
+    dates = pd.to_datetime(df["purchase_date"])
+    mask = (dates >= start) & (dates <= end)
+    if column is not None:
+        mask &= df[column] == value
+    return df.loc[mask, metric].sum()
+
+
+class TestTimeSeriesIndex(unittest.TestCase):
+
+    def test_range_totals_match_direct_sums(self):
+        """Range totals equal a direct filter-and-sum for every series."""
+        index = TimeSeriesIndex.build(sales)
+        ranges = [("2024-01-01", "2024-01-31"), ("2024-01-02", "2024-02-10"), ("2023-12-01", "2024-12-31"), ("2024-02-12", "2024-02-28")]
+        for start, end in ranges:
+            self.assertAlmostEqual(index.range_total("all", "all", "sale_amount_usd", start, end), direct_total(sales, None, None, "sale_amount_usd", start, end))
+            self.assertAlmostEqual(index.range_total("region", "East", "quantity_sold", start, end), direct_total(sales, "customer_region", "East", "quantity_sold", start, end))
+            self.assertAlmostEqual(index.range_total("category", "Electronics", "sale_amount_usd", start, end), direct_total(sales, "product_category", "Electronics", "sale_amount_usd", start, end))
+
+    def test_incremental_extend_matches_full_build(self):
+        """Extending batch by batch (including earlier days) gives the same index as one build."""
+        index = TimeSeriesIndex()
+        index.extend(sales.iloc[2:4])
+        index.extend(sales.iloc[4:])
+        index.extend(sales.iloc[:2])
+        full = TimeSeriesIndex.build(sales)
+        self.assertEqual(index.start, full.start)
+        for key, prefix in full.prefix.items():
+            self.assertEqual(index.prefix[key].tolist(), prefix.tolist(), f"Series {key} differs")
+
+    def test_moving_average_and_period_over_period(self):
+        """Moving averages and period comparisons come from range totals."""
+        index = TimeSeriesIndex.build(sales)
+        self.assertAlmostEqual(index.moving_average("all", "all", "sale_amount_usd", "2024-01-03", 3), 60.0 / 3)
+        comparison = index.period_over_period("region", "East", "sale_amount_usd", "2024-02-01", "2024-02-29")
+        self.assertEqual(comparison["current"], 40.0)
+        # The previous 29 days are 2024-01-03..2024-01-31
+        self.assertEqual(comparison["previous"], 30.0)
+        self.assertAlmostEqual(comparison["growth"], 10.0 / 30.0)
+
+    def test_save_and_load_round_trip(self):
+        """A saved index loads back with identical arrays."""
+        index = TimeSeriesIndex.build(sales)
+        with tempfile.TemporaryDirectory() as folder:
+            path = pathlib.Path(folder) / "index.npz"
+            index.save(path)
+            loaded = TimeSeriesIndex.load(path)
+        self.assertEqual(loaded.start, index.start)
+        self.assertEqual(loaded.days, index.days)
+        self.assertEqual(sorted(loaded.prefix), sorted(index.prefix))
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,242 @@
+r"""
+tests/test_warehouse_swap.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_warehouse_swap.py
+    python3 tests\test_warehouse_swap.py
+
+This test suite checks that swapping a staged warehouse into place never replays the
+old file's WAL over the new one, that the writer lock keeps writers out, and that
+staged loads build the derived files next to the staged database and swap them in together,
+that concurrent and failed builds never leave or clear each other's staging folders,
+and that in-place loads also switch the warehouse to the larger page size.
+"""
+
+import os
+import pathlib
+import sqlite3
+import sys
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts import etl_to_dw  # noqa: E402
+from scripts.etl_to_dw import swap_into_place, warehouse_write_lock  # noqa: E402
+from scripts.leaderboards import LeaderboardSet  # noqa: E402
+from scripts.timeseries_index import TimeSeriesIndex  # noqa: E402
+
+rng = np.random.default_rng(21)
+frames = {
+    "customer": pd.DataFrame({
+        "customer_id": np.arange(1000, 1020),
+        "customer_name": [f"Customer {i}" for i in range(20)],
+        "customer_region": rng.choice(["East", "West"], 20),
+        "customer_tier": rng.choice(["Gold", "Silver"], 20),
+    }),
+    "product": pd.DataFrame({
+        "product_id": np.arange(100, 105),
+        "product_name": [f"product {i}" for i in range(5)],
+        "product_category": rng.choice(["Electronics", "Sports"], 5),
+    }),
+    "sale": pd.DataFrame({
+        "transaction_id": np.arange(400),
+        "purchase_date": pd.to_datetime("2024-01-01") + pd.to_timedelta(rng.integers(0, 90, 400), unit="D"),
+        "customer_id": rng.integers(1000, 1020, 400),
+        "product_id": rng.integers(100, 105, 400),
+        "store_id": 401,
+        "campaign_id": 0,
+        "sale_amount_usd": rng.uniform(5, 900, 400).round(2),
+        "quantity_sold": rng.integers(1, 10, 400),
+        "payment_method": "Cash",
+        "sales_channel": "Online",
+    }),
+}
+
+
+def make_database(path, rows, wal=False):
+    conn = sqlite3.connect(path)
+    if wal:
+        conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE sale (transaction_id INTEGER PRIMARY KEY)")
+    conn.executemany("INSERT INTO sale VALUES (?)", [(i,) for i in range(rows)])
+    conn.commit()
+    return conn
+
+
+def append(conn, start, rows):
+    conn.executemany("INSERT INTO sale VALUES (?)", [(i,) for i in range(start, start + rows)])
+    conn.commit()
+
+
+def count(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM sale").fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestWarehouseSwap(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        folder = pathlib.Path(self.folder.name)
+        self.db_path = folder.joinpath("smart_sales.db")
+        self.staging_path = folder.joinpath("smart_sales.db.staging")
+        make_database(self.staging_path, 47).close()
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_appended_wal_is_not_replayed(self):
+        """Rows appended to the old file's WAL do not show up in the swapped-in warehouse."""
+        appender = make_database(self.db_path, 90, wal=True)
+        appender.execute("PRAGMA wal_autocheckpoint=0")
+        append(appender, 1000, 53)
+        self.assertGreater(self.db_path.with_name(self.db_path.name + "-wal").stat().st_size, 0)
+
+        swap_into_place(self.staging_path, self.db_path)
+        self.assertEqual(count(self.db_path), 47)
+        self.assertFalse(self.db_path.with_name(self.db_path.name + "-wal").exists())
+        appender.close()
+
+        # Appends after the swap land in the new warehouse
+        writer = sqlite3.connect(self.db_path)
+        writer.execute("PRAGMA journal_mode=WAL")
+        append(writer, 1000, 50)
+        writer.close()
+        self.assertEqual(count(self.db_path), 97)
+
+    def test_busy_checkpoint_aborts_the_swap(self):
+        """A reader pinning the WAL makes the swap fail cleanly; it succeeds once the reader is done."""
+        appender = make_database(self.db_path, 90, wal=True)
+        appender.execute("PRAGMA wal_autocheckpoint=0")
+        reader = sqlite3.connect(self.db_path)
+        reader.execute("BEGIN")
+        reader.execute("SELECT COUNT(*) FROM sale").fetchone()
+        append(appender, 1000, 53)
+
+        with self.assertRaises(RuntimeError):
+            swap_into_place(self.staging_path, self.db_path, attempts=2, timeout=0.1)
+        self.assertTrue(self.staging_path.exists(), "Staging file should be kept for a retry")
+        self.assertEqual(count(self.db_path), 143)
+
+        reader.rollback()
+        reader.close()
+        appender.close()
+        swap_into_place(self.staging_path, self.db_path)
+        self.assertEqual(count(self.db_path), 47)
+
+    def test_writer_lock_is_exclusive(self):
+        """A second writer waits for the lock and gives up after its timeout."""
+        with warehouse_write_lock(self.db_path):
+            with self.assertRaises(TimeoutError):
+                with warehouse_write_lock(self.db_path, timeout=0.2):
+                    pass
+        with warehouse_write_lock(self.db_path, timeout=0.2):
+            pass
+
+
+class TestStagedLoad(unittest.TestCase):
+
+    def setUp(self):
+        # DB_PATH and the artifact paths are relative to the project root
+        self.previous_dir = os.getcwd()
+        self.folder = tempfile.TemporaryDirectory()
+        os.chdir(self.folder.name)
+
+    def tearDown(self):
+        os.chdir(self.previous_dir)
+        self.folder.cleanup()
+
+    def assert_live_warehouse(self, sales):
+        self.assertEqual(count(etl_to_dw.DB_PATH), len(sales))
+        self.assertEqual(list(etl_to_dw.DW_DIR.glob(etl_to_dw.STAGING_DIR_PREFIX + "*")), [])
+        total = TimeSeriesIndex.load(etl_to_dw.TIMESERIES_INDEX_PATH).range_total("all", "all", "sale_amount_usd", "2024-01-01", "2024-12-31")
+        self.assertAlmostEqual(total, sales["sale_amount_usd"].sum(), places=4)
+        top = LeaderboardSet.load(etl_to_dw.LEADERBOARDS_PATH).top("customers_by_revenue")
+        self.assertAlmostEqual(top[0][1], sales.groupby("customer_id")["sale_amount_usd"].sum().max(), places=4)
+
+    def test_artifacts_are_staged_with_the_database(self):
+        """A staged build writes its derived files beside the staged database; the swap moves all of them."""
+        etl_to_dw.load_data_to_db(export_dashboard=False, frames=frames)
+        live_index = etl_to_dw.TIMESERIES_INDEX_PATH.read_bytes()
+
+        smaller = dict(frames, sale=frames["sale"].iloc[:100])
+        staging_path = etl_to_dw.staging_path_for(etl_to_dw.DB_PATH)
+        conn = sqlite3.connect(staging_path)
+        try:
+            etl_to_dw.configure_for_build(conn)
+            etl_to_dw.build_warehouse(conn, smaller)
+        finally:
+            conn.close()
+        for name in etl_to_dw.DERIVED_ARTIFACTS:
+            self.assertTrue(staging_path.parent.joinpath(name).exists(), f"{name} should be built in staging")
+        self.assertEqual(etl_to_dw.TIMESERIES_INDEX_PATH.read_bytes(), live_index, "Live files must not change before the swap")
+        self.assertEqual(count(etl_to_dw.DB_PATH), len(frames["sale"]))
+
+        swap_into_place(staging_path, etl_to_dw.DB_PATH)
+        self.assert_live_warehouse(smaller["sale"])
+
+    def test_concurrent_builds_keep_their_own_staging(self):
+        """A second staged build gets its own folder and leaves the first build's files alone."""
+        first = etl_to_dw.staging_path_for(etl_to_dw.DB_PATH)
+        conn = sqlite3.connect(first)
+        try:
+            etl_to_dw.configure_for_build(conn)
+            etl_to_dw.build_warehouse(conn, frames, artifact_dir=first.parent)
+        finally:
+            conn.close()
+
+        second = etl_to_dw.staging_path_for(etl_to_dw.DB_PATH)
+        self.assertNotEqual(first.parent, second.parent)
+        etl_to_dw.load_data_to_db(export_dashboard=False, frames=dict(frames, sale=frames["sale"].iloc[:100]))
+        self.assertEqual(count(first), len(frames["sale"]))
+        etl_to_dw.discard_staging(second)
+
+        swap_into_place(first, etl_to_dw.DB_PATH)
+        self.assert_live_warehouse(frames["sale"])
+
+    def test_failed_build_removes_its_staging(self):
+        """A build that fails before the swap leaves no staging folder and the live warehouse as it was."""
+        etl_to_dw.load_data_to_db(export_dashboard=False, frames=frames)
+        with self.assertRaises(Exception):
+            etl_to_dw.load_data_to_db(export_dashboard=False, frames=dict(frames, sale=frames["sale"].drop(columns="customer_id")))
+        self.assert_live_warehouse(frames["sale"])
+
+    def test_in_memory_build(self):
+        """The in-memory build is written out with the backup API and swapped in with its derived files."""
+        etl_to_dw.load_data_to_db(export_dashboard=False, in_memory=True, frames=frames)
+        self.assert_live_warehouse(frames["sale"])
+        conn = sqlite3.connect(etl_to_dw.DB_PATH)
+        try:
+            self.assertEqual(conn.execute("PRAGMA page_size").fetchone()[0], etl_to_dw.WAREHOUSE_PAGE_SIZE)
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM customer_metrics").fetchone()[0], frames["sale"]["customer_id"].nunique())
+        finally:
+            conn.close()
+
+    def test_in_place_load_sets_page_size(self):
+        """The drop-and-reload path rewrites an existing WAL warehouse with the warehouse page size."""
+        etl_to_dw.DW_DIR.mkdir(parents=True)
+        make_database(etl_to_dw.DB_PATH, 10, wal=True).close()
+        etl_to_dw.load_data_to_db(export_dashboard=False, staged=False, frames=frames)
+        conn = sqlite3.connect(etl_to_dw.DB_PATH)
+        try:
+            self.assertEqual(conn.execute("PRAGMA page_size").fetchone()[0], etl_to_dw.WAREHOUSE_PAGE_SIZE)
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        finally:
+            conn.close()
+        self.assertEqual(count(etl_to_dw.DB_PATH), len(frames["sale"]))
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
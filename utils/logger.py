@@ -8,7 +8,7 @@ Logging is an essential way to track events and issues during execution.
 
 Features:
 - Logs information, warnings, and errors to a designated log file.
-- Ensures the log directory exists.
+- Ensures the log directory exists (when init_logger() is called).
 """
 
 # Imports from Python Standard Library
@@ -26,19 +26,32 @@ LOG_FOLDER: pathlib.Path = pathlib.Path("logs")
 # Set the name of the log file
 LOG_FILE: pathlib.Path = LOG_FOLDER.joinpath("project_log.log")
 
-# Ensure the log folder exists or create it
-try:
-    LOG_FOLDER.mkdir(exist_ok=True)
-    logger.info(f"Log folder created at: {LOG_FOLDER}")
-except Exception as e:
-    logger.error(f"Error creating log folder: {e}")
+# Set when init_logger() has added the file sink
+_file_sink_id = None
 
-# Configure Loguru to write to the log file
-try:
-    logger.add(LOG_FILE, level="INFO")
-    logger.info(f"Logging to file: {LOG_FILE}")
-except Exception as e:
-    logger.error(f"Error configuring logger to write to file: {e}")
+
+def init_logger() -> None:
+    """Create the log folder and add the file sink. Safe to call more than once.
+
+    Importing this module has no side effects; scripts call this at startup.
+    """
+    global _file_sink_id
+    if _file_sink_id is not None:
+        return
+
+    # Ensure the log folder exists or create it
+    try:
+        LOG_FOLDER.mkdir(exist_ok=True)
+        logger.info(f"Log folder created at: {LOG_FOLDER}")
+    except Exception as e:
+        logger.error(f"Error creating log folder: {e}")
+
+    # Configure Loguru to write to the log file
+    try:
+        _file_sink_id = logger.add(LOG_FILE, level="INFO")
+        logger.info(f"Logging to file: {LOG_FILE}")
+    except Exception as e:
+        logger.error(f"Error configuring logger to write to file: {e}")
 
 
 def get_log_file_path() -> pathlib.Path:
@@ -58,6 +71,7 @@ def log_example() -> None:
 
 def main() -> None:
     """Main function to execute logger setup and demonstrate its usage."""
+    init_logger()
     logger.info(f"STARTING {CURRENT_SCRIPT}.py")
 
     # Call the example logging function